@@ -0,0 +1,163 @@
+"""
+Measures how long importing the modules of progressive_scheduling takes.
+
+Every import runs in a fresh interpreter, so nothing is cached in sys.modules.
+For each module, the fastest import out of --repeat runs is recorded together
+with the heavy dependencies (torch, matplotlib, Lightning) that the import
+pulled in. The torch-free core must not import any of them, which is checked on
+every run.
+
+Results are written as JSON. With --compare, they are checked against a stored
+baseline and the benchmark fails if any import got slower than --max-regression
+allows. Timings depend on the machine, so baselines should be recorded with
+--save-baseline on the machine that runs the comparison.
+
+Usage:
+    python benchmarks/bench_import_time.py --output results.json
+    python benchmarks/bench_import_time.py --save-baseline
+    python benchmarks/bench_import_time.py --compare
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(__file__), "baselines", "bench_import_time.json"
+)
+
+HEAVY_DEPENDENCIES = ("torch", "matplotlib", "lightning")
+
+# modules that only need the standard library and NumPy
+CORE_MODULES = (
+    "progressive_scheduling",
+    "progressive_scheduling.piecewise",
+    "progressive_scheduling.progress",
+    "progressive_scheduling.sweep",
+    "progressive_scheduling.visualize",
+    "progressive_scheduling.callbacks",
+)
+
+# modules that need torch, timed for comparison
+TORCH_MODULES = ("torch", "progressive_scheduling.schedulers")
+
+MEASURE_IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": seconds, "heavy_dependencies": heavy}}))
+"""
+
+
+def measure_import(module: str) -> Dict:
+    """Imports module in a fresh interpreter and returns the duration and deps."""
+    code = MEASURE_IMPORT.format(module=module, heavy=HEAVY_DEPENDENCIES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run(modules: List[str], repeat: int) -> Dict:
+    durations = {module: float("inf") for module in modules}
+    heavy_dependencies = {}
+    # alternating rounds, so that noise on a busy machine affects all alike
+    for _ in range(repeat):
+        for module in modules:
+            result = measure_import(module)
+            durations[module] = min(durations[module], result["seconds"])
+            heavy_dependencies[module] = result["heavy_dependencies"]
+    results = {
+        module: {
+            "ms": durations[module] * 1e3,
+            "heavy_dependencies": heavy_dependencies[module],
+        }
+        for module in modules
+    }
+    return {"python_version": sys.version.split()[0], "results": results}
+
+
+def print_results(report: Dict):
+    print(f"{'Module':<40} {'ms':>8}  heavy dependencies")
+    print("-" * 75)
+    for module, result in report["results"].items():
+        heavy = ", ".join(result["heavy_dependencies"]) or "-"
+        print(f"{module:<40} {result['ms']:>8.1f}  {heavy}")
+
+
+def check_core(report: Dict) -> List[str]:
+    """Returns a description of every core module that imports a heavy dependency."""
+    return [
+        f"{module} imports {', '.join(result['heavy_dependencies'])}"
+        for module, result in report["results"].items()
+        if module in CORE_MODULES and result["heavy_dependencies"]
+    ]
+
+
+def compare(report: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """
+    Returns a description of every import that got slower than the baseline.
+
+    Args:
+        report (Dict): The current results.
+        baseline (Dict): The stored results.
+        max_regression (float): Allowed relative increase of the import time,
+            e.g. 0.5 for 50%.
+
+    Returns:
+        List[str]: The regressions, empty if there are none.
+    """
+    regressions = []
+    for module, result in report["results"].items():
+        reference = baseline["results"].get(module)
+        if reference is None:
+            continue
+        limit = reference["ms"] * (1.0 + max_regression)
+        if result["ms"] > limit:
+            regressions.append(
+                f"{module}: {result['ms']:.1f} ms > {limit:.1f} ms "
+                f"(baseline {reference['ms']:.1f} ms)"
+            )
+    return regressions
+
+
+def main(args: argparse.Namespace):
+    modules = list(CORE_MODULES)
+    if not args.core_only:
+        modules += TORCH_MODULES
+    report = run(modules, args.repeat)
+    print_results(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    problems = check_core(report)
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems += compare(report, baseline, args.max_regression)
+    assert not problems, "import regressions:\n" + "\n".join(problems)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--core-only", action="store_true")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--max-regression", type=float, default=0.5)
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+"""
+Compares ProgressiveScheduler.step() with and without the lookup table mode.
+
+Fails if the lookup table is not faster than evaluating the schedule.
+
+Usage:
+    python benchmarks/bench_lookup_table.py
+"""
+
+import argparse
+import timeit
+from typing import Callable, Dict, List
+
+import torch
+from torch.optim import SGD, Optimizer
+
+from progressive_scheduling import CosineAnnealingLR, OneCycleLR, ProgressiveScheduler
+
+SCHEDULERS: Dict[str, Callable[..., ProgressiveScheduler]] = {
+    "CosineAnnealingLR": lambda optimizer, **kwargs: CosineAnnealingLR(
+        optimizer, eta_min=0.001, **kwargs
+    ),
+    "OneCycleLR": lambda optimizer, **kwargs: OneCycleLR(
+        optimizer, max_lr=0.1, **kwargs
+    ),
+}
+
+
+def create_optimizer() -> Optimizer:
+    model = torch.nn.Linear(1, 1)
+    return SGD(model.parameters(), lr=0.1)
+
+
+def time_steps(
+    schedulers: List[ProgressiveScheduler], number: int, repeat: int
+) -> List[float]:
+    """
+    Returns the fastest mean duration of step() in seconds for each scheduler.
+
+    The schedulers are timed in alternating rounds, so that noise on a busy
+    machine affects all of them alike.
+    """
+    timers = []
+    for scheduler in schedulers:
+        scheduler.optimizer.step()
+        timers.append(timeit.Timer(lambda scheduler=scheduler: scheduler.step(0.37)))
+
+    durations = [float("inf")] * len(schedulers)
+    for _ in range(repeat):
+        for index, timer in enumerate(timers):
+            durations[index] = min(durations[index], timer.timeit(number) / number)
+    return durations
+
+
+def main(lookup_table_size: int, number: int, repeat: int):
+    print(f"{'Scheduler':<20} {'analytic us':>12} {'table us':>12} {'speedup':>8}")
+    print("-" * 55)
+    slower = []
+    for name, create_scheduler in SCHEDULERS.items():
+        analytic, tabulated = time_steps(
+            [
+                create_scheduler(create_optimizer()),
+                create_scheduler(
+                    create_optimizer(), lookup_table_size=lookup_table_size
+                ),
+            ],
+            number,
+            repeat,
+        )
+        print(
+            f"{name:<20} {analytic * 1e6:>12.3f} {tabulated * 1e6:>12.3f} "
+            f"{analytic / tabulated:>7.2f}x"
+        )
+        if tabulated >= analytic:
+            slower.append(name)
+
+    assert not slower, f"lookup table is not faster for {', '.join(slower)}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_001)
+    parser.add_argument("--number", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=25)
+    args = parser.parse_args()
+    main(args.size, args.number, args.repeat)
@@ -0,0 +1,293 @@
+"""
+Measures the per-step overhead of the schedulers and the Lightning callback.
+
+CosineAnnealingLR and OneCycleLR are timed against their torch.optim.lr_scheduler
+counterparts for several parameter group counts, with float and tensor learning
+rates. AutoSchedulingCallback.on_train_batch_end is timed with the default and
+the throughput progress estimator. The "instrumented" cases record every step
+into a StepHistory and are compared with the plain cases. For every case, the
+fastest mean duration of a step and the peak memory allocated by a step are
+recorded.
+
+Results are written as JSON. With --compare, they are checked against a stored
+baseline and the benchmark fails if any case got slower or allocates more than
+--max-regression allows. Timings depend on the machine, so baselines should be
+recorded with --save-baseline on the machine that runs the comparison.
+
+Usage:
+    python benchmarks/bench_overhead.py --output results.json
+    python benchmarks/bench_overhead.py --save-baseline
+    python benchmarks/bench_overhead.py --compare
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+import torch
+from torch.optim import SGD, Optimizer
+from torch.optim import lr_scheduler as torch_schedulers
+
+import progressive_scheduling
+from progressive_scheduling.progress import ThroughputProgressEstimator
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(__file__), "baselines", "bench_overhead.json"
+)
+
+# progress values cycled through by the progressive schedulers
+NUM_PROGRESS_VALUES = 1_000
+
+# number of steps the torch schedulers are configured for, never reached
+TORCH_TOTAL_STEPS = 10**9
+
+SCHEDULERS: Dict[str, Dict[str, Callable[[Optimizer], object]]] = {
+    "CosineAnnealingLR": {
+        "progressive": lambda optimizer: progressive_scheduling.CosineAnnealingLR(
+            optimizer, eta_min=0.001
+        ),
+        "torch": lambda optimizer: torch_schedulers.CosineAnnealingLR(
+            optimizer, T_max=TORCH_TOTAL_STEPS, eta_min=0.001
+        ),
+    },
+    "OneCycleLR": {
+        "progressive": lambda optimizer: progressive_scheduling.OneCycleLR(
+            optimizer, max_lr=0.1
+        ),
+        "torch": lambda optimizer: torch_schedulers.OneCycleLR(
+            optimizer, max_lr=0.1, total_steps=TORCH_TOTAL_STEPS
+        ),
+    },
+}
+
+
+def create_optimizer(num_param_groups: int, tensor_lr: bool) -> Optimizer:
+    param_groups = [
+        {"params": [torch.nn.Parameter(torch.zeros(1))]}
+        for _ in range(num_param_groups)
+    ]
+    lr = torch.tensor(0.1) if tensor_lr else 0.1
+    optimizer = SGD(param_groups, lr=lr)
+    if tensor_lr:
+        # every group needs its own tensor, else all groups share one lr
+        for param_group in optimizer.param_groups:
+            param_group["lr"] = param_group["lr"].clone()
+    return optimizer
+
+
+def create_scheduler_step(
+    scheduler_name: str, implementation: str, num_param_groups: int, tensor_lr: bool
+) -> Callable[[], None]:
+    optimizer = create_optimizer(num_param_groups, tensor_lr)
+    if implementation == "instrumented":
+        scheduler = SCHEDULERS[scheduler_name]["progressive"](optimizer)
+        scheduler.enable_instrumentation()
+    else:
+        scheduler = SCHEDULERS[scheduler_name][implementation](optimizer)
+    optimizer.step()
+
+    if implementation == "torch":
+        return scheduler.step
+
+    progress = [step / NUM_PROGRESS_VALUES for step in range(NUM_PROGRESS_VALUES)]
+    state = {"index": 0}
+
+    def step():
+        index = state["index"]
+        scheduler.step(progress[index])
+        state["index"] = (index + 1) % NUM_PROGRESS_VALUES
+
+    return step
+
+
+def create_callback_step(throughput: bool, instrumented: bool) -> Callable[[], None]:
+    from progressive_scheduling.callbacks.lightning import AutoSchedulingCallback
+
+    optimizer = create_optimizer(1, tensor_lr=False)
+    scheduler = progressive_scheduling.CosineAnnealingLR(optimizer)
+    optimizer.step()
+    trainer = SimpleNamespace(should_stop=False, global_step=0)
+    pl_module = SimpleNamespace(lr_schedulers=lambda: scheduler)
+
+    estimator = ThroughputProgressEstimator() if throughput else None
+    # a budget that never runs out during the benchmark
+    callback = AutoSchedulingCallback(timedelta(days=365), progress_estimator=estimator)
+    if instrumented:
+        callback.enable_instrumentation()
+    callback.on_train_start(trainer, pl_module)
+
+    def step():
+        callback.on_train_batch_start(trainer, pl_module, None, 0)
+        trainer.global_step += 1
+        callback.on_train_batch_end(trainer, pl_module, None, None, 0)
+
+    return step
+
+
+def create_cases(group_counts: List[int], callback: bool) -> Dict[str, Callable]:
+    cases = {}
+    for scheduler_name in SCHEDULERS:
+        for num_param_groups in group_counts:
+            for tensor_lr in (False, True):
+                for implementation in ("progressive", "instrumented", "torch"):
+                    name = (
+                        f"{scheduler_name}/{implementation}/groups={num_param_groups}"
+                        f"/lr={'tensor' if tensor_lr else 'float'}"
+                    )
+                    cases[name] = create_scheduler_step(
+                        scheduler_name, implementation, num_param_groups, tensor_lr
+                    )
+    if callback:
+        for throughput in (False, True):
+            for instrumented in (False, True):
+                estimator = "throughput" if throughput else "elapsed"
+                name = f"AutoSchedulingCallback/estimator={estimator}"
+                if instrumented:
+                    name += "/instrumented"
+                cases[name] = create_callback_step(throughput, instrumented)
+    return cases
+
+
+def time_cases(
+    cases: Dict[str, Callable[[], None]], number: int, repeat: int
+) -> Dict[str, float]:
+    """
+    Returns the fastest mean duration of a step in seconds for each case.
+
+    The cases are timed in alternating rounds, so that noise on a busy machine
+    affects all of them alike.
+    """
+    timers = {name: timeit.Timer(step) for name, step in cases.items()}
+    durations = {name: float("inf") for name in cases}
+    for _ in range(repeat):
+        for name, timer in timers.items():
+            durations[name] = min(durations[name], timer.timeit(number) / number)
+    return durations
+
+
+def measure_peak_memory(step: Callable[[], None], number: int) -> int:
+    """Returns the largest memory in bytes that a single step allocates."""
+    peak = 0
+    tracemalloc.start()
+    try:
+        # the first traced step also allocates the state of tracemalloc
+        step()
+        for _ in range(number):
+            tracemalloc.clear_traces()
+            tracemalloc.reset_peak()
+            step()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run(group_counts: List[int], callback: bool, number: int, repeat: int) -> Dict:
+    cases = create_cases(group_counts, callback)
+    durations = time_cases(cases, number, repeat)
+    results = {}
+    for name, step in cases.items():
+        results[name] = {
+            "ns_per_step": durations[name] * 1e9,
+            "peak_bytes": measure_peak_memory(step, number=100),
+        }
+    return {
+        "torch_version": torch.__version__,
+        "python_version": sys.version.split()[0],
+        "results": results,
+    }
+
+
+def print_results(report: Dict):
+    results = report["results"]
+    print(f"{'Case':<55} {'ns/step':>10} {'peak B':>8} {'vs ref':>9}")
+    print("-" * 85)
+    for name, result in results.items():
+        # progressive cases are compared with torch, instrumented ones with
+        # the plain progressive case
+        if "/progressive/" in name:
+            reference = results.get(name.replace("/progressive/", "/torch/"))
+        elif "/instrumented/" in name:
+            reference = results.get(name.replace("/instrumented/", "/progressive/"))
+        elif name.endswith("/instrumented"):
+            reference = results.get(name[: -len("/instrumented")])
+        else:
+            reference = None
+        ratio = ""
+        if reference is not None:
+            ratio = f"{result['ns_per_step'] / reference['ns_per_step']:.2f}x"
+        print(
+            f"{name:<55} {result['ns_per_step']:>10.0f} "
+            f"{result['peak_bytes']:>8} {ratio:>9}"
+        )
+
+
+def compare(report: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """
+    Returns a description of every case that regressed against the baseline.
+
+    Args:
+        report (Dict): The current results.
+        baseline (Dict): The stored results.
+        max_regression (float): Allowed relative increase of the step duration
+            and the peak memory, e.g. 0.3 for 30%.
+
+    Returns:
+        List[str]: The regressions, empty if there are none.
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        for metric in ("ns_per_step", "peak_bytes"):
+            limit = reference[metric] * (1.0 + max_regression)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]:.0f} > {limit:.0f} "
+                    f"(baseline {reference[metric]:.0f})"
+                )
+    return regressions
+
+
+def main(args: argparse.Namespace):
+    report = run(args.groups, not args.no_callback, args.number, args.repeat)
+    print_results(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print("regressions against the baseline:", *regressions, sep="\n")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--groups", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--no-callback", action="store_true")
+    parser.add_argument("--number", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--max-regression", type=float, default=0.3)
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+"""
+Measures the cost of OneCycleLR.step() for a growing number of parameter groups.
+
+Every step has to write the learning rate of each parameter group, so the total
+step cost necessarily grows linearly with the number of groups. What has to stay
+flat up to 10k groups is the cost per group: the benchmark fails if it varies by
+more than --tolerance between the group counts from --flat-from upwards.
+
+Usage:
+    python benchmarks/bench_param_groups.py
+"""
+
+import argparse
+import time
+from typing import List
+
+import torch
+from torch.optim import SGD
+
+from progressive_scheduling import OneCycleLR
+
+
+def create_layer_wise_scheduler(num_param_groups: int) -> OneCycleLR:
+    param_groups = [
+        {"params": [torch.nn.Parameter(torch.zeros(1))]}
+        for _ in range(num_param_groups)
+    ]
+    optimizer = SGD(param_groups, lr=0.1)
+    # layer-wise learning rate decay
+    max_lrs = [0.1 * 0.99**layer for layer in range(num_param_groups)]
+    scheduler = OneCycleLR(optimizer, max_lr=max_lrs)
+    optimizer.step()
+    return scheduler
+
+
+def time_step(scheduler: OneCycleLR, num_steps: int, repeat: int = 5) -> float:
+    """Returns the fastest mean duration of scheduler.step() in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for step in range(num_steps):
+            scheduler.step(step / num_steps)
+        durations.append((time.perf_counter() - start) / num_steps)
+    return min(durations)
+
+
+def main(group_counts: List[int], num_steps: int, flat_from: int, tolerance: float):
+    print(f"{'Groups':>8} {'us/step':>12} {'ns/group':>12}")
+    print("-" * 34)
+    per_group = []
+    for num_param_groups in group_counts:
+        scheduler = create_layer_wise_scheduler(num_param_groups)
+        seconds = time_step(scheduler, num_steps)
+        print(
+            f"{num_param_groups:>8} {seconds * 1e6:>12.1f} "
+            f"{seconds * 1e9 / num_param_groups:>12.1f}"
+        )
+        if num_param_groups >= flat_from:
+            per_group.append(seconds / num_param_groups)
+
+    # for a handful of groups, the fixed cost of a step dominates
+    ratio = max(per_group) / min(per_group)
+    assert ratio <= tolerance, f"cost per group varies by {ratio:.2f}x"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--groups", type=int, nargs="+", default=[1, 10, 100, 1_000, 10_000]
+    )
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--flat-from", type=int, default=100)
+    parser.add_argument("--tolerance", type=float, default=2.0)
+    args = parser.parse_args()
+    main(args.groups, args.steps, args.flat_from, args.tolerance)
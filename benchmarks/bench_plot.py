@@ -0,0 +1,61 @@
+"""
+Times schedule previews written by plot_lr_scheduler for long schedules.
+
+Each preview overlays a progressive and a torch OneCycleLR and a torch
+CosineAnnealingLR and is written to a PNG file. Fails if a preview takes longer
+than --max-seconds.
+
+Usage:
+    python benchmarks/bench_plot.py
+    python benchmarks/bench_plot.py --num-steps 10000000 --max-seconds 1.0
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import torch
+from torch.optim import SGD, lr_scheduler
+
+from progressive_scheduling import OneCycleLR
+from progressive_scheduling.visualize import plot_lr_scheduler
+
+
+def create_optimizer() -> SGD:
+    return SGD([torch.nn.Parameter(torch.zeros(1))], lr=0.1, momentum=0.9)
+
+
+def time_preview(num_steps: int, path: str) -> float:
+    """Returns the duration of one preview in seconds."""
+    start = time.perf_counter()
+    plot_lr_scheduler(
+        pytorch_scheduler=lr_scheduler.OneCycleLR(
+            create_optimizer(), max_lr=0.1, total_steps=num_steps
+        ),
+        progressive_scheduler=OneCycleLR(create_optimizer(), max_lr=0.1),
+        num_steps=num_steps,
+        schedulers=[lr_scheduler.CosineAnnealingLR(create_optimizer(), num_steps)],
+        output=path,
+    )
+    return time.perf_counter() - start
+
+
+def main(num_steps: int, repeat: int, max_seconds: float):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "schedule.png")
+        durations = [time_preview(num_steps, path) for _ in range(repeat)]
+
+    print(f"{'steps':>12} {'first s':>8} {'best s':>8}")
+    print(f"{num_steps:>12} {durations[0]:>8.3f} {min(durations):>8.3f}")
+    slowest = max(durations)
+    assert slowest < max_seconds, f"a preview took {slowest:.3f}s"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-steps", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+    main(args.num_steps, args.repeat, args.max_seconds)
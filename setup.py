@@ -18,6 +18,7 @@ setup(
     packages=find_packages(where="src"),
     python_requires=">=3.6",
     install_requires=[
+        "numpy",
         "torch>=1.0",
     ],
     extras_require={
@@ -1,3 +1,35 @@
-from .schedulers import CosineAnnealingLR, OneCycleLR, ProgressiveScheduler
+from ._lazy import lazy_attributes
+from .curriculum import Curriculum, Knob
+from .evaluation import EvaluationSchedule
+from .loop import BudgetedLoop
+from .piecewise import PiecewiseSchedule, ScheduleBuilder, wsd_schedule
+from .sweep import ScheduleSweep, sweep_schedules
 
-__all__ = ["CosineAnnealingLR", "OneCycleLR", "ProgressiveScheduler"]
+# the schedulers need torch, which is only imported on first use
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "CosineAnnealingLR": ".schedulers",
+        "OneCycleLR": ".schedulers",
+        "PiecewiseLR": ".schedulers",
+        "ProgressiveScheduler": ".schedulers",
+        "SchedulerGroup": ".schedulers",
+    },
+)
+
+__all__ = [
+    "BudgetedLoop",
+    "CosineAnnealingLR",
+    "Curriculum",
+    "EvaluationSchedule",
+    "Knob",
+    "OneCycleLR",
+    "PiecewiseLR",
+    "PiecewiseSchedule",
+    "ProgressiveScheduler",
+    "ScheduleBuilder",
+    "SchedulerGroup",
+    "ScheduleSweep",
+    "sweep_schedules",
+    "wsd_schedule",
+]
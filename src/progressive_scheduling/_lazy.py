@@ -0,0 +1,37 @@
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_attributes(
+    package: str, attributes: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Returns __getattr__ and __dir__ for a package with lazily imported attributes.
+
+    The module that defines an attribute is only imported when the attribute is
+    first accessed, so that importing the package doesn't import heavy
+    dependencies like torch, matplotlib or Lightning.
+
+    Args:
+        package (str): Name of the package, i.e. its __name__.
+        attributes (Dict[str, str]): Maps each lazy attribute to the module that
+            defines it, relative to the package.
+
+    Returns:
+        Tuple[Callable[[str], Any], Callable[[], List[str]]]: The module level
+            __getattr__ and __dir__ functions of the package.
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        if name not in attributes:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(attributes[name], package), name)
+        # later lookups find the attribute without calling __getattr__
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(attributes))
+
+    return __getattr__, __dir__
@@ -1 +1,9 @@
+from progressive_scheduling._lazy import lazy_attributes
 
+# Lightning is only imported on first use
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {"AutoSchedulingCallback": ".lightning", "ProgressCheckpoint": ".lightning"},
+)
+
+__all__ = ["AutoSchedulingCallback", "ProgressCheckpoint"]
@@ -1,23 +1,297 @@
+import math
+import os
 import time
 from datetime import timedelta
-from typing import Any
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import lightning.pytorch as pl
+from lightning.pytorch.plugins.io import CheckpointIO
+from lightning.pytorch.utilities import rank_zero_info
 from lightning.pytorch.utilities.types import STEP_OUTPUT
+from torch import Tensor
+from torch.autograd import profiler as autograd_profiler
+
+from progressive_scheduling.checkpoint import AsyncCheckpointWriter
+from progressive_scheduling.curriculum import Curriculum
+from progressive_scheduling.evaluation import EvaluationSchedule
+from progressive_scheduling.history import StepHistory
+from progressive_scheduling.progress import (
+    ElapsedProgressEstimator,
+    ProgressEstimator,
+    ProgressSource,
+    TimeSource,
+    create_budget_source,
+)
+from progressive_scheduling.schedulers import ProgressiveScheduler, SchedulerGroup
+
+# phases of the training, the time of each phase is reported at the end
+PHASES = ("train", "validation", "checkpoint", "overhead")
 
 
 class AutoSchedulingCallback(pl.callbacks.Callback):
-    def __init__(self, training_duration: timedelta | dict):
+    """
+    Drives the learning rate schedulers of a LightningModule by a training budget.
+
+    The progress is updated and the ProgressiveSchedulers returned by
+    lr_schedulers() are stepped after each optimizer step, i.e. once per
+    accumulate_grad_batches batches. The progress source still sees every batch.
+    All schedulers are stepped together as one SchedulerGroup, e.g. one
+    scheduler per optimizer with manual optimization. configure_optimizers()
+    returns the schedulers themselves, since Lightning pairs every scheduler
+    with a single optimizer.
+
+    The wall-clock time of the training is split into phases: "train" from the
+    start to the end of each training batch, "validation" during validation
+    loops, "checkpoint" from saving a checkpoint until the next batch or
+    validation starts, and "overhead" for everything else, e.g. data loading
+    between batches. Time spent in excluded phases doesn't count against the
+    time budget. The time per phase is reported when the training ends.
+
+    The consumed budget and the state of the progress estimator are saved in the
+    checkpoints of the Trainer. A training resumed from a checkpoint continues
+    with the progress it had when the checkpoint was saved.
+
+    Args:
+        training_duration (timedelta | dict, optional): The time budget of the
+            training.
+        progress_estimator (ProgressEstimator, optional): Turns the consumed budget
+            into training progress. Defaults to ElapsedProgressEstimator, which
+            uses the consumed share of the budget. Use ThroughputProgressEstimator
+            for smooth, step-based progress. Training stops after the final step
+            of the estimator. With a DistributedProgressEstimator, all ranks stop
+            at the same step and the local clock of a rank never stops training.
+        progress_source (ProgressSource, optional): Measures the budget, e.g. in
+            tokens or FLOPs. If training_duration is given as well, the training
+            ends when the first of both budgets runs out.
+        exclude_downtime (bool): Whether the time between saving a checkpoint and
+            resuming from it, e.g. after a preemption, doesn't count against the
+            time budget. Default: False.
+        excluded_phases (Sequence[str]): Phases that don't count against the time
+            budget, any of "validation", "checkpoint" and "overhead".
+            Default: ("validation", "checkpoint").
+        step_interval (int): Number of optimizer steps between two updates of the
+            progress and the learning rates, e.g. to lower the overhead of jobs
+            with a very high step rate. The budget is then only checked every
+            step_interval steps as well. Default: 1.
+        curriculum (Curriculum, optional): Stepped with the progress before the
+            schedulers, when the training starts and after each update of the
+            progress, i.e. right after an optimizer step. A knob can, e.g., set
+            trainer.accumulate_grad_batches to ramp the batch size. Lightning
+            counts the accumulated batches per epoch, so the first optimizer
+            step after such a change may accumulate fewer batches.
+        evaluation_schedule (EvaluationSchedule, optional): Runs validation at
+            the progress points of the schedule instead of val_check_interval,
+            within its share of the time budget. The duration of each validation
+            is measured and passed to the schedule, which sizes the subset of
+            the validation set of the next one, see EvaluationSubsetSampler.
+            The batches of the sanity check of Lightning are timed to estimate
+            the cost of the first validation. With num_sanity_val_steps=0, pass
+            full_cost to the schedule, otherwise all points are skipped.
+            Lightning also validates when the training stops early, which
+            counts against the evaluation budget as well. Default: None.
+
+    Attributes:
+        time_by_phase (Dict[str, float]): Wall-clock seconds spent in each phase
+            since the start of the training.
+        history (StepHistory, optional): The recorded optimizer steps, see
+            enable_instrumentation().
+
+    Raises:
+        ValueError: If neither training_duration nor progress_source is given, or
+            excluded_phases contains "train" or an unknown phase,
+            step_interval is smaller than 1, or evaluation_schedule is given
+            without training_duration.
+    """
+
+    def __init__(
+        self,
+        training_duration: Optional[timedelta | dict] = None,
+        progress_estimator: Optional[ProgressEstimator] = None,
+        progress_source: Optional[ProgressSource] = None,
+        exclude_downtime: bool = False,
+        excluded_phases: Sequence[str] = ("validation", "checkpoint"),
+        step_interval: int = 1,
+        curriculum: Optional[Curriculum] = None,
+        evaluation_schedule: Optional[EvaluationSchedule] = None,
+    ):
+        for phase in excluded_phases:
+            if phase not in PHASES or phase == "train":
+                raise ValueError(
+                    "excluded_phases may only contain "
+                    "'validation', 'checkpoint' and 'overhead'."
+                )
+        if step_interval < 1:
+            raise ValueError("step_interval must be at least 1.")
+        if evaluation_schedule is not None and training_duration is None:
+            raise ValueError("evaluation_schedule requires a training_duration.")
 
         if isinstance(training_duration, dict):
             training_duration = timedelta(**training_duration)
 
-        self.total_training_duration = training_duration.total_seconds()
+        self.total_training_duration: Optional[float] = None
+        if training_duration is not None:
+            self.total_training_duration = training_duration.total_seconds()
+
+        self.progress_source = create_budget_source(
+            self.total_training_duration, progress_source, exclude_downtime
+        )
         self.exceeded_training_duration = False
+        self.progress_estimator = progress_estimator or ElapsedProgressEstimator()
+        self.excluded_phases = frozenset(excluded_phases)
+        self.step_interval = step_interval
+        self.curriculum = curriculum
+        self.evaluation_schedule = evaluation_schedule
+        self.schedulers: List[ProgressiveScheduler] = []
+        self.scheduler_group: Optional[SchedulerGroup] = None
+        # global step of the last update of the progress
+        self._last_update_step = 0
+        # measures the time by phase, independent of the progress source
+        self.clock = time.monotonic
+        self.time_by_phase = dict.fromkeys(PHASES, 0.0)
+        # current phase, None outside of a training
+        self._phase: Optional[str] = None
+        self._phase_start = 0.0
+        # state loaded from a checkpoint, applied when the training starts
+        self._resumed_state: Optional[Dict[str, Any]] = None
+        self.history: Optional[StepHistory] = None
+        # capacity and every of the history, None without instrumentation
+        self._history_config: Optional[Tuple[int, int]] = None
+        # start of the current validation, None outside of a scheduled one
+        self._evaluation_start: Optional[float] = None
+        # timing of the sanity check, estimates the cost of a full validation
+        self._sanity_check_batch_start: Optional[float] = None
+        self._sanity_check_seconds = 0.0
+        self._sanity_check_batches = 0
+        self._validation_cost: Optional[float] = None
+
+    @property
+    def predicted_total_steps(self) -> Optional[int]:
+        """Number of steps predicted to fit into the budget."""
+        return self.progress_estimator.predicted_total_steps
+
+    @property
+    def remaining_time(self) -> float:
+        """
+        Budget left after the last step.
+
+        In seconds for a time budget, otherwise in the unit of the progress source,
+        e.g. the remaining share of the budget for combined budgets.
+        """
+        return self.progress_estimator.remaining_budget
+
+    @property
+    def remaining_seconds(self) -> Optional[float]:
+        """Seconds left in the time budget now, None without a time budget."""
+        for source in getattr(self.progress_source, "sources", [self.progress_source]):
+            if isinstance(source, TimeSource):
+                return max(source.budget - source.consumed, 0.0)
+        return None
+
+    def enable_instrumentation(self, capacity: int = 4096, every: int = 1):
+        """
+        Records the optimizer steps into a ring buffer and marks the hook for the
+        torch profiler.
+
+        Each recorded optimizer step stores the global step, the progress, the
+        learning rates of all parameter groups of all schedulers and the
+        duration of on_train_batch_end in history, which is created when the
+        training starts. While a torch profiler runs, on_train_batch_end is
+        wrapped in a record_function range.
+
+        Args:
+            capacity (int): Number of optimizer steps kept. Default: 4096.
+            every (int): Only every every-th optimizer step is recorded.
+                Default: 1.
+
+        Raises:
+            ValueError: If capacity or every is smaller than 1.
+        """
+        if capacity < 1 or every < 1:
+            raise ValueError("capacity and every must be at least 1.")
+        self._history_config = (capacity, every)
+        # replaced on this instance only, so that callbacks without
+        # instrumentation run no extra code
+        self.on_train_batch_end = self._instrumented_on_train_batch_end
+
+    def disable_instrumentation(self):
+        """Restores the plain on_train_batch_end and drops the history."""
+        self.__dict__.pop("on_train_batch_end", None)
+        self._history_config = None
+        self.history = None
+
+    def state_dict(self) -> Dict[str, Any]:
+        state = {
+            "progress_source": self.progress_source.state_dict(),
+            "progress_estimator": self.progress_estimator.state_dict(),
+            "time_by_phase": dict(self.time_by_phase),
+        }
+        if self.evaluation_schedule is not None:
+            state["evaluation_schedule"] = self.evaluation_schedule.state_dict()
+        return state
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        # the budget continues when the training starts, so that the time until
+        # then counts as downtime
+        self._resumed_state = state_dict
 
     def on_train_start(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
-        self.training_start = time.time()
-        self.scheduler = pl_module.lr_schedulers()
+        schedulers = pl_module.lr_schedulers()
+        if not isinstance(schedulers, list):
+            schedulers = [] if schedulers is None else [schedulers]
+        self.schedulers = [
+            scheduler
+            for scheduler in schedulers
+            if isinstance(scheduler, ProgressiveScheduler)
+        ]
+        self.scheduler_group = (
+            SchedulerGroup(self.schedulers) if self.schedulers else None
+        )
+        self._last_update_step = trainer.global_step
+        self._phase, self._phase_start = "overhead", self.clock()
+
+        if self._history_config is not None:
+            capacity, every = self._history_config
+            num_groups = sum(
+                len(scheduler.optimizer.param_groups) for scheduler in self.schedulers
+            )
+            self.history = StepHistory(capacity, num_groups, every)
+
+        self.exceeded_training_duration = False
+        if self._resumed_state is None:
+            self.progress_source.start()
+            self.progress_estimator.reset()
+            self.time_by_phase = dict.fromkeys(PHASES, 0.0)
+            if self.evaluation_schedule is not None:
+                self.evaluation_schedule.reset()
+        else:
+            state, self._resumed_state = self._resumed_state, None
+            self.progress_source.load_state_dict(state["progress_source"])
+            self.progress_estimator.load_state_dict(state["progress_estimator"])
+            self.time_by_phase = dict(state["time_by_phase"])
+            if self.evaluation_schedule is not None and "evaluation_schedule" in state:
+                self.evaluation_schedule.load_state_dict(state["evaluation_schedule"])
+
+        if self.evaluation_schedule is not None:
+            # validation after any batch, see _schedule_validation()
+            trainer.check_val_every_n_epoch = None
+            if self._validation_cost is not None:
+                self.evaluation_schedule.estimate(self._validation_cost)
+
+        if self.curriculum is not None:
+            self.curriculum.reset()
+            self.curriculum.step(self.progress_estimator.progress)
+
+        if "overhead" in self.excluded_phases:
+            self.progress_source.pause()
+
+    def on_train_batch_start(
+        self,
+        trainer: pl.Trainer,
+        pl_module: pl.LightningModule,
+        batch: Any,
+        batch_idx: int,
+    ):
+        self._enter_phase("train")
 
     def on_train_batch_end(
         self,
@@ -27,19 +301,399 @@ class AutoSchedulingCallback(pl.callbacks.Callback):
         batch: Any,
         batch_idx: int,
     ):
-        current_training_duration = time.time() - self.training_start
-        self.check_training_duration(current_training_duration)
+        self.progress_source.update(batch)
+
+        # with gradient accumulation, the optimizer doesn't step on every batch,
+        # and with several optimizers, the global step grows by more than one
+        global_step = trainer.global_step
+        progress_updated = global_step - self._last_update_step >= self.step_interval
+        if progress_updated:
+            self._last_update_step = global_step
+            self._update_progress(trainer)
+
+        if self.evaluation_schedule is not None:
+            validate = progress_updated and self.evaluation_schedule.is_due(
+                self.progress_estimator.progress, self.total_training_duration
+            )
+            self._schedule_validation(trainer, validate)
+
+        self._enter_phase("overhead")
+
+    def _instrumented_on_train_batch_end(
+        self,
+        trainer: pl.Trainer,
+        pl_module: pl.LightningModule,
+        outputs: STEP_OUTPUT,
+        batch: Any,
+        batch_idx: int,
+    ):
+        args = (trainer, pl_module, outputs, batch, batch_idx)
+        # record_function takes microseconds even without a running profiler
+        if autograd_profiler._is_profiler_enabled:
+            with autograd_profiler.record_function(
+                "AutoSchedulingCallback.on_train_batch_end"
+            ):
+                self._recorded_on_train_batch_end(*args)
+        else:
+            self._recorded_on_train_batch_end(*args)
+
+    def _recorded_on_train_batch_end(self, *args: Any):
+        last_update_step = self._last_update_step
+        start = time.perf_counter()
+        AutoSchedulingCallback.on_train_batch_end(self, *args)
+        duration = time.perf_counter() - start
+
+        history = self.history
+        if self._last_update_step != last_update_step and history.is_due():
+            lrs = [
+                lr.item() if isinstance(lr, Tensor) else lr
+                for scheduler in self.schedulers
+                for lr in scheduler._last_lr
+            ]
+            history.record(
+                self._last_update_step,
+                self.progress_estimator.progress,
+                lrs,
+                duration,
+            )
+
+    def on_sanity_check_start(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        self._sanity_check_seconds = 0.0
+        self._sanity_check_batches = 0
+
+    def on_validation_batch_start(
+        self,
+        trainer: pl.Trainer,
+        pl_module: pl.LightningModule,
+        batch: Any,
+        batch_idx: int,
+        dataloader_idx: int = 0,
+    ):
+        if self.evaluation_schedule is not None and trainer.sanity_checking:
+            self._sanity_check_batch_start = self.clock()
+
+    def on_validation_batch_end(
+        self,
+        trainer: pl.Trainer,
+        pl_module: pl.LightningModule,
+        outputs: STEP_OUTPUT,
+        batch: Any,
+        batch_idx: int,
+        dataloader_idx: int = 0,
+    ):
+        if self._sanity_check_batch_start is not None:
+            self._sanity_check_seconds += self.clock() - self._sanity_check_batch_start
+            self._sanity_check_batches += 1
+            self._sanity_check_batch_start = None
+
+    def on_sanity_check_end(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        # the validation loader has the length of the full validation set, see
+        # EvaluationSubsetSampler
+        num_batches = sum(trainer.num_val_batches)
+        if self._sanity_check_batches and math.isfinite(num_batches):
+            seconds_per_batch = self._sanity_check_seconds / self._sanity_check_batches
+            self._validation_cost = seconds_per_batch * num_batches
+
+    def on_validation_start(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        self._enter_phase("validation")
+        if self.evaluation_schedule is not None and self._phase is not None:
+            self._evaluation_start = self.clock()
+
+    def on_validation_end(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        if self._evaluation_start is not None:
+            self.evaluation_schedule.record(self.clock() - self._evaluation_start)
+            self._evaluation_start = None
+        self._enter_phase("overhead")
+
+    def on_save_checkpoint(
+        self,
+        trainer: pl.Trainer,
+        pl_module: pl.LightningModule,
+        checkpoint: Dict[str, Any],
+    ):
+        # there is no hook after the checkpoint is written, so the phase lasts
+        # until the next hook of this callback
+        self._enter_phase("checkpoint")
+
+    def on_train_end(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        self._enter_phase(None)
+        rank_zero_info(self.format_time_by_phase())
+
+    def check_training_duration(self, consumed: float) -> bool:
+        """
+        Checks whether the budget is used up.
+
+        The training then stops at the end of the current step, in case the
+        progress estimator didn't end it before.
+
+        Args:
+            consumed (float): Budget consumed since the start of the training.
+
+        Returns:
+            bool: Whether the budget is used up.
+        """
+        if consumed > self.progress_source.budget:
+            self.exceeded_training_duration = True
+        return self.exceeded_training_duration
+
+    def format_time_by_phase(self) -> str:
+        """Returns a summary of the time spent in each phase of the training."""
+        total = sum(self.time_by_phase.values())
+        lines = ["Training time by phase:"]
+        for phase, seconds in self.time_by_phase.items():
+            share = seconds / total if total > 0.0 else 0.0
+            excluded = " (excluded)" if phase in self.excluded_phases else ""
+            lines.append(f"  {phase:<10} {seconds:10.1f}s {share:6.1%}{excluded}")
+        return "\n".join(lines)
+
+    def _update_progress(self, trainer: pl.Trainer):
+        """Updates the progress, steps the schedulers and stops at the end."""
+        estimator = self.progress_estimator
+        # e.g. a calibrated estimator only reads the clock every few steps
+        consumed = self.progress_source.consumed if estimator.needs_consumed else None
+        # with a distributed estimator, all ranks stop together at its final step
+        if consumed is not None and not estimator.synchronizes_ranks:
+            if self.check_training_duration(consumed):
+                trainer.should_stop = True
+
+        training_progress = estimator.update(consumed, self.progress_source.budget)
+
+        if self.curriculum is not None:
+            self.curriculum.step(training_progress)
+        if self.scheduler_group is not None:
+            self.scheduler_group.step(training_progress)
+
+        if estimator.is_final_step:
+            trainer.should_stop = True
+
+    def _schedule_validation(self, trainer: pl.Trainer, validate: bool):
+        """Makes Lightning validate after the current batch, or not."""
+        # without check_val_every_n_epoch, Lightning validates after a batch if
+        # the index of the batch across epochs plus one is a multiple of
+        # val_check_batch
+        iteration = trainer.fit_loop.epoch_loop.total_batch_idx
+        trainer.val_check_batch = iteration + 1 if validate else iteration + 2
+
+    def _enter_phase(self, phase: Optional[str]):
+        """Books the time since the last phase change and switches to phase."""
+        if self._phase is None:
+            # outside of fit(), e.g. during the sanity check or trainer.validate()
+            return
+
+        now = self.clock()
+        self.time_by_phase[self._phase] += now - self._phase_start
+        was_excluded = self._phase in self.excluded_phases
+        self._phase, self._phase_start = phase, now
+
+        if phase in self.excluded_phases:
+            if not was_excluded:
+                self.progress_source.pause()
+        elif was_excluded:
+            self.progress_source.resume()
+
+
+class ProgressCheckpoint(pl.callbacks.Checkpoint):
+    """
+    Saves checkpoints at progress milestones and right before the budget ends.
+
+    Reads the progress and the budget of the AutoSchedulingCallback of the
+    Trainer. Lightning runs checkpoint callbacks after all other callbacks, so
+    the progress of the current step is already updated.
+
+    Checkpoints are saved with Trainer.save_checkpoint, so the strategy builds
+    and writes them. Saving only blocks the training to copy the checkpoint to
+    CPU memory, which counts as "checkpoint" phase of the AutoSchedulingCallback.
+    The copy is written in a background thread with the CheckpointIO of the
+    Trainer. Strategies that write checkpoints without their CheckpointIO, like
+    DeepSpeed, save synchronously.
+
+    With a time budget, the final checkpoint is saved as soon as the remaining
+    time drops below the expected duration of a save, times safety_factor, plus
+    the duration of a step. The expected duration is the slowest measured save,
+    or final_save_seconds before the first save. The training stops after the
+    final save, so the final checkpoint holds the last step. Without a time
+    budget, or if the training ends before, the final checkpoint is saved when
+    the training ends.
+
+    In distributed training, all ranks decide together whether to save, and the
+    strategy decides which ranks write. As a checkpoint callback, it replaces the
+    default ModelCheckpoint of the Trainer.
+
+    Args:
+        dirpath (str): The directory of the checkpoints.
+        every (float, optional): Progress between two milestones, e.g. 0.1 saves
+            at 10%, 20%, ..., 90%. None saves only the final checkpoint.
+            Default: 0.1.
+        filename (str): Name of milestone checkpoints, formatted with the
+            progress of the milestone. Default: "progress-{progress:.2f}".
+        final_filename (str): Name of the final checkpoint. Default: "final".
+        safety_factor (float): Multiplies the expected duration of a save when
+            planning the final one. Default: 2.0.
+        final_save_seconds (float): Expected duration of a save before one was
+            measured. Default: 60.0.
+
+    Attributes:
+        writer (AsyncCheckpointWriter): Writes the checkpoints.
+        final_saved (bool): Whether the final checkpoint was saved.
+
+    Raises:
+        ValueError: If every is not between 0.0 and 1.0, or safety_factor is
+            smaller than 1.0.
+    """
+
+    def __init__(
+        self,
+        dirpath: str,
+        every: Optional[float] = 0.1,
+        filename: str = "progress-{progress:.2f}",
+        final_filename: str = "final",
+        safety_factor: float = 2.0,
+        final_save_seconds: float = 60.0,
+    ):
+        if every is not None and not 0.0 < every < 1.0:
+            raise ValueError("every must be between 0.0 and 1.0.")
+        if safety_factor < 1.0:
+            raise ValueError("safety_factor must be at least 1.0.")
+
+        self.dirpath = dirpath
+        self.every = every
+        self.filename = filename
+        self.final_filename = final_filename
+        self.safety_factor = safety_factor
+        self.final_save_seconds = final_save_seconds
+        self.writer = AsyncCheckpointWriter()
+        self.final_saved = False
+        self.scheduling: Optional[AutoSchedulingCallback] = None
+        self._checkpoint_io: Optional[_AsyncWriterCheckpointIO] = None
+        # index of the next milestone, i.e. at progress index * every
+        self._next_milestone = 1
+        self._last_batch_end: Optional[float] = None
+        self._step_seconds = 0.0
+
+    @property
+    def expected_save_seconds(self) -> float:
+        """Expected duration of a save, until the checkpoint is written."""
+        if self.writer.max_write_seconds == 0.0:
+            return self.final_save_seconds
+        return self.writer.save_seconds
+
+    def on_train_start(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        for callback in trainer.callbacks:
+            if isinstance(callback, AutoSchedulingCallback):
+                self.scheduling = callback
+                break
+        else:
+            raise ValueError("ProgressCheckpoint needs an AutoSchedulingCallback.")
+        self._checkpoint_io = _AsyncWriterCheckpointIO(
+            trainer.strategy.checkpoint_io, self.writer
+        )
+
+        # milestones passed before a resumed training are not saved again
+        progress = self.scheduling.progress_estimator.progress
+        self._next_milestone = self._milestone_index(progress) + 1
+        self.final_saved = False
+        self._last_batch_end = None
+
+    def on_train_batch_end(
+        self,
+        trainer: pl.Trainer,
+        pl_module: pl.LightningModule,
+        outputs: STEP_OUTPUT,
+        batch: Any,
+        batch_idx: int,
+    ):
+        now = self.scheduling.clock()
+        if self._last_batch_end is not None:
+            self._step_seconds = now - self._last_batch_end
+        self._last_batch_end = now
+
+        if self.final_saved:
+            return
+        if self._reduce(trainer, self._is_final_save_due()):
+            self._save(trainer, self.final_filename)
+            self.final_saved = True
+            # later steps would be missing from the final checkpoint
+            trainer.should_stop = True
+            return
+
+        progress = self.scheduling.progress_estimator.progress
+        index = self._milestone_index(progress)
+        if self._reduce(trainer, index >= self._next_milestone):
+            self._next_milestone = index + 1
+            self._save(trainer, self.filename.format(progress=index * self.every))
+
+    def on_train_end(self, trainer: pl.Trainer, pl_module: pl.LightningModule):
+        if not self.final_saved:
+            self._save(trainer, self.final_filename)
+            self.final_saved = True
+        self.writer.wait()
+
+    def teardown(self, trainer: pl.Trainer, pl_module: pl.LightningModule, stage: str):
+        self.writer.close()
+
+    def _milestone_index(self, progress: float) -> int:
+        """Returns the index of the last milestone at or before progress."""
+        if self.every is None:
+            return 0
+        # tolerates rounding, e.g. 0.3 / 0.1 = 2.9999999999999996
+        index = math.floor(progress / self.every + 1e-9)
+        # the end of the training is the final checkpoint, not a milestone
+        return min(index, math.ceil(1.0 / self.every - 1e-9) - 1)
+
+    def _is_final_save_due(self) -> bool:
+        remaining = self.scheduling.remaining_seconds
+        if remaining is None:
+            return False
+        lead_time = self.safety_factor * self.expected_save_seconds + self._step_seconds
+        return remaining <= lead_time
+
+    def _reduce(self, trainer: pl.Trainer, decision: bool) -> bool:
+        """Returns whether any rank decided to save."""
+        if trainer.world_size > 1:
+            return trainer.strategy.reduce_boolean_decision(decision, all=False)
+        return decision
+
+    def _save(self, trainer: pl.Trainer, name: str):
+        # the writer is only installed for these saves, other checkpoints of the
+        # Trainer are written as configured
+        strategy = trainer.strategy
+        checkpoint_io = strategy.checkpoint_io
+        strategy.checkpoint_io = self._checkpoint_io
+        try:
+            trainer.save_checkpoint(os.path.join(self.dirpath, f"{name}.ckpt"))
+        finally:
+            strategy.checkpoint_io = checkpoint_io
+
+
+class _AsyncWriterCheckpointIO(CheckpointIO):
+    """Writes the checkpoints of a CheckpointIO with an AsyncCheckpointWriter."""
+
+    def __init__(self, checkpoint_io: CheckpointIO, writer: AsyncCheckpointWriter):
+        self.checkpoint_io = checkpoint_io
+        self.writer = writer
+        writer.save_fn = self._write
+        self._storage_options: Optional[Any] = None
+
+    def save_checkpoint(
+        self,
+        checkpoint: Dict[str, Any],
+        path: str,
+        storage_options: Optional[Any] = None,
+    ):
+        # the options are read by the background write, so it must be finished
+        self.writer.wait()
+        self._storage_options = storage_options
+        self.writer.save(checkpoint, str(path))
 
-        training_progress = current_training_duration / self.total_training_duration
-        training_progress = min(training_progress, 1.0)
+    def load_checkpoint(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        self.writer.wait()
+        return self.checkpoint_io.load_checkpoint(*args, **kwargs)
 
-        self.scheduler.step(training_progress)
+    def remove_checkpoint(self, path: str):
+        self.writer.wait()
+        self.checkpoint_io.remove_checkpoint(path)
 
-    def check_training_duration(self, current_training_duration: int):
-        if current_training_duration > self.total_training_duration:
-            # training duration can exceed once because training was not yet stopped
-            # if it happens multiple times, somethings wrong
-            if self.exceeded_training_duration:
-                raise ("training_duration was exceeded but training wasn't stopped")
-            else:
-                self.exceeded_training_duration = True
+    def _write(self, checkpoint: Dict[str, Any], path: str):
+        self.checkpoint_io.save_checkpoint(
+            checkpoint, path, storage_options=self._storage_options
+        )
@@ -0,0 +1,139 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+import torch
+from torch import Tensor
+
+
+def snapshot_to_cpu(state: Any) -> Any:
+    """
+    Returns a copy of a state in CPU memory.
+
+    Tensors are copied, so that training can change the state while the copy is
+    written. Dicts, lists and tuples are copied recursively, other values are
+    shared. GPU tensors are copied into pinned memory without blocking, with a
+    single synchronization at the end.
+    """
+    cuda_copies: List[Tensor] = []
+
+    def copy(value: Any) -> Any:
+        if isinstance(value, Tensor):
+            value = value.detach()
+            if value.device.type != "cuda":
+                return value.to("cpu", copy=True)
+            copied = torch.empty(
+                value.shape, dtype=value.dtype, device="cpu", pin_memory=True
+            )
+            cuda_copies.append(copied.copy_(value, non_blocking=True))
+            return copied
+        if isinstance(value, dict):
+            # keeps the type, e.g. of an OrderedDict
+            copied = value.copy()
+            for key, item in value.items():
+                copied[key] = copy(item)
+            return copied
+        if isinstance(value, tuple) and hasattr(value, "_fields"):
+            return type(value)(*(copy(item) for item in value))
+        if isinstance(value, (list, tuple)):
+            return type(value)(copy(item) for item in value)
+        return value
+
+    snapshot = copy(state)
+    if cuda_copies:
+        torch.cuda.synchronize()
+    return snapshot
+
+
+def atomic_save(state: Any, path: str):
+    """Saves a state with torch.save, replacing path only when it is complete."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    torch.save(state, temporary_path)
+    os.replace(temporary_path, path)
+
+
+class AsyncCheckpointWriter:
+    """
+    Writes checkpoints in a background thread.
+
+    save() blocks only to copy the state to CPU memory. Serializing and writing
+    the copy happen in the background, one checkpoint at a time: saving while the
+    previous checkpoint is still written waits for it first, so at most one copy
+    is held in memory. Errors of a write are raised by the next save() or wait().
+
+    Args:
+        save (Callable[[Any, str], None]): Writes a state to a path.
+            Default: atomic_save.
+        clock (Callable[[], float]): Returns the current time in seconds.
+            Default: time.perf_counter.
+
+    Attributes:
+        snapshot_seconds (float): Duration of the last copy to CPU memory.
+        max_write_seconds (float): Duration of the slowest finished write.
+        saved_paths (List[str]): Paths of the finished writes, in order.
+    """
+
+    def __init__(
+        self,
+        save: Callable[[Any, str], None] = atomic_save,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.save_fn = save
+        self.clock = clock
+        self.snapshot_seconds = 0.0
+        self.max_write_seconds = 0.0
+        self.saved_paths: List[str] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[Future] = None
+
+    @property
+    def save_seconds(self) -> float:
+        """Expected duration of a save, from the start of the copy to the file."""
+        return self.snapshot_seconds + self.max_write_seconds
+
+    @property
+    def is_writing(self) -> bool:
+        """Whether a checkpoint is still being written."""
+        return self._pending is not None and not self._pending.done()
+
+    def save(self, state: Any, path: str) -> Future:
+        """
+        Copies a state to CPU memory and writes it to path in the background.
+
+        Returns:
+            Future: Completes when the checkpoint is written.
+        """
+        self.wait()
+        start = self.clock()
+        snapshot = snapshot_to_cpu(state)
+        self.snapshot_seconds = self.clock() - start
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="checkpoint")
+        self._pending = self._executor.submit(self._write, snapshot, path)
+        return self._pending
+
+    def wait(self):
+        """Waits until the pending checkpoint is written."""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            pending.result()
+
+    def close(self):
+        """Waits for the pending checkpoint and stops the background thread."""
+        try:
+            self.wait()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _write(self, snapshot: Any, path: str):
+        start = self.clock()
+        self.save_fn(snapshot, path)
+        self.max_write_seconds = max(self.max_write_seconds, self.clock() - start)
+        self.saved_paths.append(path)
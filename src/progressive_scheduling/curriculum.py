@@ -0,0 +1,187 @@
+import math
+from typing import Any, Callable, Dict, Literal, Optional, Union
+
+from progressive_scheduling.piecewise import PiecewiseSchedule, ScheduleBuilder
+
+
+class Knob:
+    """
+    A training setting that follows a schedule over the progress.
+
+    Knobs use the same schedules as the learning rate, e.g. a batch size that
+    rises from 256 to 4096 in the first half of the training:
+
+        Knob(ScheduleBuilder(start=256).linear(0.5, to=4096).constant(0.5),
+             multiple_of=256)
+
+    Args:
+        schedule (Union[PiecewiseSchedule, ScheduleBuilder]): The values of the
+            knob, with a single entry.
+        multiple_of (int, optional): If set, the values are rounded to the
+            nearest multiple of multiple_of, and at least multiple_of, e.g. for
+            batch sizes or sequence lengths. Default: None.
+        apply (Callable[[Any], None], optional): Called with the new value when
+            a Curriculum step changes it, e.g. to write the value into a model.
+            Default: None.
+
+    Raises:
+        ValueError: If the schedule has more than one entry or multiple_of is
+            smaller than 1.
+    """
+
+    def __init__(
+        self,
+        schedule: Union[PiecewiseSchedule, ScheduleBuilder],
+        multiple_of: Optional[int] = None,
+        apply: Optional[Callable[[Any], None]] = None,
+    ):
+        if isinstance(schedule, ScheduleBuilder):
+            schedule = schedule.build()
+        if schedule.num_entries != 1:
+            raise ValueError("The schedule of a knob must have a single entry.")
+        if multiple_of is not None and multiple_of < 1:
+            raise ValueError("multiple_of must be at least 1.")
+
+        self.schedule = schedule
+        self.multiple_of = multiple_of
+        self.apply = apply
+
+    def __call__(self, training_progress: float) -> Union[int, float]:
+        """
+        Returns the value of the knob at a progress value.
+
+        Raises:
+            ValueError: If training_progress is not between 0.0 and 1.0.
+        """
+        value = self.schedule(training_progress)[0]
+        if self.multiple_of is None:
+            return value
+        # rounds half up, unlike round()
+        multiples = max(math.floor(value / self.multiple_of + 0.5), 1)
+        return multiples * self.multiple_of
+
+
+class Curriculum:
+    """
+    Drives training settings other than the optimizer's by the training progress.
+
+    The counterpart of a ProgressiveScheduler for settings like the batch size,
+    the sequence length or the dropout probability. step() is called with the
+    same progress as the schedulers, e.g. by BudgetedLoop or
+    AutoSchedulingCallback, and calls the apply function of every knob whose
+    value changed. Other components read the current values, e.g.
+    progressive_scheduling.data.CurriculumBatchSampler.
+
+    Example::
+
+        curriculum = Curriculum({
+            "batch_size": Knob(
+                ScheduleBuilder(start=256).linear(0.5, to=2048).constant(0.5),
+                multiple_of=256,
+            ),
+            "dropout": Knob(
+                ScheduleBuilder(start=0.1).linear(1.0, to=0.0),
+                apply=lambda p: set_dropout(model, p),
+            ),
+        })
+
+    Args:
+        knobs (Dict[str, Union[Knob, PiecewiseSchedule, ScheduleBuilder]]): The
+            settings by name. Schedules are wrapped in a Knob without rounding.
+
+    Attributes:
+        values (Dict[str, Union[int, float]]): The value of each knob at the
+            last progress, at 0.0 before the first step.
+        last_progress (float): The last progress passed to step().
+    """
+
+    def __init__(
+        self, knobs: Dict[str, Union[Knob, PiecewiseSchedule, ScheduleBuilder]]
+    ):
+        self.knobs = {
+            name: knob if isinstance(knob, Knob) else Knob(knob)
+            for name, knob in knobs.items()
+        }
+        self.last_progress = 0.0
+        self.values = {name: knob(0.0) for name, knob in self.knobs.items()}
+        # the values last passed to apply
+        self._applied: Dict[str, Union[int, float]] = {}
+
+    def __getitem__(self, name: str) -> Union[int, float]:
+        return self.values[name]
+
+    def step(self, training_progress: float) -> Dict[str, Union[int, float]]:
+        """
+        Updates the values of all knobs and applies the changed ones.
+
+        Args:
+            training_progress (float): Progress of the training between 0.0
+                (start) and 1.0 (end).
+
+        Returns:
+            Dict[str, Union[int, float]]: The knobs whose value changed since
+                the last step, with their new value.
+
+        Raises:
+            ValueError: If training_progress is not between 0.0 and 1.0.
+        """
+        self.last_progress = training_progress
+        changed = {}
+        for name, knob in self.knobs.items():
+            value = knob(training_progress)
+            self.values[name] = value
+            if self._applied.get(name) != value:
+                self._applied[name] = value
+                changed[name] = value
+                if knob.apply is not None:
+                    knob.apply(value)
+        return changed
+
+    def reset(self):
+        """Forgets the applied values, so that the next step applies all knobs."""
+        self._applied.clear()
+
+
+def gradient_accumulation_steps(batch_size: int, micro_batch_size: int) -> int:
+    """
+    Returns the number of micro batches that make up a batch.
+
+    Ramps the batch size without changing the batches the dataloader produces.
+
+    Args:
+        batch_size (int): The batch size of an optimizer step.
+        micro_batch_size (int): The batch size of a forward and backward pass.
+
+    Returns:
+        int: The number of accumulated micro batches, at least 1.
+    """
+    return max(math.floor(batch_size / micro_batch_size + 0.5), 1)
+
+
+def batch_size_lr_scale(
+    batch_size: int,
+    base_batch_size: int,
+    rule: Literal["linear", "sqrt"] = "linear",
+) -> float:
+    """
+    Returns the factor of the learning rate for a batch size.
+
+    Set it as ProgressiveScheduler.lr_scale, so that the learning rate follows a
+    batch size ramp.
+
+    Args:
+        batch_size (int): The current batch size.
+        base_batch_size (int): The batch size the learning rate schedule was
+            tuned for.
+        rule (Literal["linear", "sqrt"]): Scale the learning rate linearly with
+            the batch size, e.g. for SGD, or with its square root, e.g. for Adam.
+            Default: "linear".
+
+    Raises:
+        ValueError: If rule is unknown.
+    """
+    if rule == "linear":
+        return batch_size / base_batch_size
+    if rule == "sqrt":
+        return math.sqrt(batch_size / base_batch_size)
+    raise ValueError(f"rule must be 'linear' or 'sqrt', got {rule}")
@@ -0,0 +1,186 @@
+import math
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sized
+
+import numpy as np
+from torch import Tensor, nn
+from torch.utils.data import Dataset, Sampler
+
+from progressive_scheduling.curriculum import Curriculum
+from progressive_scheduling.evaluation import EvaluationSchedule
+
+
+class CurriculumBatchSampler(Sampler[List[Any]]):
+    """
+    Groups the indices of a sampler into batches sized by a curriculum.
+
+    Pass it as batch_sampler to a DataLoader. The batch sampler runs in the main
+    process, so the curriculum is read at every batch boundary without
+    rebuilding the workers of the DataLoader. Batches that the workers already
+    prefetched, up to num_workers * prefetch_factor, keep their size.
+
+    With sequence_length set, every index is yielded as (index, length) for a
+    CurriculumDataset, which truncates the samples in the workers.
+
+    len() is the number of batches at the current batch size and needs a sized
+    sampler. Once the batch size changes, it no longer matches the iteration,
+    so don't derive schedules like the total number of steps from it.
+
+    In distributed training, pass a DistributedSampler as sampler and set
+    use_distributed_sampler=False on the Lightning Trainer, which can't rebuild
+    custom batch samplers.
+
+    Args:
+        sampler (Iterable[Any]): The indices, e.g. a RandomSampler.
+        curriculum (Curriculum): Holds the current batch size.
+        batch_size (str): Name of the knob with the batch size.
+            Default: "batch_size".
+        sequence_length (str, optional): Name of the knob with the sequence
+            length. Default: None.
+        drop_last (bool): Whether an incomplete last batch is dropped.
+            Default: False.
+    """
+
+    def __init__(
+        self,
+        sampler: Iterable[Any],
+        curriculum: Curriculum,
+        batch_size: str = "batch_size",
+        sequence_length: Optional[str] = None,
+        drop_last: bool = False,
+    ):
+        self.sampler = sampler
+        self.curriculum = curriculum
+        self.batch_size = batch_size
+        self.sequence_length = sequence_length
+        self.drop_last = drop_last
+
+    def __len__(self) -> int:
+        num_samples = len(self.sampler)  # type: ignore[arg-type]
+        batch_size = int(self.curriculum.values[self.batch_size])
+        if self.drop_last:
+            return num_samples // batch_size
+        return math.ceil(num_samples / batch_size)
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        values = self.curriculum.values
+        batch: List[Any] = []
+        for index in self.sampler:
+            if not batch:
+                batch_size = int(values[self.batch_size])
+                length = (
+                    None
+                    if self.sequence_length is None
+                    else int(values[self.sequence_length])
+                )
+            batch.append(index if length is None else (index, length))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch and not self.drop_last:
+            yield batch
+
+
+def truncate_sequences(sample: Any, length: int) -> Any:
+    """
+    Truncates the last dimension of all tensors and arrays in a sample.
+
+    Dicts, lists and tuples are truncated recursively, scalars and other values
+    are returned as they are.
+    """
+    if isinstance(sample, (Tensor, np.ndarray)):
+        return sample[..., :length] if sample.ndim > 0 else sample
+    if isinstance(sample, dict):
+        return {key: truncate_sequences(value, length) for key, value in sample.items()}
+    if isinstance(sample, (list, tuple)):
+        return type(sample)(truncate_sequences(value, length) for value in sample)
+    return sample
+
+
+class CurriculumDataset(Dataset):
+    """
+    Truncates the samples of a dataset to the length chosen by the curriculum.
+
+    Reads the (index, length) pairs of a CurriculumBatchSampler with a
+    sequence_length knob. Plain indices return the sample as it is.
+
+    Args:
+        dataset (Dataset): The map-style dataset with full-length samples.
+        truncate (Callable[[Any, int], Any]): Shortens a sample to a length.
+            Default: truncate_sequences.
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        truncate: Callable[[Any, int], Any] = truncate_sequences,
+    ):
+        self.dataset = dataset
+        self.truncate = truncate
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def __getitem__(self, item: Any) -> Any:
+        if isinstance(item, tuple):
+            index, length = item
+            return self.truncate(self.dataset[index], length)
+        return self.dataset[item]
+
+
+class EvaluationSubsetSampler(Sampler[int]):
+    """
+    Yields the share of a validation set chosen by an EvaluationSchedule.
+
+    The indices are taken from a fixed random permutation, so evaluations on the
+    same share see the same samples and smaller subsets are part of larger ones.
+    The share is read at every iteration, i.e. before each evaluation.
+
+    len() is the size of the whole validation set, since Lightning reads the
+    number of validation batches only once. An iteration ends after the subset.
+
+    Pass it as sampler to the validation DataLoader. In distributed training,
+    set use_distributed_sampler=False on the Lightning Trainer and shard the
+    indices with a sampler of your own.
+
+    Args:
+        data_source (Sized): The validation dataset.
+        schedule (EvaluationSchedule): Holds the share of the next evaluation.
+        seed (int): Seed of the permutation. Default: 0.
+    """
+
+    def __init__(self, data_source: Sized, schedule: EvaluationSchedule, seed: int = 0):
+        self.schedule = schedule
+        self.permutation = np.random.default_rng(seed).permutation(len(data_source))
+
+    def __len__(self) -> int:
+        return len(self.permutation)
+
+    @property
+    def num_samples(self) -> int:
+        """Number of samples of the next evaluation, at least one."""
+        num_samples = len(self.permutation)
+        return min(max(math.ceil(self.schedule.subset * num_samples), 1), num_samples)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.permutation[: self.num_samples].tolist())
+
+
+def set_dropout(module: nn.Module, p: float) -> int:
+    """
+    Sets the probability of all dropout layers of a module.
+
+    Use it as the apply function of a dropout Knob.
+
+    Args:
+        module (nn.Module): The model.
+        p (float): The new dropout probability.
+
+    Returns:
+        int: The number of updated dropout layers.
+    """
+    count = 0
+    for submodule in module.modules():
+        if isinstance(submodule, nn.modules.dropout._DropoutNd):
+            submodule.p = p
+            count += 1
+    return count
@@ -0,0 +1,154 @@
+from typing import Any, Dict, Optional, Sequence, Union
+
+
+class EvaluationSchedule:
+    """
+    Plans evaluations at progress points, within a share of the time budget.
+
+    With a number of evaluations, the points are 1 - (1 - k / n) ** density for
+    k = 1, ..., n, i.e. denser toward the end of the training for density > 1,
+    where the evaluations matter most, and always including progress 1.0.
+
+    The cost of the evaluations is measured as they happen. Each evaluation gets
+    an equal share of the evaluation budget that is left, and evaluates a subset
+    of the validation set that fits into it, assuming that the cost grows
+    linearly with the subset. The largest cost of a full evaluation measured or
+    estimated so far is used, so that the estimate errs on the side of smaller
+    subsets. If not even min_subset fits, the evaluation is skipped and its share
+    goes to the later ones. Before the first evaluation, the cost comes from
+    full_cost or estimate(). Without it, evaluations are skipped, since not even
+    min_subset can be shown to fit.
+
+    The subset is applied by progressive_scheduling.data.EvaluationSubsetSampler,
+    and AutoSchedulingCallback triggers the evaluations.
+
+    Args:
+        points (Union[int, Sequence[float]]): Number of evaluations, or their
+            progress values. Default: 10.
+        density (float): How much denser the points get toward the end, 1.0 for
+            evenly spaced points. Only used with a number of evaluations.
+            Default: 2.0.
+        max_fraction (float): Largest share of the budget spent evaluating.
+            Default: 0.05.
+        min_subset (float): Smallest share of the validation set evaluated.
+            Default: 0.1.
+        full_cost (float, optional): Estimated seconds of an evaluation on the
+            full validation set. Default: None.
+
+    Attributes:
+        subset (float): Share of the validation set of the next evaluation.
+        spent (float): Seconds spent evaluating.
+        num_evaluations (int): Number of evaluations so far.
+        num_skipped (int): Number of points skipped for lack of budget.
+
+    Raises:
+        ValueError: If there are no points, a point is not in (0.0, 1.0], density
+            is smaller than 1.0, max_fraction or min_subset is not in
+            (0.0, 1.0], or full_cost is not positive.
+    """
+
+    def __init__(
+        self,
+        points: Union[int, Sequence[float]] = 10,
+        density: float = 2.0,
+        max_fraction: float = 0.05,
+        min_subset: float = 0.1,
+        full_cost: Optional[float] = None,
+    ):
+        if density < 1.0:
+            raise ValueError("density must be at least 1.0.")
+        if isinstance(points, int):
+            points = [1.0 - (1.0 - k / points) ** density for k in range(1, points + 1)]
+        if not points or not all(0.0 < point <= 1.0 for point in points):
+            raise ValueError("points must be between 0.0 (exclusive) and 1.0.")
+        if not 0.0 < max_fraction <= 1.0:
+            raise ValueError("max_fraction must be between 0.0 and 1.0.")
+        if not 0.0 < min_subset <= 1.0:
+            raise ValueError("min_subset must be between 0.0 and 1.0.")
+        if full_cost is not None and full_cost <= 0.0:
+            raise ValueError("full_cost must be positive.")
+
+        self.points = sorted(points)
+        self.density = density
+        self.max_fraction = max_fraction
+        self.min_subset = min_subset
+        self.full_cost = full_cost
+        self.reset()
+
+    def reset(self):
+        """Resets the schedule to the start of the training."""
+        self.subset = self.min_subset
+        self.spent = 0.0
+        self.num_evaluations = 0
+        self.num_skipped = 0
+        # index of the next point
+        self._next_point = 0
+        # largest measured or estimated cost of an evaluation on the full
+        # validation set
+        self._full_cost: Optional[float] = self.full_cost
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Returns the state of the schedule, e.g. to resume the training."""
+        return dict(self.__dict__)
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        """Loads a state returned by state_dict()."""
+        self.__dict__.update(state_dict)
+
+    def is_due(self, training_progress: float, budget: float) -> bool:
+        """
+        Returns whether to evaluate at a progress and sets the subset.
+
+        Several points passed at once count as one evaluation.
+
+        Args:
+            training_progress (float): The current progress.
+            budget (float): The time budget of the training in seconds.
+        """
+        points = self.points
+        if (
+            self._next_point == len(points)
+            or training_progress < points[self._next_point]
+        ):
+            return False
+        while (
+            self._next_point < len(points)
+            and points[self._next_point] <= training_progress
+        ):
+            self._next_point += 1
+
+        if self._full_cost is None:
+            self.num_skipped += 1
+            return False
+
+        remaining_evaluations = len(points) - self._next_point + 1
+        allowance = (self.max_fraction * budget - self.spent) / remaining_evaluations
+        self.subset = min(allowance / self._full_cost, 1.0)
+        if self.subset < self.min_subset:
+            self.num_skipped += 1
+            return False
+        return True
+
+    def estimate(self, full_cost: float):
+        """
+        Sets an estimated cost, e.g. timed on a few batches of the validation set.
+
+        It is only used while no larger cost was measured or estimated.
+
+        Args:
+            full_cost (float): Estimated seconds of an evaluation on the full
+                validation set.
+        """
+        if self._full_cost is None or full_cost > self._full_cost:
+            self._full_cost = full_cost
+
+    def record(self, seconds: float):
+        """
+        Records the duration of an evaluation on the current subset.
+
+        Args:
+            seconds (float): Duration of the evaluation.
+        """
+        self.spent += seconds
+        self.num_evaluations += 1
+        self.estimate(seconds / self.subset)
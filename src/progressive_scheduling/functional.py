@@ -0,0 +1,120 @@
+import math
+from typing import Any, Sequence
+
+import numpy as np
+
+
+def array_namespace(x: Any) -> Any:
+    """
+    Returns the module that provides the math functions for x.
+
+    Python numbers use math, torch tensors use torch and everything else is
+    treated as a NumPy array. torch is only imported if x is a tensor.
+
+    Args:
+        x (Any): A Python number, NumPy array or torch tensor.
+
+    Returns:
+        Any: One of the modules math, numpy or torch.
+    """
+    if isinstance(x, (int, float)):
+        return math
+    if type(x).__module__.startswith("torch"):
+        import torch
+
+        return torch
+    return np
+
+
+def as_progress_array(progress: Any) -> Any:
+    """
+    Converts a batch of progress values into a NumPy array or torch tensor.
+
+    Args:
+        progress (Any): A sequence, NumPy array or torch tensor with progress
+            values between 0.0 (start) and 1.0 (end).
+
+    Returns:
+        Any: A floating point NumPy array or torch tensor.
+
+    Raises:
+        ValueError: If any progress value is not between 0.0 and 1.0.
+    """
+    xp = array_namespace(progress)
+    if xp is math or xp is np:
+        progress = np.asarray(progress, dtype=np.float64)
+    elif not progress.is_floating_point():
+        progress = progress.double()
+
+    if (progress < 0.0).any() or (progress > 1.0).any():
+        raise ValueError("training_progress must be between 0.0 and 1.0.")
+    return progress
+
+
+def annealing_cos(start: Any, end: Any, pct: Any) -> Any:
+    """
+    Computes the cosine annealing from start to end based on the progress.
+
+    Args:
+        start (Any): The starting value.
+        end (Any): The ending value.
+        pct (Any): The progress percentage (between 0 and 1).
+
+    Returns:
+        Any: The annealed value, with the type and shape of the inputs.
+    """
+    cos_out = array_namespace(pct).cos(math.pi * pct) + 1
+    return end + (start - end) / 2.0 * cos_out
+
+
+def annealing_linear(start: Any, end: Any, pct: Any) -> Any:
+    """
+    Computes the linear annealing from start to end based on the progress.
+
+    Args:
+        start (Any): The starting value.
+        end (Any): The ending value.
+        pct (Any): The progress percentage (between 0 and 1).
+
+    Returns:
+        Any: The annealed value, with the type and shape of the inputs.
+    """
+    return (end - start) * pct + start
+
+
+def stack_values(values: Sequence[float], like: Any) -> Any:
+    """
+    Stacks one value per schedule entry so that it broadcasts against like.
+
+    Args:
+        values (Sequence[float]): The values, e.g. one per parameter group.
+        like (Any): A NumPy array or torch tensor of progress values.
+
+    Returns:
+        Any: An array of shape (len(values), 1, ...) with the type, dtype and
+            device of like.
+    """
+    shape = (len(values),) + (1,) * like.ndim
+    values = [float(value) for value in values]
+    xp = array_namespace(like)
+    if xp is np:
+        return np.asarray(values, dtype=like.dtype).reshape(shape)
+    return xp.tensor(values, dtype=like.dtype, device=like.device).reshape(shape)
+
+
+def searchsorted(boundaries: Sequence[float], x: Any) -> Any:
+    """
+    Finds the interval of each value of x between sorted boundaries.
+
+    Args:
+        boundaries (Sequence[float]): Sorted interval boundaries.
+        x (Any): A NumPy array or torch tensor.
+
+    Returns:
+        Any: For each value v of x, the number of boundaries that are <= v.
+    """
+    xp = array_namespace(x)
+    if xp is np:
+        return np.searchsorted(boundaries, x, side="right")
+    boundaries = xp.tensor(boundaries, dtype=x.dtype, device=x.device)
+    return xp.searchsorted(boundaries, x, right=True)
@@ -0,0 +1,139 @@
+import csv
+import time
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+
+# the columns of a record besides the learning rates
+FIELDS = ("step", "progress", "wall_time", "duration")
+
+
+class StepHistory:
+    """
+    Records the last steps of a training in a fixed-size ring buffer.
+
+    Every record holds the step, the progress, the wall-clock time, the duration
+    of the instrumented call and the learning rate of each parameter group. The
+    records are written into preallocated NumPy arrays, so recording doesn't
+    allocate. Once the buffer is full, the oldest records are overwritten.
+
+    Args:
+        capacity (int): Number of records kept.
+        num_groups (int): Number of learning rates per record.
+        every (int): Only every every-th step is recorded, e.g. to cover a long
+            training with a small buffer. Default: 1.
+        clock (Callable[[], float]): Returns the wall-clock time in seconds.
+            Default: time.time.
+
+    Attributes:
+        num_steps (int): Number of steps seen, including the ones that were not
+            recorded.
+
+    Raises:
+        ValueError: If capacity or every is smaller than 1, or num_groups is
+            negative.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        num_groups: int,
+        every: int = 1,
+        clock: Callable[[], float] = time.time,
+    ):
+        if capacity < 1 or every < 1:
+            raise ValueError("capacity and every must be at least 1.")
+        if num_groups < 0:
+            raise ValueError("num_groups must not be negative.")
+
+        self.capacity = capacity
+        self.every = every
+        self.clock = clock
+        self.steps = np.zeros(capacity, dtype=np.int64)
+        self.progress = np.zeros(capacity)
+        self.wall_time = np.zeros(capacity)
+        self.duration = np.zeros(capacity)
+        self.lrs = np.zeros((capacity, num_groups))
+        self.num_steps = 0
+        # index of the next record and number of valid records
+        self._index = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def num_groups(self) -> int:
+        return self.lrs.shape[1]
+
+    def is_due(self) -> bool:
+        """Counts a step and returns whether it is recorded."""
+        num_steps = self.num_steps
+        self.num_steps = num_steps + 1
+        return num_steps % self.every == 0
+
+    def record(self, step: int, progress: float, lrs: Sequence[float], duration: float):
+        """
+        Writes a record, regardless of every.
+
+        Args:
+            step (int): The step of the training.
+            progress (float): The progress after the step.
+            lrs (Sequence[float]): The learning rate of each parameter group.
+            duration (float): Seconds spent in the instrumented call.
+        """
+        index = self._index
+        self.steps[index] = step
+        self.progress[index] = progress
+        self.wall_time[index] = self.clock()
+        self.duration[index] = duration
+        self.lrs[index] = lrs
+        index += 1
+        self._index = 0 if index == self.capacity else index
+        if self._size < self.capacity:
+            self._size += 1
+
+    def clear(self):
+        """Removes all records."""
+        self.num_steps = 0
+        self._index = 0
+        self._size = 0
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """
+        Returns copies of the records, from the oldest to the newest.
+
+        Returns:
+            Dict[str, np.ndarray]: "step", "progress", "wall_time" and "duration"
+                of shape (len(self),), and "lr" of shape (len(self), num_groups).
+        """
+        order = np.arange(self._index - self._size, self._index) % self.capacity
+        columns = {
+            "step": self.steps,
+            "progress": self.progress,
+            "wall_time": self.wall_time,
+            "duration": self.duration,
+            "lr": self.lrs,
+        }
+        return {name: column[order] for name, column in columns.items()}
+
+    def to_csv(self, path: str):
+        """
+        Writes the records to a CSV file, from the oldest to the newest.
+
+        The columns are step, progress, wall_time, duration and lr_0, lr_1, ...
+        with the learning rate of each parameter group.
+        """
+        records = self.to_numpy()
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                [*FIELDS, *(f"lr_{group}" for group in range(self.num_groups))]
+            )
+            writer.writerows(
+                [*row, *lrs]
+                for row, lrs in zip(
+                    zip(*(records[field].tolist() for field in FIELDS)),
+                    records["lr"].tolist(),
+                )
+            )
@@ -0,0 +1,115 @@
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Tuple
+
+import numpy as np
+
+# Maximum number of lookup tables that are kept alive for sharing
+MAX_SHARED_LOOKUP_TABLES = 16
+
+_shared_lookup_tables: "OrderedDict[Hashable, LookupTable]" = OrderedDict()
+
+
+class LookupTable:
+    """
+    A schedule sampled at equidistant progress values.
+
+    Values in between two samples are linearly interpolated. For a table with
+    n samples, the interpolation error of a schedule f is at most
+    max|f''| / (8 * (n - 1)^2), e.g. about 6e-9 * (base_lr - eta_min) for
+    CosineAnnealingLR with n = 10_001.
+
+    Args:
+        values (Any): Array of shape (num_param_groups, size) with the schedule
+            evaluated at np.linspace(0.0, 1.0, size).
+    """
+
+    def __init__(self, values: Any):
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] < 2:
+            raise ValueError("A lookup table needs at least two samples per group.")
+
+        self.size = values.shape[1]
+        self._last_index = self.size - 1
+
+        # Each interval is stored as offset + slope * position, so that a lookup
+        # is a single multiply-add. The last sample gets its own entry to
+        # answer progress 1.0 without clamping the index.
+        slopes = np.zeros_like(values)
+        slopes[:, :-1] = np.diff(values, axis=1)
+        offsets = values - slopes * np.arange(self.size)
+        self._rows: Tuple[Tuple[array, array], ...] = tuple(
+            (array("d", offset), array("d", slope))
+            for offset, slope in zip(offsets, slopes)
+        )
+        # single group tables skip the per-group loop
+        self._single_row = self._rows[0] if len(self._rows) == 1 else None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the table in bytes."""
+        return sum(
+            offset.itemsize * len(offset) + slope.itemsize * len(slope)
+            for offset, slope in self._rows
+        )
+
+    def lookup(self, training_progress: float) -> List[float]:
+        """
+        Interpolates the learning rates for a single progress value.
+
+        Args:
+            training_progress (float): Progress of the training
+                between 0.0 (start) and 1.0 (end).
+
+        Returns:
+            List[float]: Learning rates for each parameter group.
+
+        Raises:
+            ValueError: If training_progress is not between 0.0 and 1.0.
+        """
+        if not 0.0 <= training_progress <= 1.0:
+            raise ValueError("training_progress must be between 0.0 and 1.0.")
+
+        position = training_progress * self._last_index
+        index = int(position)
+        if self._single_row is not None:
+            offset, slope = self._single_row
+            return [offset[index] + slope[index] * position]
+        return [offset[index] + slope[index] * position for offset, slope in self._rows]
+
+
+def get_shared_lookup_table(
+    key: Hashable, size: int, sample: Callable[[Any], Any]
+) -> LookupTable:
+    """
+    Returns the lookup table for key, building it on first use.
+
+    Schedulers with the same configuration share one table. At most
+    MAX_SHARED_LOOKUP_TABLES tables are kept, the least recently used one
+    is dropped first.
+
+    Args:
+        key (Hashable): Identifies the schedule configuration.
+        size (int): Number of samples per parameter group.
+        sample (Callable[[Any], Any]): Evaluates the schedule for an array of
+            progress values, e.g. ProgressiveScheduler.get_lr_batch.
+
+    Returns:
+        LookupTable: The shared lookup table.
+
+    Raises:
+        ValueError: If size is smaller than 2.
+    """
+    if size < 2:
+        raise ValueError("lookup_table_size must be at least 2.")
+
+    key = (key, size)
+    table = _shared_lookup_tables.get(key)
+    if table is None:
+        table = LookupTable(sample(np.linspace(0.0, 1.0, size)))
+        _shared_lookup_tables[key] = table
+        if len(_shared_lookup_tables) > MAX_SHARED_LOOKUP_TABLES:
+            _shared_lookup_tables.popitem(last=False)
+    else:
+        _shared_lookup_tables.move_to_end(key)
+    return table
@@ -0,0 +1,198 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from progressive_scheduling.curriculum import Curriculum
+from progressive_scheduling.progress import (
+    ElapsedProgressEstimator,
+    ProgressEstimator,
+    ProgressSource,
+    create_budget_source,
+)
+
+if TYPE_CHECKING:
+    from progressive_scheduling.schedulers import ProgressiveScheduler
+
+# returned by next() once the batches are exhausted
+_END = object()
+
+
+def _prefetch(batches: Iterator) -> Iterator:
+    """Yields the items of batches, reading the next item in a background thread."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(next, batches, _END)
+        while True:
+            batch = future.result()
+            if batch is _END:
+                return
+            future = executor.submit(next, batches, _END)
+            yield batch
+
+
+class BudgetedLoop:
+    """
+    Iterates over a dataloader until a training budget is used up.
+
+    The plain PyTorch counterpart of AutoSchedulingCallback. Iterating yields
+    each batch together with the current training progress. Once the body of the
+    loop has finished a step, the loop updates the progress, steps the
+    schedulers and stops after the final step of the progress estimator. The
+    dataloader is iterated again for as many epochs as the budget lasts.
+
+    Example::
+
+        for batch, progress in BudgetedLoop(dataloader, scheduler, {"hours": 1}):
+            loss = model(batch).mean()
+            loss.backward()
+            optimizer.step()
+            optimizer.zero_grad()
+
+    Args:
+        dataloader (Iterable): The batches of one epoch.
+        schedulers (ProgressiveScheduler | Sequence[ProgressiveScheduler]): Stepped
+            with the progress after each step. Default: ().
+        training_duration (timedelta | dict | float, optional): The time budget,
+            floats are seconds.
+        progress_estimator (ProgressEstimator, optional): Turns the consumed budget
+            into training progress. Default: ElapsedProgressEstimator.
+        progress_source (ProgressSource, optional): Measures the budget, e.g. in
+            tokens. If training_duration is given as well, the training ends when
+            the first of both budgets runs out.
+        prefetch (bool): Whether the next batch is read in a background thread
+            while the current step and the scheduler update run. Helps with
+            dataloaders that load in the main process. Default: False.
+        curriculum (Curriculum, optional): Stepped with the progress before the
+            schedulers, at the start and after each step.
+
+    Attributes:
+        step (int): Number of finished steps.
+        epoch (int): Epoch of the last yielded batch, starting at 0.
+        progress (float): Progress after the last finished step.
+
+    Raises:
+        ValueError: If neither training_duration nor progress_source is given.
+    """
+
+    def __init__(
+        self,
+        dataloader: Iterable,
+        schedulers: Union[
+            "ProgressiveScheduler", Sequence["ProgressiveScheduler"]
+        ] = (),
+        training_duration: Optional[Union[timedelta, dict, float]] = None,
+        progress_estimator: Optional[ProgressEstimator] = None,
+        progress_source: Optional[ProgressSource] = None,
+        prefetch: bool = False,
+        curriculum: Optional[Curriculum] = None,
+    ):
+        if isinstance(training_duration, dict):
+            training_duration = timedelta(**training_duration)
+        if isinstance(training_duration, timedelta):
+            training_duration = training_duration.total_seconds()
+
+        self.dataloader = dataloader
+        if not isinstance(schedulers, (list, tuple)):
+            schedulers = [schedulers]
+        self.schedulers: List["ProgressiveScheduler"] = list(schedulers)
+        self.progress_source = create_budget_source(training_duration, progress_source)
+        self.progress_estimator = progress_estimator or ElapsedProgressEstimator()
+        self.prefetch = prefetch
+        self.curriculum = curriculum
+
+        self.step = 0
+        self.epoch = 0
+        self.progress = 0.0
+        # state loaded from a checkpoint, applied when the iteration starts
+        self._resumed_state: Optional[Dict[str, Any]] = None
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Returns the state needed to resume the loop, e.g. after a preemption."""
+        return {
+            "progress_source": self.progress_source.state_dict(),
+            "progress_estimator": self.progress_estimator.state_dict(),
+            "epoch": self.epoch,
+        }
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        """
+        Continues the budget of a state returned by state_dict() on the next
+        iteration.
+
+        Args:
+            state_dict (Dict[str, Any]): The saved state.
+        """
+        self._resumed_state = state_dict
+
+    def __iter__(self) -> Iterator[Tuple[Any, float]]:
+        if self._resumed_state is None:
+            self.progress_source.start()
+            self.progress_estimator.reset()
+            self.epoch = 0
+        else:
+            state, self._resumed_state = self._resumed_state, None
+            self.progress_source.load_state_dict(state["progress_source"])
+            self.progress_estimator.load_state_dict(state["progress_estimator"])
+            self.epoch = state["epoch"]
+        self.step = self.progress_estimator.step
+        self.progress = self.progress_estimator.progress
+        if self.curriculum is not None:
+            self.curriculum.reset()
+            self.curriculum.step(self.progress)
+
+        batches = self._epochs(self.epoch)
+        if self.prefetch:
+            batches = _prefetch(batches)
+
+        try:
+            for epoch, batch in batches:
+                self.epoch = epoch
+                yield batch, self.progress
+                if self._finish_step(batch):
+                    return
+        finally:
+            # stops the prefetching thread
+            batches.close()
+
+    def _epochs(self, epoch: int) -> Iterator[Tuple[int, Any]]:
+        """Yields the batches of all epochs from epoch on, with their epoch."""
+        while True:
+            is_empty = True
+            for batch in self.dataloader:
+                is_empty = False
+                yield epoch, batch
+            if is_empty:
+                return
+            epoch += 1
+
+    def _finish_step(self, batch: Any) -> bool:
+        """Updates the progress, steps the schedulers and returns whether to stop."""
+        self.step += 1
+        self.progress_source.update(batch)
+        estimator = self.progress_estimator
+        # e.g. a calibrated estimator only reads the clock every few steps
+        consumed = self.progress_source.consumed if estimator.needs_consumed else None
+        budget = self.progress_source.budget
+
+        self.progress = estimator.update(consumed, budget)
+        if self.curriculum is not None:
+            self.curriculum.step(self.progress)
+        for scheduler in self.schedulers:
+            scheduler.step(self.progress)
+
+        if estimator.is_final_step:
+            return True
+        if consumed is None:
+            return False
+        # with a distributed estimator, all ranks stop together at its final step
+        return not estimator.synchronizes_ranks and consumed > budget
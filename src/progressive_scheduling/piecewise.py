@@ -0,0 +1,420 @@
+import math
+from bisect import bisect_right
+from numbers import Real
+from typing import Any, Hashable, List, Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from progressive_scheduling.functional import (
+    annealing_cos,
+    annealing_linear,
+    array_namespace,
+    as_progress_array,
+    searchsorted,
+    stack_values,
+)
+
+Shape = Literal["constant", "linear", "cos"]
+Values = Union[float, Sequence[float]]
+
+SHAPES = ("constant", "linear", "cos")
+
+
+class Segment:
+    """
+    A closed-form piece of a PiecewiseSchedule.
+
+    Args:
+        start (float): Progress at which the segment starts.
+        end (float): Progress at which the segment ends, larger than start.
+        start_values (List[float]): Values at start, one per schedule entry.
+        end_values (List[float]): Values at end, one per schedule entry.
+        shape (Shape): How the values move from start to end, "constant" keeps
+            the start values.
+
+    Raises:
+        ValueError: If shape is unknown or the segment is empty.
+    """
+
+    def __init__(
+        self,
+        start: float,
+        end: float,
+        start_values: List[float],
+        end_values: List[float],
+        shape: Shape,
+    ):
+        if shape not in SHAPES:
+            raise ValueError(f"Unknown shape: {shape}")
+        if not end > start:
+            raise ValueError("A segment must end after it starts.")
+
+        self.start = start
+        self.end = end
+        self.start_values = start_values
+        self.end_values = end_values if shape != "constant" else start_values
+        self.shape = shape
+
+        self._inv_width = 1.0 / (end - start)
+        # several entries are computed in one vectorized pass
+        self._start_array = np.asarray(self.start_values)
+        self._delta_array = np.asarray(self.end_values) - self._start_array
+        self._end_array = np.asarray(self.end_values)
+
+        # pick the evaluation once, so that a step doesn't dispatch on the shape
+        single = len(start_values) == 1
+        if shape == "constant":
+            self.evaluate = self._evaluate_constant
+        elif shape == "cos":
+            self.evaluate = self._evaluate_cos_single if single else self._evaluate_cos
+        else:
+            self.evaluate = (
+                self._evaluate_linear_single if single else self._evaluate_linear
+            )
+
+    def key(self) -> Hashable:
+        return (
+            self.start,
+            self.end,
+            tuple(self.start_values),
+            tuple(self.end_values),
+            self.shape,
+        )
+
+    def evaluate(self, training_progress: float) -> List[float]:
+        """Evaluates the segment for a single progress value within it."""
+        # replaced by the evaluation for the shape in __init__
+        raise NotImplementedError
+
+    def _evaluate_constant(self, training_progress: float) -> List[float]:
+        return list(self.start_values)
+
+    def _evaluate_cos_single(self, training_progress: float) -> List[float]:
+        pct = (training_progress - self.start) * self._inv_width
+        start, end = self.start_values[0], self.end_values[0]
+        return [end + (start - end) * (1 + math.cos(math.pi * pct)) / 2]
+
+    def _evaluate_linear_single(self, training_progress: float) -> List[float]:
+        pct = (training_progress - self.start) * self._inv_width
+        start, end = self.start_values[0], self.end_values[0]
+        return [(end - start) * pct + start]
+
+    def _evaluate_cos(self, training_progress: float) -> List[float]:
+        pct = (training_progress - self.start) * self._inv_width
+        cos_out = 1 + math.cos(math.pi * pct)
+        return (self._end_array - self._delta_array * cos_out / 2).tolist()
+
+    def _evaluate_linear(self, training_progress: float) -> List[float]:
+        pct = (training_progress - self.start) * self._inv_width
+        return (self._delta_array * pct + self._start_array).tolist()
+
+    def evaluate_batch(self, progress: Any) -> Any:
+        """Evaluates the segment with array ops, also outside of its range."""
+        start_values = stack_values(self.start_values, progress)
+        if self.shape == "constant":
+            return start_values + 0.0 * progress
+
+        end_values = stack_values(self.end_values, progress)
+        pct = (progress - self.start) * self._inv_width
+        if self.shape == "cos":
+            return annealing_cos(start_values, end_values, pct)
+        return annealing_linear(start_values, end_values, pct)
+
+
+class PiecewiseSchedule:
+    """
+    A schedule compiled into sorted breakpoints with a closed-form segment each.
+
+    A schedule holds one or more entries, e.g. one learning rate per parameter
+    group. A single progress value is evaluated by finding its segment with a
+    binary search over the breakpoints, so the cost of a step doesn't grow with
+    the number of segments like chaining schedulers does.
+
+    Args:
+        segments (Sequence[Segment]): Segments that cover progress 0.0 to 1.0
+            without gaps, in order.
+
+    Raises:
+        ValueError: If the segments don't cover 0.0 to 1.0 without gaps or have
+            different numbers of entries.
+    """
+
+    def __init__(self, segments: Sequence[Segment]):
+        if not segments:
+            raise ValueError("A schedule needs at least one segment.")
+        if segments[0].start != 0.0 or segments[-1].end != 1.0:
+            raise ValueError("The segments must cover progress 0.0 to 1.0.")
+        for previous, segment in zip(segments, segments[1:]):
+            if segment.start != previous.end:
+                raise ValueError("The segments must not have gaps.")
+        if len({len(segment.start_values) for segment in segments}) != 1:
+            raise ValueError("All segments must have the same number of entries.")
+
+        self.segments = tuple(segments)
+        self.num_entries = len(segments[0].start_values)
+        # the breakpoints between segments, a value on one starts the next segment
+        self.breakpoints = [segment.start for segment in segments[1:]]
+        self._single_segment = segments[0] if len(segments) == 1 else None
+
+    def key(self) -> Hashable:
+        """Identifies the schedule, equal schedules have equal keys."""
+        return tuple(segment.key() for segment in self.segments)
+
+    def scaled(self, factors: Sequence[float]) -> "PiecewiseSchedule":
+        """
+        Returns the schedule with every entry multiplied by a factor.
+
+        Args:
+            factors (Sequence[float]): One factor per entry. A schedule with a
+                single entry is broadcast to all factors.
+
+        Returns:
+            PiecewiseSchedule: The scaled schedule.
+
+        Raises:
+            ValueError: If the number of factors doesn't match the entries.
+        """
+        factors = [float(factor) for factor in factors]
+        if self.num_entries not in (1, len(factors)):
+            raise ValueError(f"expected {self.num_entries} factors, got {len(factors)}")
+
+        def scale(values: List[float]) -> List[float]:
+            values = _broadcast(values, len(factors))
+            return [value * factor for value, factor in zip(values, factors)]
+
+        return PiecewiseSchedule(
+            [
+                Segment(
+                    segment.start,
+                    segment.end,
+                    scale(segment.start_values),
+                    scale(segment.end_values),
+                    segment.shape,
+                )
+                for segment in self.segments
+            ]
+        )
+
+    def __call__(self, training_progress: Any) -> List[Any]:
+        """
+        Evaluates the schedule for a single progress value.
+
+        Args:
+            training_progress (Any): Progress of the training between 0.0 (start)
+                and 1.0 (end), a real number or a 0-d tensor. Tensors are
+                evaluated with tensor ops and are not range checked.
+
+        Returns:
+            List[Any]: The value of each entry, 0-d tensors if training_progress
+                is a tensor.
+
+        Raises:
+            ValueError: If training_progress is not between 0.0 and 1.0.
+        """
+        if not isinstance(training_progress, (int, float)):
+            if not isinstance(training_progress, Real):
+                return list(self._evaluate_array(training_progress))
+            # e.g. NumPy scalars, which would give NumPy values
+            training_progress = float(training_progress)
+
+        if not 0.0 <= training_progress <= 1.0:
+            raise ValueError("training_progress must be between 0.0 and 1.0.")
+
+        if self._single_segment is not None:
+            return self._single_segment.evaluate(training_progress)
+        return self.segments[
+            bisect_right(self.breakpoints, training_progress)
+        ].evaluate(training_progress)
+
+    def evaluate_batch(self, training_progress: Any) -> Any:
+        """
+        Evaluates the schedule for many progress values in one vectorized call.
+
+        Args:
+            training_progress (Any): A sequence, NumPy array or torch tensor of
+                progress values between 0.0 (start) and 1.0 (end).
+
+        Returns:
+            Any: Values of shape (num_entries, *training_progress.shape). A torch
+                tensor if training_progress is a tensor, else a NumPy array.
+
+        Raises:
+            ValueError: If any progress value is not between 0.0 and 1.0.
+        """
+        return self._evaluate_array(as_progress_array(training_progress))
+
+    def _evaluate_array(self, progress: Any) -> Any:
+        if self._single_segment is not None:
+            return self._single_segment.evaluate_batch(progress)
+
+        xp = array_namespace(progress)
+        index = searchsorted(self.breakpoints, progress)
+        values = self.segments[0].evaluate_batch(progress)
+        for segment_index, segment in enumerate(self.segments[1:], 1):
+            values = xp.where(
+                index == segment_index, segment.evaluate_batch(progress), values
+            )
+        return values
+
+
+def _broadcast(values: Values, num_entries: int) -> List[float]:
+    """Returns num_entries values, a single value is repeated."""
+    if isinstance(values, (int, float)):
+        return [float(values)] * num_entries
+    values = [float(value) for value in values]
+    if len(values) == 1:
+        return values * num_entries
+    if len(values) != num_entries:
+        raise ValueError(f"expected {num_entries} values, got {len(values)}")
+    return values
+
+
+class ScheduleBuilder:
+    """
+    Declares a schedule as a sequence of segments.
+
+    Durations are shares of the training. Values are either a single float or
+    one float per entry, e.g. per parameter group. For example, a linear
+    warmup followed by a cosine decay to 10% of the peak:
+
+        ScheduleBuilder(start=0.0).warmup(0.05).cosine(0.95, to=0.1).build()
+
+    Args:
+        start (Values): The value at progress 0.0. Default: 0.0.
+    """
+
+    def __init__(self, start: Values = 0.0):
+        self._value = start
+        self._segments: List[Tuple[float, Shape, Values, Values]] = []
+
+    def segment(
+        self,
+        duration: float,
+        shape: Shape,
+        to: Optional[Values] = None,
+        start: Optional[Values] = None,
+    ) -> "ScheduleBuilder":
+        """
+        Appends a segment.
+
+        Args:
+            duration (float): Share of the training covered by the segment.
+                Segments with a duration of 0.0 are skipped.
+            shape (Shape): "constant", "linear" or "cos".
+            to (Values, optional): The value at the end of the segment. Default:
+                the value at its start.
+            start (Values, optional): The value at the start of the segment, to
+                jump from the previous value. Default: the previous value.
+
+        Returns:
+            ScheduleBuilder: self, to chain further segments.
+
+        Raises:
+            ValueError: If duration is negative or shape is unknown.
+        """
+        if duration < 0.0:
+            raise ValueError("duration must not be negative.")
+        if shape not in SHAPES:
+            raise ValueError(f"Unknown shape: {shape}")
+
+        start = self._value if start is None else start
+        to = start if to is None or shape == "constant" else to
+        if duration > 0.0:
+            self._segments.append((duration, shape, start, to))
+        self._value = to
+        return self
+
+    def warmup(
+        self, duration: float, to: Values = 1.0, shape: Shape = "linear"
+    ) -> "ScheduleBuilder":
+        """Appends a warmup that rises linearly, or with shape, to the peak."""
+        return self.segment(duration, shape, to)
+
+    def constant(
+        self, duration: float, value: Optional[Values] = None
+    ) -> "ScheduleBuilder":
+        """Appends a segment that holds value, by default the current value."""
+        return self.segment(duration, "constant", start=value)
+
+    def cosine(self, duration: float, to: Values = 0.0) -> "ScheduleBuilder":
+        """Appends a cosine annealing to the value to."""
+        return self.segment(duration, "cos", to)
+
+    def linear(self, duration: float, to: Values = 0.0) -> "ScheduleBuilder":
+        """Appends a linear annealing to the value to."""
+        return self.segment(duration, "linear", to)
+
+    def build(self) -> PiecewiseSchedule:
+        """
+        Compiles the segments into a schedule.
+
+        Returns:
+            PiecewiseSchedule: The compiled schedule.
+
+        Raises:
+            ValueError: If the durations don't add up to 1.0 or the values have
+                different numbers of entries.
+        """
+        total = sum(duration for duration, _, _, _ in self._segments)
+        if not math.isclose(total, 1.0, rel_tol=0.0, abs_tol=1e-9):
+            raise ValueError(f"The durations must add up to 1.0, got {total}.")
+
+        num_entries = max(
+            1 if isinstance(values, (int, float)) else len(values)
+            for _, _, start, to in self._segments
+            for values in (start, to)
+        )
+
+        segments = []
+        position = 0.0
+        for index, (duration, shape, start, to) in enumerate(self._segments):
+            # the last segment ends at exactly 1.0, whatever the rounding
+            end = 1.0 if index == len(self._segments) - 1 else position + duration
+            segments.append(
+                Segment(
+                    position,
+                    end,
+                    _broadcast(start, num_entries),
+                    _broadcast(to, num_entries),
+                    shape,
+                )
+            )
+            position = end
+        return PiecewiseSchedule(segments)
+
+
+def wsd_schedule(
+    warmup: float,
+    decay: float,
+    peak: Values = 1.0,
+    final: Values = 0.0,
+    decay_shape: Shape = "linear",
+) -> PiecewiseSchedule:
+    """
+    Builds a warmup-stable-decay schedule.
+
+    The values rise linearly from 0.0 to peak, stay at peak and decay to final
+    in the last part of the training.
+
+    Args:
+        warmup (float): Share of the training spent warming up.
+        decay (float): Share of the training spent decaying.
+        peak (Values): The value after the warmup. Default: 1.0.
+        final (Values): The value at the end of the training. Default: 0.0.
+        decay_shape (Shape): "linear" or "cos". Default: "linear".
+
+    Returns:
+        PiecewiseSchedule: The compiled schedule.
+
+    Raises:
+        ValueError: If warmup and decay add up to more than 1.0.
+    """
+    if warmup + decay > 1.0:
+        raise ValueError("warmup and decay must not add up to more than 1.0.")
+    return (
+        ScheduleBuilder(start=0.0)
+        .warmup(warmup, to=peak)
+        .constant(1.0 - warmup - decay)
+        .segment(decay, decay_shape, to=final)
+        .build()
+    )
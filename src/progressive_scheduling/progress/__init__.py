@@ -0,0 +1,39 @@
+from progressive_scheduling._lazy import lazy_attributes
+
+from .estimators import (
+    CalibratedProgressEstimator,
+    ElapsedProgressEstimator,
+    ProgressEstimator,
+    ThroughputProgressEstimator,
+)
+from .sources import (
+    CompositeSource,
+    CountSource,
+    FlopSource,
+    ProgressSource,
+    SampleSource,
+    TimeSource,
+    TokenSource,
+    create_budget_source,
+)
+
+# needs torch.distributed, which is only imported on first use
+__getattr__, __dir__ = lazy_attributes(
+    __name__, {"DistributedProgressEstimator": ".distributed"}
+)
+
+__all__ = [
+    "CalibratedProgressEstimator",
+    "CompositeSource",
+    "CountSource",
+    "DistributedProgressEstimator",
+    "ElapsedProgressEstimator",
+    "FlopSource",
+    "ProgressEstimator",
+    "ProgressSource",
+    "SampleSource",
+    "ThroughputProgressEstimator",
+    "TimeSource",
+    "TokenSource",
+    "create_budget_source",
+]
@@ -0,0 +1,157 @@
+from typing import Any, Dict, Optional
+
+import torch
+import torch.distributed as dist
+
+from progressive_scheduling.progress.estimators import ProgressEstimator
+
+
+class DistributedProgressEstimator(ProgressEstimator):
+    """
+    Makes all ranks follow the progress of a single source rank.
+
+    Every sync_every steps, the source rank broadcasts its progress, the
+    progress it expects per step and, if it falls into the next sync window, the
+    predicted final step. In between, all ranks (including the source rank)
+    extrapolate from the last broadcast, so there is no collective on every step.
+    Since every rank computes the progress from the same broadcast values, all
+    ranks set the same learning rates and agree on the final step.
+
+    If the source rank detects the end of the budget between two syncs, the
+    training stops at the next sync, i.e. it may overrun by up to sync_every
+    steps. Without an initialized process group, the wrapped estimator is synced
+    with itself, which allows using the same code for single process runs.
+
+    Args:
+        estimator (ProgressEstimator): Estimator that is updated on the source
+            rank, e.g. ThroughputProgressEstimator.
+        sync_every (int): Number of steps between two broadcasts. Default: 50.
+        src (int): Rank whose progress is the source of truth. Default: 0.
+        group (ProcessGroup, optional): Process group to broadcast in.
+            Default: the default process group.
+        device (torch.device, optional): Device of the broadcast tensor. Default:
+            the current CUDA device for the NCCL backend, else the CPU.
+
+    Raises:
+        ValueError: If sync_every is smaller than 1.
+    """
+
+    synchronizes_ranks = True
+
+    def __init__(
+        self,
+        estimator: ProgressEstimator,
+        sync_every: int = 50,
+        src: int = 0,
+        group: Optional["dist.ProcessGroup"] = None,
+        device: Optional[torch.device] = None,
+    ):
+        if sync_every < 1:
+            raise ValueError("sync_every must be at least 1.")
+
+        self.estimator = estimator
+        self.sync_every = sync_every
+        self.src = src
+        self.group = group
+        self.device = device
+        self.num_syncs = 0
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.estimator.reset()
+        self._synced_step = 0
+        self._synced_progress = 0.0
+        self._progress_per_step = 0.0
+        self._final_step: Optional[int] = None
+
+    def state_dict(self) -> Dict[str, Any]:
+        state = {
+            key: value
+            for key, value in self.__dict__.items()
+            if key not in ("estimator", "group", "device")
+        }
+        state["estimator"] = self.estimator.state_dict()
+        return state
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        state_dict = dict(state_dict)
+        self.estimator.load_state_dict(state_dict.pop("estimator"))
+        self.__dict__.update(state_dict)
+
+    @property
+    def is_distributed(self) -> bool:
+        return dist.is_available() and dist.is_initialized()
+
+    def update(self, consumed: float, budget: float) -> float:
+        self.step += 1
+
+        is_src = not self.is_distributed or dist.get_rank(self.group) == self.src
+        if is_src:
+            self.estimator.update(consumed, budget)
+
+        if self.step == 1 or self.step % self.sync_every == 0:
+            self._sync(is_src)
+
+        progress = self._synced_progress + self._progress_per_step * (
+            self.step - self._synced_step
+        )
+        self.progress = max(self.progress, min(progress, 1.0))
+
+        if self._final_step is not None and self.step >= self._final_step:
+            self.is_final_step = True
+            self.progress = 1.0
+        return self.progress
+
+    def _sync(self, is_src: bool):
+        """Broadcasts the state of the source rank's estimator to all ranks."""
+        state = torch.zeros(5, dtype=torch.float64, device=self._get_device())
+        if is_src:
+            state.copy_(torch.tensor(self._get_src_state(), dtype=torch.float64))
+        if self.is_distributed:
+            dist.broadcast(state, src=self.src, group=self.group)
+        self.num_syncs += 1
+
+        progress, progress_per_step, final_step, total_steps, remaining = state.tolist()
+        self._synced_step = self.step
+        self._synced_progress = progress
+        self._progress_per_step = progress_per_step
+        self._final_step = int(final_step) if final_step >= 0 else None
+        self.predicted_total_steps = int(total_steps) if total_steps >= 0 else None
+        self.remaining_budget = remaining
+
+    def _get_src_state(self):
+        estimator = self.estimator
+        total_steps = estimator.predicted_total_steps
+
+        if estimator.is_final_step:
+            final_step = self.step
+            progress_per_step = 0.0
+        elif total_steps is not None and total_steps > self.step:
+            progress_per_step = (1.0 - estimator.progress) / (total_steps - self.step)
+            # the final step falls into the next sync window
+            final_step = (
+                total_steps if total_steps - self.step < self.sync_every else -1
+            )
+        else:
+            # no prediction, continue at the rate since the last sync
+            steps = self.step - self._synced_step
+            progress_per_step = (
+                (estimator.progress - self._synced_progress) / steps if steps else 0.0
+            )
+            final_step = -1
+
+        return [
+            estimator.progress,
+            progress_per_step,
+            final_step,
+            total_steps if total_steps is not None else -1,
+            estimator.remaining_budget,
+        ]
+
+    def _get_device(self) -> torch.device:
+        if self.device is not None:
+            return self.device
+        if self.is_distributed and dist.get_backend(self.group) == "nccl":
+            return torch.device("cuda", torch.cuda.current_device())
+        return torch.device("cpu")
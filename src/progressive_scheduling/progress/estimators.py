@@ -0,0 +1,324 @@
+import math
+import statistics
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ProgressEstimator:
+    """
+    Turns the consumed share of a training budget into training progress.
+
+    The budget can be measured in any unit, e.g. seconds of training time.
+    update() is called once per training step and returns the progress that is
+    passed to ProgressiveScheduler.step().
+
+    Attributes:
+        step (int): Number of steps seen since the last reset.
+        progress (float): Progress returned by the last update.
+        is_final_step (bool): Whether the last step was the final one.
+        predicted_total_steps (Optional[int]): Predicted number of steps that fit
+            into the budget, None if the estimator doesn't predict steps.
+        remaining_budget (float): Budget left after the last update.
+        synchronizes_ranks (bool): Whether all ranks agree on the final step, so
+            that the budget of a single rank must not stop the training.
+        needs_consumed (bool): Whether the next update() needs the consumed
+            budget. If not, callers pass None instead of reading the progress
+            source, e.g. the clock.
+    """
+
+    synchronizes_ranks = False
+    needs_consumed = True
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Resets the estimator to the start of the training."""
+        self.step = 0
+        self.progress = 0.0
+        self.is_final_step = False
+        self.predicted_total_steps: Optional[int] = None
+        self.remaining_budget = math.inf
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Returns the state of the estimator, e.g. to resume the training."""
+        return dict(self.__dict__)
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        """
+        Loads a state returned by state_dict().
+
+        Args:
+            state_dict (Dict[str, Any]): The saved state.
+        """
+        self.__dict__.update(state_dict)
+
+    def update(self, consumed: float, budget: float) -> float:
+        """
+        Records a finished step and estimates the current progress.
+
+        Args:
+            consumed (float, optional): Budget consumed since the start of the
+                training, None if needs_consumed was False.
+            budget (float): Total budget of the training.
+
+        Returns:
+            float: Progress of the training between 0.0 (start) and 1.0 (end).
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+
+class ElapsedProgressEstimator(ProgressEstimator):
+    """
+    Uses the consumed share of the budget as progress.
+
+    This follows the budget exactly, so any jitter in the consumed budget, e.g.
+    slow batches or GC pauses, feeds straight into the learning rate. The final
+    step is the first one that finishes after the budget is used up.
+    """
+
+    def update(self, consumed: float, budget: float) -> float:
+        self.step += 1
+        self.remaining_budget = max(budget - consumed, 0.0)
+        self.progress = min(consumed / budget, 1.0)
+        self.is_final_step = consumed >= budget
+        return self.progress
+
+
+class ThroughputProgressEstimator(ProgressEstimator):
+    """
+    Derives step-based progress from the predicted number of steps in the budget.
+
+    The budget consumed per step is tracked with an exponential moving average.
+    From it, the estimator predicts how many more steps fit into the remaining
+    budget. Each step then advances the progress by an equal share of what is
+    left until 1.0, spread over the predicted remaining steps. Changes of the
+    prediction, e.g. after a long pause, are thereby spread over the rest of the
+    training instead of showing up as a jump. The progress never decreases and
+    is exactly 1.0 at the final step, which is the last one before the remaining
+    budget becomes smaller than the cost of another step.
+
+    Args:
+        smoothing (float): Weight of the previous estimate in the moving average
+            of the step cost, between 0.0 (no smoothing) and 1.0. Default: 0.9.
+        outlier_factor (float): Step costs above outlier_factor times the current
+            estimate are clipped before they enter the moving average, so single
+            slow batches don't shift the prediction. Default: 3.0.
+
+    Raises:
+        ValueError: If smoothing is not in [0.0, 1.0) or outlier_factor < 1.0.
+    """
+
+    def __init__(self, smoothing: float = 0.9, outlier_factor: float = 3.0):
+        if not 0.0 <= smoothing < 1.0:
+            raise ValueError("smoothing must be between 0.0 and 1.0.")
+        if outlier_factor < 1.0:
+            raise ValueError("outlier_factor must be at least 1.0.")
+
+        self.smoothing = smoothing
+        self.outlier_factor = outlier_factor
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.step_cost: Optional[float] = None
+        self._last_consumed = 0.0
+
+    def update(self, consumed: float, budget: float) -> float:
+        self.step += 1
+        step_cost = consumed - self._last_consumed
+        self._last_consumed = consumed
+
+        if not self.step_cost:
+            # seed the estimate with the first positive sample, e.g. if the
+            # clock is too coarse to measure the first step
+            self.step_cost = step_cost
+        else:
+            step_cost = min(step_cost, self.outlier_factor * self.step_cost)
+            self.step_cost = (
+                self.smoothing * self.step_cost + (1 - self.smoothing) * step_cost
+            )
+
+        self.remaining_budget = max(budget - consumed, 0.0)
+        if self.remaining_budget <= self.step_cost:
+            # another step would exceed the budget
+            self.is_final_step = True
+            self.predicted_total_steps = self.step
+            self.progress = 1.0
+        elif self.step_cost > 0.0:
+            remaining_steps = int(self.remaining_budget // self.step_cost)
+            self.predicted_total_steps = self.step + remaining_steps
+            self.progress += (1.0 - self.progress) / (remaining_steps + 1)
+        return self.progress
+
+
+class CalibratedProgressEstimator(ProgressEstimator):
+    """
+    Turns the budget into a fixed number of steps, planned from a calibration.
+
+    The first warmup_steps steps are not measured, e.g. to skip compilation and
+    autotuning. The next calibration_steps steps, or the steps until they
+    consumed calibration_budget, give the mean step cost and a confidence
+    interval for it. The plan is the number of steps that fit into the rest of
+    the budget at the upper bound of the step cost. From then on, the progress
+    only depends on the step, so the learning rates are reproducible, and the
+    consumed budget is only needed every check_every steps. Until the plan is
+    made, the progress stays 0.0.
+
+    Every check_every steps, a drift guard compares the mean step cost since the
+    last check with the confidence interval for that many steps, widened by
+    tolerance. If it lies outside, e.g. because the throughput changed, the rest
+    of the budget is planned again with the recent step cost. The progress then
+    continues from its current value, spread over the new remaining steps. The
+    final step is the last planned one, or the first check after the budget is
+    used up.
+
+    Args:
+        warmup_steps (int): Steps before the calibration. Default: 5.
+        calibration_steps (int): Number of measured steps. Default: 50.
+        calibration_budget (float, optional): If set, the calibration ends
+            earlier, once the measured steps consumed this much budget, e.g.
+            seconds. At least two steps are measured. Default: None.
+        confidence (float): Confidence level of the interval of the step cost.
+            Default: 0.99.
+        check_every (int): Steps between two checks of the step cost.
+            Default: 100.
+        tolerance (float): Relative widening of the interval before the drift
+            guard plans again. Default: 0.05.
+
+    Attributes:
+        step_cost (Optional[float]): Mean step cost of the plan.
+        step_cost_bounds (Optional[Tuple[float, float]]): Confidence interval of
+            the mean step cost over the measured steps.
+        num_plans (int): Number of plans made, more than one after a drift.
+
+    Raises:
+        ValueError: If warmup_steps is negative, calibration_steps is smaller
+            than 2, confidence is not between 0.0 and 1.0, check_every is
+            smaller than 1 or tolerance is negative.
+    """
+
+    def __init__(
+        self,
+        warmup_steps: int = 5,
+        calibration_steps: int = 50,
+        calibration_budget: Optional[float] = None,
+        confidence: float = 0.99,
+        check_every: int = 100,
+        tolerance: float = 0.05,
+    ):
+        if warmup_steps < 0:
+            raise ValueError("warmup_steps must not be negative.")
+        if calibration_steps < 2:
+            raise ValueError("calibration_steps must be at least 2.")
+        if not 0.0 < confidence < 1.0:
+            raise ValueError("confidence must be between 0.0 and 1.0.")
+        if check_every < 1:
+            raise ValueError("check_every must be at least 1.")
+        if tolerance < 0.0:
+            raise ValueError("tolerance must not be negative.")
+
+        self.warmup_steps = warmup_steps
+        self.calibration_steps = calibration_steps
+        self.calibration_budget = calibration_budget
+        self.confidence = confidence
+        self.check_every = check_every
+        self.tolerance = tolerance
+        # two-sided z-value of the confidence level
+        self._z = statistics.NormalDist().inv_cdf((1.0 + confidence) / 2.0)
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.needs_consumed = True
+        self.step_cost: Optional[float] = None
+        self.step_cost_bounds: Optional[Tuple[float, float]] = None
+        self.num_plans = 0
+        self._samples: List[float] = []
+        # standard deviation of a single step cost, from the calibration
+        self._step_cost_std = 0.0
+        # budget consumed after the last measured step or check
+        self._last_consumed = 0.0
+        self._last_check_step = 0
+        # step and progress when the plan was made
+        self._plan_step = 0
+        self._plan_progress = 0.0
+
+    def update(self, consumed: Optional[float], budget: float) -> float:
+        self.step += 1
+        total_steps = self.predicted_total_steps
+        if total_steps is not None and self.step < total_steps:
+            self.progress = self._plan_progress + (1.0 - self._plan_progress) * (
+                self.step - self._plan_step
+            ) / (total_steps - self._plan_step)
+
+        if self.step_cost is None:
+            self._calibrate(consumed, budget)
+        elif self.step - self._last_check_step >= self.check_every:
+            self._check_drift(consumed, budget)
+
+        if (
+            self.predicted_total_steps is not None
+            and self.step >= self.predicted_total_steps
+        ):
+            self.is_final_step = True
+            self.progress = 1.0
+
+        self.needs_consumed = (
+            self.step_cost is None
+            or self.step + 1 - self._last_check_step >= self.check_every
+        )
+        return self.progress
+
+    def _calibrate(self, consumed: float, budget: float):
+        """Records the cost of a calibration step and plans once it's done."""
+        self.remaining_budget = max(budget - consumed, 0.0)
+        if self.step > self.warmup_steps:
+            self._samples.append(consumed - self._last_consumed)
+        self._last_consumed = consumed
+
+        samples = self._samples
+        done = len(samples) >= self.calibration_steps or (
+            self.calibration_budget is not None
+            and len(samples) >= 2
+            and sum(samples) >= self.calibration_budget
+        )
+        if self.remaining_budget == 0.0:
+            # the budget ran out during the calibration
+            self.predicted_total_steps = self.step
+        elif done and statistics.fmean(samples) > 0.0:
+            # with a clock too coarse for the steps, the calibration continues
+            self._step_cost_std = statistics.stdev(samples)
+            self._plan(statistics.fmean(samples), len(samples))
+
+    def _check_drift(self, consumed: float, budget: float):
+        """Plans again if the recent step cost left the confidence interval."""
+        self.remaining_budget = max(budget - consumed, 0.0)
+        num_steps = self.step - self._last_check_step
+        step_cost = (consumed - self._last_consumed) / num_steps
+        self._last_consumed = consumed
+        self._last_check_step = self.step
+
+        if self.remaining_budget == 0.0:
+            self.predicted_total_steps = self.step
+            return
+        half_width = self._z * self._step_cost_std / math.sqrt(num_steps)
+        lower = (self.step_cost - half_width) * (1.0 - self.tolerance)
+        upper = (self.step_cost + half_width) * (1.0 + self.tolerance)
+        if step_cost > 0.0 and not lower <= step_cost <= upper:
+            self._plan(step_cost, num_steps)
+
+    def _plan(self, step_cost: float, num_samples: int):
+        """Plans the remaining steps at the upper bound of the step cost."""
+        half_width = self._z * self._step_cost_std / math.sqrt(num_samples)
+        self.step_cost = step_cost
+        self.step_cost_bounds = (
+            max(step_cost - half_width, 0.0),
+            step_cost + half_width,
+        )
+        self.num_plans += 1
+        self._last_check_step = self.step
+        self._plan_step = self.step
+        self._plan_progress = self.progress
+
+        remaining_steps = int(self.remaining_budget // self.step_cost_bounds[1])
+        self.predicted_total_steps = self.step + remaining_steps
@@ -0,0 +1,384 @@
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class ProgressSource:
+    """
+    Measures how much of a training budget has been consumed.
+
+    update() is called once per training step with the step's batch. The
+    consumed budget and the budget share a unit, e.g. seconds or tokens.
+
+    Attributes:
+        budget (float): Total budget of the training.
+    """
+
+    budget: float
+
+    def start(self):
+        """Starts measuring at the beginning of the training."""
+
+    def update(self, batch: Any = None):
+        """
+        Records a finished training step.
+
+        Args:
+            batch (Any): The batch of the step. Default: None.
+        """
+
+    def pause(self):
+        """Stops counting time until resume(), e.g. during validation."""
+
+    def resume(self):
+        """Continues counting time after pause()."""
+
+    def state_dict(self) -> Dict[str, Any]:
+        """
+        Returns the state needed to continue measuring after a restart.
+
+        Sources without state start over after a restart.
+        """
+        return {}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        """
+        Continues measuring from a state returned by state_dict().
+
+        Replaces start() when a training is resumed.
+
+        Args:
+            state_dict (Dict[str, Any]): The saved state.
+        """
+        self.start()
+
+    @property
+    def consumed(self) -> float:
+        """Budget consumed since start()."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    @property
+    def fraction(self) -> float:
+        """Consumed share of the budget, 1.0 or more once the budget is used up."""
+        return self.consumed / self.budget
+
+    @property
+    def is_exhausted(self) -> bool:
+        """Whether the budget is used up."""
+        return self.consumed >= self.budget
+
+
+class TimeSource(ProgressSource):
+    """
+    Measures the wall-clock time since the start of the training.
+
+    Time between pause() and resume() is not counted. When a training is resumed
+    from a checkpoint, the time continues from the time saved in the checkpoint.
+    The downtime between saving and resuming counts as well, unless
+    exclude_downtime is set.
+
+    Args:
+        duration (float): The time budget in seconds.
+        clock (Callable[[], float]): Returns the current time in seconds.
+            Default: time.monotonic.
+        exclude_downtime (bool): Whether the time between saving a checkpoint
+            and resuming from it doesn't count against the budget.
+            Default: False.
+        wall_clock (Callable[[], float]): Returns the time in seconds since the
+            epoch, to measure the downtime across processes. Default: time.time.
+    """
+
+    def __init__(
+        self,
+        duration: float,
+        clock: Callable[[], float] = time.monotonic,
+        exclude_downtime: bool = False,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.budget = duration
+        self.clock = clock
+        self.exclude_downtime = exclude_downtime
+        self.wall_clock = wall_clock
+        self.start()
+
+    def start(self):
+        self.start_time = self.clock()
+        # time consumed before the training was resumed
+        self._resumed_consumed = 0.0
+        self._paused_at: Optional[float] = None
+        self._paused_time = 0.0
+
+    def pause(self):
+        if self._paused_at is None:
+            self._paused_at = self.clock()
+
+    def resume(self):
+        if self._paused_at is not None:
+            self._paused_time += self.clock() - self._paused_at
+            self._paused_at = None
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"consumed": self.consumed, "saved_at": self.wall_clock()}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.start()
+        self._resumed_consumed = state_dict["consumed"]
+        if not self.exclude_downtime:
+            downtime = self.wall_clock() - state_dict["saved_at"]
+            self._resumed_consumed += max(downtime, 0.0)
+
+    @property
+    def consumed(self) -> float:
+        now = self.clock() if self._paused_at is None else self._paused_at
+        return self._resumed_consumed + now - self.start_time - self._paused_time
+
+
+def _get_batch_size(batch: Any) -> int:
+    """Returns the size of the first dimension of the first tensor in batch."""
+    if isinstance(batch, dict):
+        batch = next(iter(batch.values()))
+    elif isinstance(batch, (list, tuple)):
+        batch = batch[0]
+    return batch.shape[0]
+
+
+def _get_num_tokens(batch: Any) -> Any:
+    """
+    Returns the number of tokens in batch.
+
+    For dicts with an attention_mask, padding is not counted and the count is
+    returned as tensor, so that it can stay on the device.
+    """
+    if isinstance(batch, dict):
+        if "attention_mask" in batch:
+            return batch["attention_mask"].sum()
+        batch = (
+            batch["input_ids"] if "input_ids" in batch else next(iter(batch.values()))
+        )
+    elif isinstance(batch, (list, tuple)):
+        batch = batch[0]
+    return batch.numel()
+
+
+class CountSource(ProgressSource):
+    """
+    Measures a budget by counting, e.g., samples or tokens per step.
+
+    Counts can be Python numbers or tensors. Tensor counts are summed where they
+    live, e.g. on the GPU, and are only read back every sync_every steps, so that
+    counting doesn't add a host sync to every step. In between, the consumed
+    budget is extrapolated with the mean count per step.
+
+    Args:
+        budget (float): Total budget, in counted units.
+        count (Callable[[Any], Any]): Returns the count of a batch.
+        sync_every (int): Number of steps between two reads of tensor counts.
+            Default: 1.
+        scale (float): Budget consumed per counted unit. Default: 1.0.
+
+    Raises:
+        ValueError: If sync_every is smaller than 1.
+    """
+
+    def __init__(
+        self,
+        budget: float,
+        count: Callable[[Any], Any],
+        sync_every: int = 1,
+        scale: float = 1.0,
+    ):
+        if sync_every < 1:
+            raise ValueError("sync_every must be at least 1.")
+
+        self.budget = budget
+        self.count = count
+        self.sync_every = sync_every
+        self.scale = scale
+        self.start()
+
+    def start(self):
+        self.step = 0
+        self._synced_step = 0
+        self._synced_count = 0.0
+        self._pending: Optional[Any] = None
+
+    def update(self, batch: Any = None):
+        self.step += 1
+        count = self.count(batch)
+        self._pending = count if self._pending is None else self._pending + count
+
+        if isinstance(count, (int, float)) or self.step % self.sync_every == 0:
+            self.sync()
+
+    def sync(self):
+        """Reads back the counts that were accumulated since the last sync."""
+        if self._pending is not None:
+            pending = self._pending
+            self._synced_count += (
+                pending if isinstance(pending, (int, float)) else pending.item()
+            )
+            self._pending = None
+        self._synced_step = self.step
+
+    def state_dict(self) -> Dict[str, Any]:
+        self.sync()
+        return {"step": self.step, "count": self._synced_count}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.start()
+        self.step = self._synced_step = state_dict["step"]
+        self._synced_count = state_dict["count"]
+
+    @property
+    def consumed(self) -> float:
+        count = self._synced_count
+        if self.step > self._synced_step and self._synced_step > 0:
+            # extrapolate the counts that haven't been read back yet
+            count += count / self._synced_step * (self.step - self._synced_step)
+        return count * self.scale
+
+
+class SampleSource(CountSource):
+    """
+    Measures the number of training samples.
+
+    Args:
+        total_samples (int): The sample budget.
+        count (Callable[[Any], Any], optional): Returns the number of samples in
+            a batch. Default: the size of the first dimension of the first tensor.
+        sync_every (int): Number of steps between two reads of tensor counts.
+            Default: 1.
+    """
+
+    def __init__(
+        self,
+        total_samples: int,
+        count: Optional[Callable[[Any], Any]] = None,
+        sync_every: int = 1,
+    ):
+        super().__init__(total_samples, count or _get_batch_size, sync_every)
+
+
+class TokenSource(CountSource):
+    """
+    Measures the number of training tokens.
+
+    Args:
+        total_tokens (int): The token budget.
+        count (Callable[[Any], Any], optional): Returns the number of tokens in
+            a batch. Default: the sum of the attention_mask if the batch has one,
+            else the number of elements of input_ids or of the first tensor.
+        sync_every (int): Number of steps between two reads of tensor counts.
+            Default: 1.
+    """
+
+    def __init__(
+        self,
+        total_tokens: int,
+        count: Optional[Callable[[Any], Any]] = None,
+        sync_every: int = 1,
+    ):
+        super().__init__(total_tokens, count or _get_num_tokens, sync_every)
+
+
+class FlopSource(CountSource):
+    """
+    Measures the estimated number of training FLOPs from the number of tokens.
+
+    Args:
+        total_flops (float): The FLOP budget.
+        flops_per_token (float): Estimated training FLOPs per token, e.g. about
+            6 * num_parameters for transformers.
+        count (Callable[[Any], Any], optional): Returns the number of tokens in
+            a batch. Default: same as TokenSource.
+        sync_every (int): Number of steps between two reads of tensor counts.
+            Default: 1.
+    """
+
+    def __init__(
+        self,
+        total_flops: float,
+        flops_per_token: float,
+        count: Optional[Callable[[Any], Any]] = None,
+        sync_every: int = 1,
+    ):
+        super().__init__(
+            total_flops, count or _get_num_tokens, sync_every, scale=flops_per_token
+        )
+
+
+class CompositeSource(ProgressSource):
+    """
+    Combines several budgets, the training ends when the first one runs out.
+
+    The consumed budget is the largest consumed share of all sources, so the
+    budget of a CompositeSource is 1.0.
+
+    Args:
+        *sources (ProgressSource): The combined sources.
+
+    Raises:
+        ValueError: If no source is given.
+    """
+
+    def __init__(self, *sources: ProgressSource):
+        if not sources:
+            raise ValueError("At least one source must be provided")
+
+        self.sources = sources
+        self.budget = 1.0
+
+    def start(self):
+        for source in self.sources:
+            source.start()
+
+    def update(self, batch: Any = None):
+        for source in self.sources:
+            source.update(batch)
+
+    def pause(self):
+        for source in self.sources:
+            source.pause()
+
+    def resume(self):
+        for source in self.sources:
+            source.resume()
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"sources": [source.state_dict() for source in self.sources]}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        for source, source_state in zip(self.sources, state_dict["sources"]):
+            source.load_state_dict(source_state)
+
+    @property
+    def consumed(self) -> float:
+        return max(source.fraction for source in self.sources)
+
+
+def create_budget_source(
+    training_duration: Optional[float] = None,
+    progress_source: Optional[ProgressSource] = None,
+    exclude_downtime: bool = False,
+) -> ProgressSource:
+    """
+    Returns the source that measures a time budget, another budget or both.
+
+    Args:
+        training_duration (float, optional): The time budget in seconds.
+        progress_source (ProgressSource, optional): Measures another budget, e.g.
+            in tokens. With a time budget as well, the training ends when the
+            first of both budgets runs out.
+        exclude_downtime (bool): Forwarded to the TimeSource. Default: False.
+
+    Raises:
+        ValueError: If neither training_duration nor progress_source is given.
+    """
+    if training_duration is None:
+        if progress_source is None:
+            raise ValueError("training_duration or progress_source must be provided")
+        return progress_source
+
+    time_source = TimeSource(training_duration, exclude_downtime=exclude_downtime)
+    if progress_source is None:
+        return time_source
+    return CompositeSource(time_source, progress_source)
@@ -1,5 +1,13 @@
 from .base import ProgressiveScheduler
 from .cosine_annealing import CosineAnnealingLR
+from .group import SchedulerGroup
 from .one_cycle import OneCycleLR
+from .piecewise import PiecewiseLR
 
-__all__ = ["ProgressiveScheduler", "CosineAnnealingLR", "OneCycleLR"]
+__all__ = [
+    "ProgressiveScheduler",
+    "CosineAnnealingLR",
+    "OneCycleLR",
+    "PiecewiseLR",
+    "SchedulerGroup",
+]
@@ -1,10 +1,67 @@
+import math
+import time
 import warnings
-from typing import List, Optional
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Union
 
+import numpy as np
 from torch import Tensor
+from torch.autograd import profiler as autograd_profiler
 from torch.optim import Optimizer
 from torch.optim.lr_scheduler import LRScheduler
 
+from progressive_scheduling.functional import annealing_cos
+from progressive_scheduling.history import StepHistory
+from progressive_scheduling.lookup_table import LookupTable, get_shared_lookup_table
+from progressive_scheduling.piecewise import PiecewiseSchedule
+
+
+def _format_param(
+    name: str, optimizer: Optimizer, param: Union[float, Sequence[float]]
+) -> List[float]:
+    """Return one value per parameter group."""
+    if isinstance(param, (list, tuple)):
+        if len(param) != len(optimizer.param_groups):
+            raise ValueError(
+                f"expected {len(optimizer.param_groups)} values for {name}, "
+                f"got {len(param)}"
+            )
+        return [float(value) for value in param]
+    return [float(param)] * len(optimizer.param_groups)
+
+
+def _get_base_lrs(optimizer: Optimizer, last_epoch: int = -1) -> List[float]:
+    """Return the base learning rates that LRScheduler.__init__ will read."""
+    key = "lr" if last_epoch == -1 else "initial_lr"
+    return [float(group[key]) for group in optimizer.param_groups]
+
+
+def _set_hyperparameter(
+    param_group: Dict[str, Any], name: str, value: Any, host_sync: bool = True
+):
+    """
+    Write a hyperparameter into a parameter group.
+
+    Tensor hyperparameters are updated in place. For "betas", only the first
+    entry is replaced. Without host_sync, a tensor value for a float
+    hyperparameter is not written.
+    """
+    current = param_group[name][0] if name == "betas" else param_group[name]
+    if isinstance(current, Tensor):
+        if isinstance(value, Tensor):
+            current.copy_(value)
+        else:
+            current.fill_(value)
+        return
+
+    if isinstance(value, Tensor):
+        if not host_sync:
+            return
+        value = value.item()
+    if name == "betas":
+        param_group["betas"] = (value, *param_group["betas"][1:])
+    else:
+        param_group[name] = value
+
 
 class _enable_get_lr_call:
     def __init__(self, scheduler: LRScheduler):
@@ -19,24 +76,382 @@ class _enable_get_lr_call:
 
 
 class ProgressiveScheduler(LRScheduler):
-    def __init__(self, optimizer: Optimizer, last_epoch: int = -1):
+    """
+    Base class for learning rate schedulers driven by training progress.
+
+    Subclasses compile their schedule into a PiecewiseSchedule in
+    _build_schedules(), or override get_lr, get_lr_batch and _lookup_table_key.
+
+    Args:
+        optimizer (Optimizer): Wrapped optimizer.
+        last_epoch (int): The index of the last step. Default: -1.
+        lookup_table_size (int, optional): If set, the schedule is sampled at this
+            many equidistant progress values at construction and step() answers
+            by linear interpolation instead of evaluating the schedule. The other
+            scheduled hyperparameters, like the momentum, get tables as well.
+            Schedulers with the same configuration share their tables.
+            Default: None.
+        lr_rtol (float, optional): If set, step() skips writing the learning rate
+            of a parameter group whose new value differs from the last written one
+            by at most lr_rtol times the last value. Default: None.
+        lr_levels (int, optional): If set, float progress is rounded down to a
+            multiple of 1 / lr_levels, so the learning rates change at most
+            lr_levels times. Steps that stay on the same level don't touch the
+            optimizer at all. Default: None.
+        final_weight_decay (Union[float, Sequence[float]], optional): If set, the
+            weight decay of each parameter group is annealed with a cosine from its
+            initial value to final_weight_decay, either one value for all groups
+            or one per group. It is written in the same pass as the learning rate.
+            Default: None.
+
+    Attributes:
+        last_progress (float): The last float progress passed to step(). It is
+            part of the state dict, so a resumed training can continue from it.
+        lr_scale (float): Factor of the scheduled learning rates, e.g. to follow
+            a batch size ramp of a Curriculum. A new value is written by the
+            next step(), even if the lr_levels level is unchanged. Default: 1.0.
+        history (StepHistory, optional): The recorded steps, None unless
+            enable_instrumentation() was called.
+
+    Raises:
+        ValueError: If lr_rtol is negative, lr_levels is smaller than 1, or
+            final_weight_decay is set for an optimizer without weight decay.
+    """
+
+    def __init__(
+        self,
+        optimizer: Optimizer,
+        last_epoch: int = -1,
+        lookup_table_size: Optional[int] = None,
+        lr_rtol: Optional[float] = None,
+        lr_levels: Optional[int] = None,
+        final_weight_decay: Optional[Union[float, Sequence[float]]] = None,
+    ):
+        if lr_rtol is not None and lr_rtol < 0.0:
+            raise ValueError("lr_rtol must not be negative.")
+        if lr_levels is not None and lr_levels < 1:
+            raise ValueError("lr_levels must be at least 1.")
+
+        self.lr_rtol = lr_rtol
+        self.lr_levels = lr_levels
+
+        self.base_weight_decays: Optional[List[float]] = None
+        self.final_weight_decays: Optional[List[float]] = None
+        if final_weight_decay is not None:
+            if "weight_decay" not in optimizer.defaults:
+                raise ValueError(
+                    "optimizer must support weight_decay with final_weight_decay set."
+                )
+            self.base_weight_decays = [
+                float(group["weight_decay"]) for group in optimizer.param_groups
+            ]
+            self.final_weight_decays = _format_param(
+                "final_weight_decay", optimizer, final_weight_decay
+            )
+
+        self._lookup_table: Optional[LookupTable] = None
+        # tables of the other scheduled hyperparameters, by parameter group key
+        self._hyperparameter_tables: Dict[str, LookupTable] = {}
+        self._lookup_table_size = lookup_table_size
+        # last learning rate written to each group as float, None if unknown
+        self._written_lrs: List[Optional[float]] = []
+        # level and lr_scale of the last written learning rates with lr_levels
+        self._last_level: Optional[float] = None
+        self._last_level_scale: Optional[float] = None
+        # last float progress passed to step(), saved in the state dict
+        self.last_progress = 0.0
+        self.lr_scale = 1.0
         super().__init__(optimizer, last_epoch, verbose="deprecated")
+        self._build_lookup_tables()
+
+    def _initial_step(self):
+        # tensor learning rates are read once, so that float progress is computed
+        # and compared with Python floats instead of tensor ops
+        self.base_lrs = [float(base_lr) for base_lr in self.base_lrs]
+        super()._initial_step()
+
+    # attributes that are derived from the configuration and not saved
+    _derived_attributes = (
+        "_lookup_table",
+        "_hyperparameter_tables",
+        "_lookup_table_size",
+        "_lr_schedule",
+    )
+
+    _lr_schedule: Optional[PiecewiseSchedule] = None
+
+    # attributes of the instrumentation, not saved either
+    _instrumentation_attributes = ("history", "step")
+
+    history: Optional[StepHistory] = None
+
+    def _build_schedules(self):
+        """Compile the schedules, called again after loading a state dict."""
+
+    def _build_lookup_tables(self):
+        """Sample the learning rates and hyperparameters into lookup tables."""
+        size = self._lookup_table_size
+        if size is None:
+            return
+        self._lookup_table = get_shared_lookup_table(
+            self._lookup_table_key(), size, self.get_lr_batch
+        )
+        key = self._hyperparameters_key()
+        self._hyperparameter_tables = {
+            name: get_shared_lookup_table(
+                (key, name),
+                size,
+                lambda progress, name=name: self._get_hyperparameters_batch(progress)[
+                    name
+                ],
+            )
+            for name in self._get_hyperparameters(0.0)
+        }
+
+    def get_lr(self, training_progress: Union[float, Tensor]) -> List[Any]:
+        """
+        Compute learning rate based on the current progression of the training.
+
+        Args:
+            training_progress (Union[float, Tensor]): Progress of the training
+                between 0.0 (start) and 1.0 (end). A 0-d tensor is evaluated with
+                tensor ops and is not range checked, so the learning rate never
+                has to be copied to the host.
+
+        Returns:
+            List[Any]: Learning rates for each parameter group, 0-d tensors if
+                training_progress is a tensor.
+
+        Raises:
+            ValueError: If training_progress is not between 0.0 and 1.0.
+        """
+        if self._lr_schedule is None:
+            raise NotImplementedError("Subclasses must implement this method.")
+        return self._lr_schedule(training_progress)
+
+    def get_lr_batch(self, training_progress: Any) -> Any:
+        """
+        Compute the learning rates for many progress values in one vectorized call.
+
+        Unlike step(), this does not modify the optimizer or the scheduler.
+
+        Args:
+            training_progress (Any): A sequence, NumPy array or torch tensor of
+                progress values between 0.0 (start) and 1.0 (end).
+
+        Returns:
+            Any: Learning rates of shape (num_param_groups, *training_progress.shape).
+                A torch tensor if training_progress is a tensor, else a NumPy array.
 
-    def get_lr(self, training_progress: float) -> List[float]:
-        """Compute learning rate based on the current progression of the training."""
-        raise NotImplementedError("Subclasses must implement this method.")
+        Raises:
+            ValueError: If any progress value is not between 0.0 and 1.0.
+        """
+        if self._lr_schedule is None:
+            raise NotImplementedError("Subclasses must implement this method.")
+        return self._lr_schedule.evaluate_batch(training_progress)
 
-    def step(self, training_progress: Optional[float] = 0.0):
-        """Perform a step."""
-        self._check_optimizer_step_order()
+    def _get_hyperparameters(self, training_progress: Any) -> Dict[str, List[Any]]:
+        """
+        Compute the hyperparameters that are scheduled along with the learning rate.
+
+        Args:
+            training_progress (Any): Progress of the training, a float or 0-d tensor
+                that was already range checked by get_lr().
+
+        Returns:
+            Dict[str, List[Any]]: One value per parameter group for each scheduled
+                parameter group key, e.g. "weight_decay".
+        """
+        if self.final_weight_decays is None:
+            return {}
+        return {
+            "weight_decay": [
+                annealing_cos(base_weight_decay, final_weight_decay, training_progress)
+                for base_weight_decay, final_weight_decay in zip(
+                    self.base_weight_decays, self.final_weight_decays
+                )
+            ]
+        }
+
+    def _get_hyperparameters_batch(
+        self, training_progress: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        Compute the scheduled hyperparameters for many progress values at once.
+
+        Args:
+            training_progress (np.ndarray): 1-d array of progress values.
+
+        Returns:
+            Dict[str, np.ndarray]: Array of shape (num_param_groups,
+                len(training_progress)) for each key of _get_hyperparameters().
+        """
+        if self.final_weight_decays is None:
+            return {}
+        return {
+            "weight_decay": annealing_cos(
+                np.asarray(self.base_weight_decays)[:, None],
+                np.asarray(self.final_weight_decays)[:, None],
+                training_progress,
+            )
+        }
+
+    def _hyperparameters_key(self) -> Hashable:
+        """Identifies the hyperparameter schedules, like _lookup_table_key()."""
+        return (
+            type(self),
+            tuple(self.base_weight_decays or ()),
+            tuple(self.final_weight_decays or ()),
+        )
+
+    def _lookup_table_key(self) -> Hashable:
+        """Identifies the schedule, schedulers with equal keys share a lookup table."""
+        if self._lr_schedule is None:
+            raise NotImplementedError("Subclasses must implement this method.")
+        return (type(self), self._lr_schedule.key())
+
+    def step(self, training_progress: Optional[Union[float, Tensor]] = 0.0):
+        """
+        Perform a step.
+
+        training_progress can be a 0-d tensor. The learning rates are then computed
+        with tensor ops and copied into tensor learning rates without a host sync,
+        so the step can be traced by torch.compile without graph breaks.
+        """
+        # the order can only be checked on the first step after construction
+        if self._step_count == 1:
+            self._check_optimizer_step_order()
 
         self._step_count += 1
+        self.last_epoch += 1
+
+        if not isinstance(training_progress, Tensor):
+            if type(training_progress) is not float:
+                # e.g. NumPy scalars, so that only floats reach the optimizer
+                training_progress = float(training_progress)
+            self.last_progress = training_progress
+            if self.lr_levels is not None:
+                training_progress = (
+                    math.floor(training_progress * self.lr_levels) / self.lr_levels
+                )
+                if (
+                    training_progress == self._last_level
+                    and self.lr_scale == self._last_level_scale
+                ):
+                    return
+                self._last_level = training_progress
+                self._last_level_scale = self.lr_scale
 
         with _enable_get_lr_call(self):
-            self.last_epoch += 1
-            values = self.get_lr(training_progress)
+            if self._lookup_table is None or isinstance(training_progress, Tensor):
+                values = self.get_lr(training_progress)
+                hyperparameters = self._get_hyperparameters(training_progress)
+            else:
+                values = self._lookup_table.lookup(training_progress)
+                tables = self._hyperparameter_tables
+                hyperparameters = (
+                    {
+                        name: table.lookup(training_progress)
+                        for name, table in tables.items()
+                    }
+                    if tables
+                    else None
+                )
+
+        self._update_learning_rates(values, hyperparameters)
 
-        self._update_learning_rates(values)
+    def set_progress(self, training_progress: Tensor):
+        """
+        Write the learning rates for a 0-d progress tensor into the optimizer.
+
+        Unlike step(), this skips the step counters and the step order check. It
+        only runs tensor ops, so it can be called inside a torch.compile'd training
+        step without graph breaks or recompilations. With tensor learning rates,
+        the new values never leave the device. Other scheduled hyperparameters,
+        like the momentum, are only written if the optimizer holds them as tensors.
+
+        Args:
+            training_progress (Tensor): 0-d tensor with the progress of the training
+                between 0.0 (start) and 1.0 (end). It is not range checked.
+        """
+        self._update_learning_rates(
+            self.get_lr(training_progress),
+            self._get_hyperparameters(training_progress),
+            host_sync=False,
+        )
+
+    def enable_instrumentation(
+        self, capacity: int = 4096, every: int = 1
+    ) -> StepHistory:
+        """
+        Record the steps into a ring buffer and mark them for the torch profiler.
+
+        Each recorded step() stores the step, the progress, the learning rates
+        and the duration of the call in history. While a torch profiler runs,
+        every step() is wrapped in a record_function range named after the
+        scheduler class. Tensor progress and learning rates of recorded steps
+        are copied to the host.
+
+        step() is replaced on this instance only, so schedulers without
+        instrumentation run no extra code.
+
+        Args:
+            capacity (int): Number of steps kept. Default: 4096.
+            every (int): Only every every-th step is recorded. Default: 1.
+
+        Returns:
+            StepHistory: The new history, also available as history.
+        """
+        self.history = StepHistory(capacity, len(self.optimizer.param_groups), every)
+        self.step = self._instrumented_step
+        return self.history
+
+    def disable_instrumentation(self):
+        """Restore the plain step() and drop the history."""
+        self.__dict__.pop("step", None)
+        self.history = None
+
+    def _instrumented_step(
+        self, training_progress: Optional[Union[float, Tensor]] = 0.0
+    ):
+        # record_function takes microseconds even without a running profiler
+        if autograd_profiler._is_profiler_enabled:
+            with autograd_profiler.record_function(f"{type(self).__name__}.step"):
+                self._recorded_step(training_progress)
+        else:
+            self._recorded_step(training_progress)
+
+    def _recorded_step(self, training_progress: Optional[Union[float, Tensor]]):
+        history = self.history
+        if not history.is_due():
+            type(self).step(self, training_progress)
+            return
+        start = time.perf_counter()
+        type(self).step(self, training_progress)
+        duration = time.perf_counter() - start
+
+        lrs = self._last_lr
+        if isinstance(lrs[0], Tensor):
+            lrs = [lr.item() for lr in lrs]
+        history.record(self.last_epoch, float(training_progress), lrs, duration)
+
+    def get_last_lr(self) -> List[Any]:
+        """Return a copy of the last learning rates written by the scheduler."""
+        # _last_lr is updated in place by every step
+        return list(self._last_lr)
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Return the state of the scheduler without derived attributes."""
+        state = super().state_dict()
+        for name in (*self._derived_attributes, *self._instrumentation_attributes):
+            state.pop(name, None)
+        return state
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        """Load the scheduler's state and rebuild the schedules and lookup tables."""
+        super().load_state_dict(state_dict)
+        self._build_schedules()
+        self._build_lookup_tables()
 
     def _check_optimizer_step_order(self):
         """Check if optimizer.step() is called before lr_scheduler.step()."""
@@ -62,14 +477,61 @@ class ProgressiveScheduler(LRScheduler):
                     UserWarning,
                 )
 
-    def _update_learning_rates(self, values: List[float]):
-        """Update the learning rates for the optimizer's parameter groups."""
-        for param_group, lr in zip(self.optimizer.param_groups, values):
-            if isinstance(param_group["lr"], Tensor):
-                param_group["lr"].fill_(lr)
+    def _update_learning_rates(
+        self,
+        values: List[Any],
+        hyperparameters: Optional[Dict[str, List[Any]]] = None,
+        host_sync: bool = True,
+    ):
+        """
+        Update the learning rates for the optimizer's parameter groups.
+
+        The other scheduled hyperparameters are written in the same pass over the
+        parameter groups. "betas" values replace the first entry of the betas.
+        Without host_sync, hyperparameters other than the learning rate are only
+        written if the optimizer holds them as tensors.
+        _last_lr and the written values are updated in place, they are only
+        reallocated if the number of parameter groups changed. get_last_lr()
+        returns a copy.
+        """
+        param_groups = self.optimizer.param_groups
+        written_lrs = self._written_lrs
+        if len(written_lrs) != len(param_groups):
+            written_lrs[:] = [None] * len(param_groups)
+            self._last_lr: List[float] = [group["lr"] for group in param_groups]
+        last_lr = self._last_lr
+        rtol = self.lr_rtol
+        scale = self.lr_scale
+
+        for index, (param_group, lr) in enumerate(zip(param_groups, values)):
+            if scale != 1.0:
+                lr = lr * scale
+            if isinstance(lr, Tensor):
+                # tensor values stay on the device, so they are always written
+                written_lrs[index] = None
+                if isinstance(param_group["lr"], Tensor):
+                    param_group["lr"].copy_(lr)
+                else:
+                    param_group["lr"] = lr.item()
             else:
-                param_group["lr"] = lr
+                written_lr = written_lrs[index]
+                if (
+                    rtol is None
+                    or written_lr is None
+                    or abs(lr - written_lr) > rtol * abs(written_lr)
+                ):
+                    written_lrs[index] = lr
+                    if isinstance(param_group["lr"], Tensor):
+                        param_group["lr"].fill_(lr)
+                    else:
+                        param_group["lr"] = lr
+            last_lr[index] = param_group["lr"]
 
-        self._last_lr: List[float] = [
-            group["lr"] for group in self.optimizer.param_groups
-        ]
+            if hyperparameters:
+                for name, hyperparameter_values in hyperparameters.items():
+                    value = hyperparameter_values[index]
+                    if type(value) is float and type(param_group[name]) is float:
+                        # the common case, skips the checks for tensors and betas
+                        param_group[name] = value
+                    else:
+                        _set_hyperparameter(param_group, name, value, host_sync)
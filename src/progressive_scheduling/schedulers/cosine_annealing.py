@@ -1,9 +1,8 @@
-import math
-from typing import List
-
 from torch.optim import Optimizer
 
+from progressive_scheduling.piecewise import ScheduleBuilder
 from progressive_scheduling.schedulers import ProgressiveScheduler
+from progressive_scheduling.schedulers.base import _get_base_lrs
 
 
 class CosineAnnealingLR(ProgressiveScheduler):
@@ -18,38 +17,24 @@ class CosineAnnealingLR(ProgressiveScheduler):
     Args:
         optimizer (Optimizer): The optimizer to which this scheduler will be applied.
         eta_min (float): Minimum learning rate. Default is 0.0.
+        **kwargs: Forwarded to ProgressiveScheduler, e.g. lookup_table_size.
     """
 
-    def __init__(self, optimizer: Optimizer, eta_min: float = 0.0):
+    def __init__(self, optimizer: Optimizer, eta_min: float = 0.0, **kwargs):
         """
         Initializes the CosineAnnealingLRScheduler.
 
         Args:
             optimizer (Optimizer): Wrapped optimizer.
             eta_min (float): Minimum learning rate. Default: 0.0.
+            **kwargs: Forwarded to ProgressiveScheduler.
         """
         self.eta_min = eta_min
-        super().__init__(optimizer)
-
-    def get_lr(self, training_progress: float = 0.0) -> List[float]:
-        """
-        Calculates the learning rate using the cosine annealing formula.
-
-        Args:
-            training_progress (float): Progress of the training
-                between 0.0 (start) and 1.0 (end).
-
-        Returns:
-            List[float]: Learning rates for each parameter group.
-
-        Raises:
-            ValueError: If training_progress is not between 0.0 and 1.0.
-        """
-        if training_progress < 0.0 or training_progress > 1.0:
-            raise ValueError("training_progress must be between 0.0 and 1.0.")
-
-        return [
-            self.eta_min
-            + (base_lr - self.eta_min) * (1 + math.cos(math.pi * training_progress)) / 2
-            for base_lr in self.base_lrs
-        ]
+        self.base_lrs = _get_base_lrs(optimizer, kwargs.get("last_epoch", -1))
+        self._build_schedules()
+        super().__init__(optimizer, **kwargs)
+
+    def _build_schedules(self):
+        self._lr_schedule = (
+            ScheduleBuilder(start=self.base_lrs).cosine(1.0, to=self.eta_min).build()
+        )
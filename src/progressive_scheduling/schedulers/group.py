@@ -0,0 +1,153 @@
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from torch import Tensor
+
+from progressive_scheduling.lookup_table import LookupTable
+from progressive_scheduling.schedulers.base import ProgressiveScheduler
+
+
+class SchedulerGroup:
+    """
+    Steps several ProgressiveSchedulers with one progress value.
+
+    Meant for setups with several optimizers, e.g. GANs or multi-task models,
+    where every optimizer has its own scheduler. The progress is checked once
+    per step. With lookup_table_size set, the schedules of all schedulers are
+    sampled into one lookup table, so a single lookup returns the learning rates
+    of all parameter groups. The other scheduled hyperparameters are sampled
+    into tables of each scheduler. The learning rates and the hyperparameters
+    are then written scheduler by scheduler, with the same
+    step counters and write skipping as ProgressiveScheduler.step().
+
+    Schedulers with lr_levels or instrumentation and tensor progress are stepped
+    through their own step(), which handles them.
+
+    Args:
+        schedulers (Sequence[ProgressiveScheduler]): The grouped schedulers.
+        lookup_table_size (int, optional): If set, the schedules are sampled at
+            this many equidistant progress values and step() answers by linear
+            interpolation. Default: None.
+
+    Raises:
+        ValueError: If no scheduler is given or lookup_table_size is smaller
+            than 2.
+    """
+
+    def __init__(
+        self,
+        schedulers: Sequence[ProgressiveScheduler],
+        lookup_table_size: Optional[int] = None,
+    ):
+        if not schedulers:
+            raise ValueError("At least one scheduler must be provided")
+        if lookup_table_size is not None and lookup_table_size < 2:
+            raise ValueError("lookup_table_size must be at least 2.")
+
+        self.schedulers: List[ProgressiveScheduler] = list(schedulers)
+        self.lookup_table_size = lookup_table_size
+        self._lookup_table: Optional[LookupTable] = None
+        # hyperparameter tables of each scheduler, by parameter group key
+        self._hyperparameter_tables: List[Dict[str, LookupTable]] = []
+        self._build_lookup_table()
+
+    def _build_lookup_table(self):
+        """Samples the learning rates of all schedulers into one table."""
+        if self.lookup_table_size is None:
+            return
+        progress = np.linspace(0.0, 1.0, self.lookup_table_size)
+        self._lookup_table = LookupTable(
+            np.concatenate(
+                [scheduler.get_lr_batch(progress) for scheduler in self.schedulers]
+            )
+        )
+        # slices of the table rows that belong to each scheduler
+        self._row_slices = []
+        start = 0
+        for scheduler in self.schedulers:
+            end = start + len(scheduler.optimizer.param_groups)
+            self._row_slices.append(slice(start, end))
+            start = end
+        self._hyperparameter_tables = [
+            {
+                name: LookupTable(values)
+                for name, values in scheduler._get_hyperparameters_batch(
+                    progress
+                ).items()
+            }
+            for scheduler in self.schedulers
+        ]
+
+    def step(self, training_progress: Union[float, Tensor] = 0.0):
+        """
+        Perform a step of every scheduler.
+
+        Args:
+            training_progress (Union[float, Tensor]): Progress of the training
+                between 0.0 (start) and 1.0 (end), a float or a 0-d tensor.
+
+        Raises:
+            ValueError: If training_progress is not between 0.0 and 1.0.
+        """
+        if isinstance(training_progress, Tensor):
+            for scheduler in self.schedulers:
+                scheduler.step(training_progress)
+            return
+
+        if type(training_progress) is not float:
+            training_progress = float(training_progress)
+        if not 0.0 <= training_progress <= 1.0:
+            raise ValueError("training_progress must be between 0.0 and 1.0.")
+
+        table_values = None
+        if self._lookup_table is not None:
+            table_values = self._lookup_table.lookup(training_progress)
+
+        for index, scheduler in enumerate(self.schedulers):
+            if scheduler.lr_levels is not None or scheduler.history is not None:
+                scheduler.step(training_progress)
+                continue
+
+            if scheduler._step_count == 1:
+                scheduler._check_optimizer_step_order()
+            scheduler._step_count += 1
+            scheduler.last_epoch += 1
+            scheduler.last_progress = training_progress
+
+            if table_values is None:
+                values = scheduler.get_lr(training_progress)
+                hyperparameters = scheduler._get_hyperparameters(training_progress)
+            else:
+                values = table_values[self._row_slices[index]]
+                hyperparameters = {
+                    name: table.lookup(training_progress)
+                    for name, table in self._hyperparameter_tables[index].items()
+                }
+            scheduler._update_learning_rates(values, hyperparameters)
+
+    def get_last_lr(self) -> List[List[float]]:
+        """Returns the last learning rates of each scheduler."""
+        return [scheduler.get_last_lr() for scheduler in self.schedulers]
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Returns the states of all schedulers."""
+        return {"schedulers": [scheduler.state_dict() for scheduler in self.schedulers]}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        """
+        Loads the states of all schedulers, in the order of the group.
+
+        Args:
+            state_dict (Dict[str, Any]): A state returned by state_dict().
+
+        Raises:
+            ValueError: If the number of saved states doesn't match the group.
+        """
+        states = state_dict["schedulers"]
+        if len(states) != len(self.schedulers):
+            raise ValueError(
+                f"expected {len(self.schedulers)} scheduler states, got {len(states)}"
+            )
+        for scheduler, state in zip(self.schedulers, states):
+            scheduler.load_state_dict(state)
+        self._build_lookup_table()
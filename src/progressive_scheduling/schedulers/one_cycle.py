@@ -1,9 +1,11 @@
-import math
-from typing import List, Literal
+from typing import Any, Dict, Hashable, List, Literal, Sequence, Union
 
+import numpy as np
 from torch.optim import Optimizer
 
+from progressive_scheduling.piecewise import ScheduleBuilder
 from progressive_scheduling.schedulers import ProgressiveScheduler
+from progressive_scheduling.schedulers.base import _format_param
 
 
 class OneCycleLR(ProgressiveScheduler):
@@ -17,138 +19,174 @@ class OneCycleLR(ProgressiveScheduler):
 
     Args:
         optimizer (Optimizer): The optimizer to which this scheduler will be applied.
-        max_lr (float): The maximum learning rate during the cycle.
+        max_lr (Union[float, Sequence[float]]): The maximum learning rate during
+            the cycle, either one value for all parameter groups or one per group.
         pct_start (float, optional): The percentage of the cycle (in number of steps)
             spent increasing the learning rate. Default is 0.3.
         anneal_strategy (Literal["cos", "linear"], optional): The strategy used for
             annealing the learning rate. Can be either 'cos' for cosine annealing
             or 'linear' for linear annealing. Default is 'cos'.
-        cycle_momentum (bool, optional): Whether to cycle momentum. Default is True.
-        base_momentum (float, optional): The base momentum value. Default is 0.85.
-        max_momentum (float, optional): The maximum momentum value. Default is 0.95.
-        div_factor (float, optional): Determines the initial learning rate via
-            initial_lr = max_lr / div_factor. Default is 25.0.
-        final_div_factor (float, optional): Determines the minimum learning rate via
-            min_lr = initial_lr / final_div_factor. Default is 10000.0.
-        three_phase (bool, optional): If True, use a third phase of the schedule.
-            Default is False.
-
-        # TODO: add support for parameter groups
-        # TODO: add support for cycle_momentum
+        cycle_momentum (bool, optional): If True, momentum is cycled inversely to
+            the learning rate between max_momentum and base_momentum. For
+            optimizers with betas like Adam, beta1 is cycled. Default is True.
+        base_momentum (Union[float, Sequence[float]], optional): The momentum at
+            the peak of the learning rate, either one value for all parameter
+            groups or one per group. Default is 0.85.
+        max_momentum (Union[float, Sequence[float]], optional): The momentum at the
+            start and end of the cycle, either one value for all parameter groups
+            or one per group. Default is 0.95.
+        div_factor (Union[float, Sequence[float]], optional): Determines the initial
+            learning rate via initial_lr = max_lr / div_factor. Either one value
+            for all parameter groups or one per group. Default is 25.0.
+        final_div_factor (Union[float, Sequence[float]], optional): Determines the
+            minimum learning rate via min_lr = initial_lr / final_div_factor.
+            Either one value for all parameter groups or one per group.
+            Default is 10000.0.
+        three_phase (bool, optional): If True, the learning rate falls back to the
+            initial learning rate during a second phase as long as the first one,
+            and is annealed to the minimum learning rate in a third phase, like
+            torch.optim.lr_scheduler.OneCycleLR. Default is False.
+        **kwargs: Forwarded to ProgressiveScheduler, e.g. lookup_table_size or
+            final_weight_decay.
 
     Raises:
-        AssertionError: If three_phase is True, cycle_momentum is False, or if
-            base_momentum and max_momentum are not equal to their default values.
+        ValueError: If pct_start is not between 0.0 and 1.0 (0.5 for three_phase),
+            anneal_strategy is unknown, a per-group value does not have one entry
+            per parameter group, or if cycle_momentum is True for an optimizer
+            without momentum or betas.
     """
 
+    _derived_attributes = ProgressiveScheduler._derived_attributes + (
+        "_momentum_schedule",
+    )
+
     def __init__(
         self,
         optimizer: Optimizer,
-        max_lr: float,
+        max_lr: Union[float, Sequence[float]],
         pct_start: float = 0.3,
         anneal_strategy: Literal["cos", "linear"] = "cos",
         cycle_momentum: bool = True,
-        base_momentum: float = 0.85,
-        max_momentum: float = 0.95,
-        div_factor: float = 25.0,
-        final_div_factor: float = 10000.0,
+        base_momentum: Union[float, Sequence[float]] = 0.85,
+        max_momentum: Union[float, Sequence[float]] = 0.95,
+        div_factor: Union[float, Sequence[float]] = 25.0,
+        final_div_factor: Union[float, Sequence[float]] = 10000.0,
         three_phase: bool = False,
+        **kwargs,
     ):
-        assert three_phase is False, (
-            "Three phase is not supported."
-            + "If you want this feature, let me know on Github: "
-            + "https://github.com/cwallenwein/progressive-scheduling/issues"
-        )
-        assert cycle_momentum is True, (
-            "Cycle momentum must not supported. "
-            + "If you want this feature, let me know on Github: "
-            + "https://github.com/cwallenwein/progressive-scheduling/issues"
-        )
+        if not 0.0 <= pct_start <= (0.5 if three_phase else 1.0):
+            raise ValueError(
+                "pct_start must be between 0.0 and "
+                f"{0.5 if three_phase else 1.0}, got {pct_start}"
+            )
+        if anneal_strategy not in ("cos", "linear"):
+            raise ValueError(
+                "anneal_strategy must be one of 'cos' or 'linear', "
+                f"instead got {anneal_strategy}"
+            )
 
         self.max_lr = max_lr
         self.pct_start = pct_start
         self.anneal_strategy = anneal_strategy
+        self.three_phase = three_phase
         self.div_factor = div_factor
         self.final_div_factor = final_div_factor
 
-        # Calculate initial and minimum learning rates
-        self.initial_lr = self.max_lr / self.div_factor
-        self.min_lr = self.initial_lr / self.final_div_factor
-
-        super().__init__(optimizer)
-
-    def _annealing_cos(self, start: float, end: float, pct: float) -> float:
-        """
-        Computes the cosine annealing from start to end based on the progress.
-
-        Args:
-            start (float): The starting learning rate.
-            end (float): The ending learning rate.
-            pct (float): The progress percentage (between 0 and 1).
-
-        Returns:
-            float: The annealed learning rate.
-        """
-        cos_out = math.cos(math.pi * pct) + 1
-        return end + (start - end) / 2.0 * cos_out
-
-    def _annealing_linear(self, start: float, end: float, pct: float) -> float:
-        """
-        Computes the linear annealing from start to end based on the progress.
-
-        Args:
-            start (float): The starting learning rate.
-            end (float): The ending learning rate.
-            pct (float): The progress percentage (between 0 and 1).
-
-        Returns:
-            float: The annealed learning rate.
-        """
-        return (end - start) * pct + start
-
-    def _get_annealed_lr(self, start_lr: float, end_lr: float, pct: float) -> float:
-        """
-        Retrieves the annealed learning rate based on the specified strategy.
-
-        Args:
-            start_lr (float): The starting learning rate.
-            end_lr (float): The ending learning rate.
-            pct (float): The progress percentage (between 0 and 1).
-
-        Returns:
-            float: The annealed learning rate.
-
-        Raises:
-            ValueError: If the annealing strategy is unknown.
-        """
-        if self.anneal_strategy == "cos":
-            return self._annealing_cos(start_lr, end_lr, pct)
-        elif self.anneal_strategy == "linear":
-            return self._annealing_linear(start_lr, end_lr, pct)
-        else:
-            raise ValueError(f"Unknown annealing strategy: {self.anneal_strategy}")
-
-    def get_lr(self, training_progress: float) -> List[float]:
-        """
-        Calculates the learning rate based on the training progress.
-
-        Args:
-            training_progress (float): The progress of the training, should be
-                between 0.0 (start) and 1.0 (end).
-
-        Returns:
-            List[float]: The calculated learning rate.
-
-        Raises:
-            ValueError: If training_progress is not between 0.0 and 1.0.
-        """
-        if training_progress < 0.0 or training_progress > 1.0:
-            raise ValueError("training_progress must be between 0.0 and 1.0.")
-
-        if training_progress < self.pct_start:
-            warmup_pct = training_progress / self.pct_start
-            lr = self._get_annealed_lr(self.initial_lr, self.max_lr, warmup_pct)
+        # Calculate initial and minimum learning rates of all parameter groups
+        self.max_lrs = _format_param("max_lr", optimizer, max_lr)
+        self.initial_lrs = [
+            max_lr / div_factor
+            for max_lr, div_factor in zip(
+                self.max_lrs, _format_param("div_factor", optimizer, div_factor)
+            )
+        ]
+        self.min_lrs = [
+            initial_lr / final_div_factor
+            for initial_lr, final_div_factor in zip(
+                self.initial_lrs,
+                _format_param("final_div_factor", optimizer, final_div_factor),
+            )
+        ]
+        self.cycle_momentum = cycle_momentum
+        if cycle_momentum:
+            if (
+                "momentum" not in optimizer.defaults
+                and "betas" not in optimizer.defaults
+            ):
+                raise ValueError(
+                    "optimizer must support momentum or beta1 with `cycle_momentum` "
+                    "option enabled"
+                )
+            # Adam-like optimizers cycle beta1 instead of momentum
+            self._momentum_key = (
+                "betas" if "betas" in optimizer.defaults else "momentum"
+            )
+            self.base_momentums = _format_param(
+                "base_momentum", optimizer, base_momentum
+            )
+            self.max_momentums = _format_param("max_momentum", optimizer, max_momentum)
+
+        self._build_schedules()
+        super().__init__(optimizer, **kwargs)
+
+    def _build_schedules(self):
+        """Compile the learning rate and momentum schedules of all groups."""
+        shape = self.anneal_strategy
+        if self.three_phase:
+            self._lr_schedule = (
+                ScheduleBuilder(start=self.initial_lrs)
+                .segment(self.pct_start, shape, to=self.max_lrs)
+                .segment(self.pct_start, shape, to=self.initial_lrs)
+                .segment(1.0 - 2 * self.pct_start, shape, to=self.min_lrs)
+                .build()
+            )
         else:
-            cooldown_pct = (training_progress - self.pct_start) / (1 - self.pct_start)
-            lr = self._get_annealed_lr(self.max_lr, self.min_lr, cooldown_pct)
-        return [lr]
+            self._lr_schedule = (
+                ScheduleBuilder(start=self.initial_lrs)
+                .segment(self.pct_start, shape, to=self.max_lrs)
+                .segment(1.0 - self.pct_start, shape, to=self.min_lrs)
+                .build()
+            )
+
+        self._momentum_schedule = None
+        if self.cycle_momentum:
+            momentum_builder = ScheduleBuilder(start=self.max_momentums).segment(
+                self.pct_start, shape, to=self.base_momentums
+            )
+            if self.three_phase:
+                momentum_builder.segment(
+                    self.pct_start, shape, to=self.max_momentums
+                ).constant(1.0 - 2 * self.pct_start)
+            else:
+                momentum_builder.segment(
+                    1.0 - self.pct_start, shape, to=self.max_momentums
+                )
+            self._momentum_schedule = momentum_builder.build()
+
+    def _get_hyperparameters(self, training_progress: Any) -> Dict[str, List[Any]]:
+        """Add the momentum, which falls while the learning rate rises."""
+        hyperparameters = super()._get_hyperparameters(training_progress)
+        if self._momentum_schedule is not None:
+            hyperparameters[self._momentum_key] = self._momentum_schedule(
+                training_progress
+            )
+        return hyperparameters
+
+    def _get_hyperparameters_batch(
+        self, training_progress: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        hyperparameters = super()._get_hyperparameters_batch(training_progress)
+        if self._momentum_schedule is not None:
+            hyperparameters[self._momentum_key] = (
+                self._momentum_schedule.evaluate_batch(training_progress)
+            )
+        return hyperparameters
+
+    def _hyperparameters_key(self) -> Hashable:
+        if self._momentum_schedule is None:
+            return super()._hyperparameters_key()
+        return (
+            super()._hyperparameters_key(),
+            self._momentum_key,
+            self._momentum_schedule.key(),
+        )
@@ -0,0 +1,50 @@
+from typing import Union
+
+from torch.optim import Optimizer
+
+from progressive_scheduling.piecewise import PiecewiseSchedule, ScheduleBuilder
+from progressive_scheduling.schedulers import ProgressiveScheduler
+from progressive_scheduling.schedulers.base import _get_base_lrs
+
+
+class PiecewiseLR(ProgressiveScheduler):
+    """
+    Scales the learning rates with a piecewise schedule.
+
+    The learning rate of each parameter group is its initial learning rate
+    multiplied by the value of the schedule, e.g. warmup → constant → cosine:
+
+        schedule = (
+            ScheduleBuilder(start=0.0).warmup(0.05).constant(0.75).cosine(0.2)
+        )
+        scheduler = PiecewiseLR(optimizer, schedule)
+
+    Args:
+        optimizer (Optimizer): Wrapped optimizer.
+        schedule (Union[PiecewiseSchedule, ScheduleBuilder]): Learning rate factors,
+            either one entry for all parameter groups or one per group.
+        **kwargs: Forwarded to ProgressiveScheduler, e.g. lookup_table_size.
+
+    Raises:
+        ValueError: If the schedule has more than one entry, but not one per
+            parameter group.
+    """
+
+    _derived_attributes = ProgressiveScheduler._derived_attributes + ("schedule",)
+
+    def __init__(
+        self,
+        optimizer: Optimizer,
+        schedule: Union[PiecewiseSchedule, ScheduleBuilder],
+        **kwargs,
+    ):
+        if isinstance(schedule, ScheduleBuilder):
+            schedule = schedule.build()
+
+        self.schedule = schedule
+        self.base_lrs = _get_base_lrs(optimizer, kwargs.get("last_epoch", -1))
+        self._build_schedules()
+        super().__init__(optimizer, **kwargs)
+
+    def _build_schedules(self):
+        self._lr_schedule = self.schedule.scaled(self.base_lrs)
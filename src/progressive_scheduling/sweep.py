@@ -0,0 +1,259 @@
+import itertools
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from progressive_scheduling.functional import annealing_cos, annealing_linear
+
+# default values of the sweepable parameters of each scheduler, None if required
+SWEEP_PARAMETERS: Dict[str, Dict[str, Any]] = {
+    "CosineAnnealingLR": {"lr": None, "eta_min": 0.0},
+    "OneCycleLR": {
+        "max_lr": None,
+        "pct_start": 0.3,
+        "anneal_strategy": "cos",
+        "div_factor": 25.0,
+        "final_div_factor": 10000.0,
+        "three_phase": False,
+    },
+}
+
+
+def _evaluate_piecewise(
+    breakpoints: np.ndarray, values: np.ndarray, is_cos: np.ndarray, progress: Any
+) -> np.ndarray:
+    """
+    Evaluates one piecewise schedule per config with array ops.
+
+    Args:
+        breakpoints (np.ndarray): Shape (num_configs, num_segments + 1), the start
+            of each segment followed by 1.0.
+        values (np.ndarray): Shape (num_configs, num_segments + 1), the values at
+            the breakpoints.
+        is_cos (np.ndarray): Shape (num_configs, num_segments), whether a segment
+            is a cosine, else it is linear.
+        progress (np.ndarray): Shape (num_points,).
+
+    Returns:
+        np.ndarray: Shape (num_configs, num_points).
+    """
+    # like PiecewiseSchedule, a progress on a breakpoint belongs to the next
+    # segment, and zero-width segments are skipped like in ScheduleBuilder. The
+    # last segment with a width also covers 1.0.
+    inner = breakpoints[:, 1:-1]
+    index = (
+        (progress[None, :, None] >= inner[:, None, :]) & (inner[:, None, :] < 1.0)
+    ).sum(axis=-1)
+
+    start = np.take_along_axis(breakpoints, index, axis=1)
+    width = np.take_along_axis(breakpoints, index + 1, axis=1) - start
+    pct = (progress - start) / width
+
+    start_values = np.take_along_axis(values, index, axis=1)
+    end_values = np.take_along_axis(values, index + 1, axis=1)
+    return np.where(
+        np.take_along_axis(is_cos, index, axis=1),
+        annealing_cos(start_values, end_values, pct),
+        annealing_linear(start_values, end_values, pct),
+    )
+
+
+def _cosine_annealing_lrs(params: Dict[str, np.ndarray], progress: Any) -> np.ndarray:
+    lr, eta_min = params["lr"][:, None], params["eta_min"][:, None]
+    return annealing_cos(lr, eta_min, progress[None, :])
+
+
+def _one_cycle_lrs(params: Dict[str, np.ndarray], progress: Any) -> np.ndarray:
+    pct_start = params["pct_start"].astype(np.float64)
+    three_phase = params["three_phase"].astype(bool)
+    if np.any((pct_start < 0.0) | (pct_start > np.where(three_phase, 0.5, 1.0))):
+        raise ValueError(
+            "pct_start must be between 0.0 and 1.0, or 0.5 with three_phase."
+        )
+    strategies = params["anneal_strategy"]
+    if not np.isin(strategies, ("cos", "linear")).all():
+        raise ValueError("anneal_strategy must be one of 'cos' or 'linear'.")
+
+    max_lr = params["max_lr"].astype(np.float64)
+    initial_lr = max_lr / params["div_factor"]
+    min_lr = initial_lr / params["final_div_factor"]
+
+    # two-phase configs end with an empty segment, so that all configs have three
+    ones = np.ones_like(pct_start)
+    breakpoints = np.stack(
+        [
+            np.zeros_like(pct_start),
+            pct_start,
+            np.where(three_phase, 2 * pct_start, ones),
+            ones,
+        ],
+        axis=1,
+    )
+    values = np.stack(
+        [initial_lr, max_lr, np.where(three_phase, initial_lr, min_lr), min_lr],
+        axis=1,
+    )
+    is_cos = np.repeat((strategies == "cos")[:, None], 3, axis=1)
+    return _evaluate_piecewise(breakpoints, values, is_cos, progress)
+
+
+_EVALUATE = {
+    "CosineAnnealingLR": _cosine_annealing_lrs,
+    "OneCycleLR": _one_cycle_lrs,
+}
+
+
+class ScheduleSweep:
+    """
+    Learning rates of many scheduler configurations at the same progress values.
+
+    Returned by sweep_schedules(). The summary metrics are computed over all
+    configs at once, e.g. to prune the candidates of a hyperparameter search
+    before any of them is trained.
+
+    Attributes:
+        configs (List[Dict[str, Any]]): The parameters of each config.
+        progress (np.ndarray): The progress values, shape (num_points,).
+        lrs (np.ndarray): The learning rates, shape (num_configs, num_points).
+    """
+
+    def __init__(
+        self, configs: List[Dict[str, Any]], progress: np.ndarray, lrs: np.ndarray
+    ):
+        self.configs = configs
+        self.progress = progress
+        self.lrs = lrs
+
+    def __len__(self) -> int:
+        return len(self.configs)
+
+    def area_under_curve(self) -> np.ndarray:
+        """Area under the learning rate curve over progress, per config."""
+        heights = (self.lrs[:, 1:] + self.lrs[:, :-1]) / 2.0
+        return (heights * np.diff(self.progress)).sum(axis=1)
+
+    def peak_lr(self) -> np.ndarray:
+        """Largest learning rate of each config."""
+        return self.lrs.max(axis=1)
+
+    def peak_progress(self) -> np.ndarray:
+        """Progress of the first peak of the learning rate of each config."""
+        return self.progress[self.lrs.argmax(axis=1)]
+
+    def final_lr(self) -> np.ndarray:
+        """Learning rate at the last progress value of each config."""
+        return self.lrs[:, -1]
+
+    def distance(
+        self, reference: Any, norm: Literal["max", "rms"] = "max"
+    ) -> np.ndarray:
+        """
+        Distance of each config to a reference schedule.
+
+        The reference is usually recorded from a step-based scheduler, e.g. with
+        progressive_scheduling.utils.get_pytorch_schedule. Its i-th value of n
+        is placed at progress i / (n - 1), like the last step of a torch
+        scheduler ends its schedule, and it is linearly interpolated to the
+        progress values of the sweep.
+
+        Args:
+            reference (Any): Learning rates, shape (n,) or (num_configs, n).
+            norm (Literal["max", "rms"]): The largest absolute difference or the
+                root mean square of the differences. Default: "max".
+
+        Returns:
+            np.ndarray: The distance of each config, shape (num_configs,).
+
+        Raises:
+            ValueError: If norm is unknown.
+        """
+        if norm not in ("max", "rms"):
+            raise ValueError(f"norm must be 'max' or 'rms', got {norm}")
+
+        reference = np.atleast_2d(np.asarray(reference, dtype=np.float64))
+        reference_progress = np.linspace(0.0, 1.0, reference.shape[1])
+        reference = np.stack(
+            [np.interp(self.progress, reference_progress, row) for row in reference]
+        )
+        difference = np.abs(self.lrs - reference)
+        if norm == "max":
+            return difference.max(axis=1)
+        return np.sqrt((difference**2).mean(axis=1))
+
+    def summary(self) -> Dict[str, np.ndarray]:
+        """All summary metrics, one array of shape (num_configs,) each."""
+        return {
+            "area_under_curve": self.area_under_curve(),
+            "peak_lr": self.peak_lr(),
+            "peak_progress": self.peak_progress(),
+            "final_lr": self.final_lr(),
+        }
+
+
+def _expand_grid(
+    defaults: Dict[str, Any], grid: Dict[str, Sequence[Any]]
+) -> Tuple[List[Dict[str, Any]], Dict[str, np.ndarray]]:
+    """Returns the configs of the grid, as dicts and as one array per parameter."""
+    unknown = set(grid) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+    missing = [name for name, value in defaults.items() if value is None]
+    missing = [name for name in missing if name not in grid]
+    if missing:
+        raise ValueError(f"The grid must contain {missing}")
+
+    names = list(grid)
+    configs = [
+        {**defaults, **dict(zip(names, values))}
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+    params = {name: np.array([config[name] for config in configs]) for name in defaults}
+    return configs, params
+
+
+def sweep_schedules(
+    scheduler: Union[str, type],
+    grid: Dict[str, Sequence[Any]],
+    num_points: int = 1001,
+    progress: Optional[Any] = None,
+) -> ScheduleSweep:
+    """
+    Computes the learning rates of every config of a parameter grid at once.
+
+    The schedules are evaluated with array ops over all configs and progress
+    values, without building optimizers or schedulers, and match the schedules
+    of the progressive schedulers with a single parameter group.
+
+    Args:
+        scheduler (Union[str, type]): "CosineAnnealingLR" or "OneCycleLR", or
+            the scheduler class.
+        grid (Dict[str, Sequence[Any]]): The values of each swept parameter,
+            all combinations are evaluated. Parameters that are not in the grid
+            keep the default of the scheduler. CosineAnnealingLR takes the
+            initial learning rate as "lr".
+        num_points (int): Number of equidistant progress values from 0.0 to 1.0.
+            Default: 1001.
+        progress (Any, optional): Progress values to use instead of num_points
+            equidistant ones.
+
+    Returns:
+        ScheduleSweep: The learning rates of each config.
+
+    Raises:
+        ValueError: If the scheduler is not supported, the grid has unknown
+            parameters or lacks a required one, or a config is invalid.
+    """
+    name = scheduler if isinstance(scheduler, str) else scheduler.__name__
+    if name not in SWEEP_PARAMETERS:
+        raise ValueError(
+            f"Unsupported scheduler {name}, expected one of {list(SWEEP_PARAMETERS)}"
+        )
+
+    if progress is None:
+        progress = np.linspace(0.0, 1.0, num_points)
+    progress = np.asarray(progress, dtype=np.float64)
+    if progress.ndim != 1 or not np.all((progress >= 0.0) & (progress <= 1.0)):
+        raise ValueError("progress must be a 1-d array of values in [0.0, 1.0].")
+
+    configs, params = _expand_grid(SWEEP_PARAMETERS[name], grid)
+    return ScheduleSweep(configs, progress, _EVALUATE[name](params, progress))
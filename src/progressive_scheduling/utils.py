@@ -1,5 +1,6 @@
 from typing import List
 
+import numpy as np
 import torch
 
 from progressive_scheduling import ProgressiveScheduler
@@ -21,12 +22,5 @@ def get_pytorch_schedule(
 def get_progressive_schedule(
     scheduler: ProgressiveScheduler, total_steps: int
 ) -> List[float]:
-    optimizer = scheduler.optimizer
-
-    learning_rates = []
-    for step in range(total_steps):
-        progress = step / total_steps
-        optimizer.step()
-        scheduler.step(progress)
-        learning_rates.append(optimizer.param_groups[0]["lr"])
-    return learning_rates
+    progress = np.arange(total_steps) / total_steps
+    return scheduler.get_lr_batch(progress)[0].tolist()
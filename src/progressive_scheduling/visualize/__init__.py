@@ -1,3 +1,8 @@
-from .plot_schedulers import plot_lr_scheduler
+from progressive_scheduling._lazy import lazy_attributes
+
+# matplotlib and torch are only imported on first use
+__getattr__, __dir__ = lazy_attributes(
+    __name__, {"plot_lr_scheduler": ".plot_schedulers"}
+)
 
 __all__ = ["plot_lr_scheduler"]
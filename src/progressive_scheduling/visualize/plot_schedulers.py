@@ -1,35 +1,220 @@
-from typing import Optional
+import copy
+import os
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
-import matplotlib.pyplot as plt
-import torch
+import numpy as np
+from matplotlib.figure import Figure
+from torch import Tensor
+from torch.optim.lr_scheduler import CyclicLR, LambdaLR, LRScheduler, OneCycleLR
 
 from progressive_scheduling.schedulers.base import ProgressiveScheduler
-from progressive_scheduling.utils import get_progressive_schedule, get_pytorch_schedule
+
+# torch schedulers whose get_lr() only depends on last_epoch
+_STATELESS_GET_LR = (CyclicLR, LambdaLR, OneCycleLR)
+
+# evaluated samples per plotted point, the min and max of each are kept
+SAMPLES_PER_POINT = 8
+
+
+class _StandInOptimizer:
+    """
+    Copies of the parameter groups of an optimizer, without the parameters.
+
+    Replicas of torch schedulers write into it instead of the real optimizer.
+    """
+
+    def __init__(self, param_groups: List[Dict[str, Any]]):
+        self.param_groups = [
+            {
+                key: value.clone() if isinstance(value, Tensor) else value
+                for key, value in param_group.items()
+                if key != "params"
+            }
+            for param_group in param_groups
+        ]
+
+    def step(self):
+        pass
+
+
+def _downsample_min_max(
+    x: np.ndarray, y: np.ndarray, num_buckets: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces a curve to the first minimum and maximum of each of num_buckets
+    equally sized runs of points, in their original order, so that spikes of a
+    single point still show up in the plot.
+    """
+    if len(y) <= 2 * num_buckets:
+        return x, y
+
+    starts = np.linspace(0, len(y), num_buckets + 1).astype(np.int64)[:-1]
+    bucket = np.repeat(np.arange(num_buckets), np.diff(np.append(starts, len(y))))
+    indices = []
+    for extremes in (np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)):
+        candidates = np.flatnonzero(y == extremes[bucket])
+        # the first candidate of each bucket
+        _, first = np.unique(bucket[candidates], return_index=True)
+        indices.append(candidates[first])
+    indices = np.unique(np.concatenate(indices))
+    return x[indices], y[indices]
+
+
+def _progressive_curve(
+    scheduler: ProgressiveScheduler, num_steps: int, num_samples: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Evaluates the schedule at progress step / (num_steps - 1)."""
+    progress = np.linspace(0.0, 1.0, num_samples)
+    if scheduler._lr_schedule is not None:
+        # the segments are monotonic, so the extremes lie on their ends
+        breakpoints = np.asarray(scheduler._lr_schedule.breakpoints, dtype=np.float64)
+        progress = np.unique(
+            np.concatenate([progress, breakpoints, np.nextafter(breakpoints, 0.0)])
+        )
+    lrs = np.asarray(scheduler.get_lr_batch(progress), dtype=np.float64)
+    return progress * (num_steps - 1), lrs
+
+
+def _pytorch_curve(
+    scheduler: LRScheduler, num_steps: int, num_samples: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the learning rates of a torch scheduler replica at each step."""
+    stand_in = _StandInOptimizer(scheduler.optimizer.param_groups)
+
+    if hasattr(scheduler, "_get_closed_form_lr") or isinstance(
+        scheduler, _STATELESS_GET_LR
+    ):
+        replica = copy.copy(scheduler)
+        replica.optimizer = stand_in
+        replica._get_lr_called_within_step = True
+        get_lr = getattr(replica, "_get_closed_form_lr", replica.get_lr)
+
+        steps = np.linspace(0, num_steps - 1, num_samples).round()
+        if isinstance(scheduler, OneCycleLR):
+            # the phases end on the extremes of the schedule
+            ends = [phase["end_step"] for phase in scheduler._schedule_phases]
+            steps = np.concatenate([steps, np.floor(ends), np.ceil(ends)])
+        steps = np.unique(steps[(steps >= 0) & (steps < num_steps)])
+        lrs = []
+        for step in steps.astype(np.int64).tolist():
+            replica.last_epoch = step
+            lrs.append(get_lr())
+        return steps, np.asarray(lrs, dtype=np.float64).T
+
+    # recursive schedulers are stepped through every step, from their current step
+    replica = copy.deepcopy(scheduler, {id(scheduler.optimizer): stand_in})
+    lrs = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for _ in range(num_steps):
+            lrs.append(replica.get_last_lr())
+            replica.step()
+    return np.arange(num_steps, dtype=np.float64), np.asarray(lrs, dtype=np.float64).T
+
+
+def _default_label(scheduler: LRScheduler) -> str:
+    kind = "progressive" if isinstance(scheduler, ProgressiveScheduler) else "PyTorch"
+    return f"{type(scheduler).__name__} ({kind})"
 
 
 def plot_lr_scheduler(
-    pytorch_scheduler: Optional[torch.optim.lr_scheduler.LRScheduler] = None,
+    pytorch_scheduler: Optional[LRScheduler] = None,
     progressive_scheduler: Optional[ProgressiveScheduler] = None,
     num_steps: int = 1000,
-) -> None:
-    if progressive_scheduler is None and pytorch_scheduler is None:
+    schedulers: Sequence[LRScheduler] = (),
+    labels: Optional[Sequence[str]] = None,
+    output: Optional[Union[str, os.PathLike]] = None,
+    max_points: int = 2000,
+) -> Figure:
+    """
+    Plots the learning rate schedules of any number of schedulers over num_steps.
+
+    The schedulers are not stepped and keep their state. Progressive schedulers
+    are evaluated in one vectorized call at progress step / (num_steps - 1),
+    including the ends of all segments of their schedule. Torch schedulers with
+    a closed form, OneCycleLR, CyclicLR and LambdaLR are evaluated at the
+    sampled steps and the phase ends of OneCycleLR only. Other torch schedulers
+    are simulated step by step on a copy, starting from their current step.
+
+    At most SAMPLES_PER_POINT * max_points steps are evaluated per scheduler,
+    and each curve is reduced to the minimum and maximum of max_points runs of
+    samples, so that short spikes stay visible in previews of very long
+    schedules.
+
+    Args:
+        pytorch_scheduler (LRScheduler, optional): Plotted dashed as
+            "PyTorch Scheduler".
+        progressive_scheduler (ProgressiveScheduler, optional): Plotted as
+            "Progressive Scheduler".
+        num_steps (int): Number of training steps on the x-axis. Default: 1000.
+        schedulers (Sequence[LRScheduler]): More progressive or torch schedulers
+            to overlay. Default: ().
+        labels (Sequence[str], optional): One label per entry of schedulers.
+            Default: the class names.
+        output (str | os.PathLike, optional): If set, the figure is written to
+            this file, e.g. a PNG or SVG, without a display. Otherwise it is
+            shown with matplotlib.pyplot.
+        max_points (int): Number of min/max pairs a curve is reduced to.
+            Default: 2000.
+
+    Returns:
+        Figure: The plotted figure.
+
+    Raises:
+        ValueError: If no scheduler is given, labels doesn't match schedulers, or
+            num_steps is smaller than 2.
+    """
+    schedulers = list(schedulers)
+    if progressive_scheduler is None and pytorch_scheduler is None and not schedulers:
         raise ValueError("At least one scheduler must be provided")
+    if labels is None:
+        labels = [_default_label(scheduler) for scheduler in schedulers]
+    elif len(labels) != len(schedulers):
+        raise ValueError(f"expected {len(schedulers)} labels, got {len(labels)}")
+    if num_steps < 2:
+        raise ValueError("num_steps must be at least 2.")
 
-    plt.figure(figsize=(10, 6))
+    curves = list(zip(schedulers, labels))
+    if pytorch_scheduler is not None:
+        curves.insert(0, (pytorch_scheduler, "PyTorch Scheduler"))
+    if progressive_scheduler is not None:
+        curves.insert(0, (progressive_scheduler, "Progressive Scheduler"))
 
-    if progressive_scheduler:
-        progressive_lrs = get_progressive_schedule(progressive_scheduler, num_steps)
-        plt.plot(range(num_steps), progressive_lrs, label="Progressive Scheduler")
+    if output is None:
+        # pyplot picks an interactive backend, which is only needed for show()
+        import matplotlib.pyplot as plt
 
-    if pytorch_scheduler:
-        pytorch_lrs = get_pytorch_schedule(pytorch_scheduler, num_steps)
-        plt.plot(
-            range(num_steps), pytorch_lrs, label="PyTorch Scheduler", linestyle="--"
-        )
+        figure = plt.figure(figsize=(10, 6))
+    else:
+        figure = Figure(figsize=(10, 6))
+    axes = figure.add_subplot()
+
+    num_samples = min(num_steps, SAMPLES_PER_POINT * max_points)
+    for scheduler, label in curves:
+        if isinstance(scheduler, ProgressiveScheduler):
+            steps, lrs = _progressive_curve(scheduler, num_steps, num_samples)
+            linestyle = "-"
+        else:
+            steps, lrs = _pytorch_curve(scheduler, num_steps, num_samples)
+            linestyle = "--"
+
+        for group, group_lrs in enumerate(lrs):
+            group_label = label if len(lrs) == 1 else f"{label}, group {group}"
+            axes.plot(
+                *_downsample_min_max(steps, group_lrs, max_points),
+                label=group_label,
+                linestyle=linestyle,
+            )
+
+    axes.set_xlabel("Steps")
+    axes.set_ylabel("Learning Rate")
+    axes.set_title("Learning Rate Schedule")
+    axes.legend()
+    axes.grid(True)
 
-    plt.xlabel("Steps")
-    plt.ylabel("Learning Rate")
-    plt.title("Learning Rate Schedule")
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    if output is None:
+        plt.show()
+    else:
+        figure.savefig(output)
+    return figure
@@ -0,0 +1,294 @@
+"""
+Conformance of the progressive schedulers with torch.optim.lr_scheduler.
+
+Torch schedulers are stepped for every step of their schedule, the progressive
+ones are evaluated at the matching progress of all steps in one vectorized
+call. Errors are relative to the largest reference value of each parameter
+group, and only the worst points are kept, so configs can be checked in
+parallel across a process pool with little data sent back.
+"""
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+import torch.optim.lr_scheduler as pytorch_schedulers
+from torch.optim import SGD, Adam
+
+import progressive_scheduling.schedulers as progressive_schedulers
+
+# largest accepted error, relative to the largest value of a parameter group,
+# torch's recursive CosineAnnealingLR drifts by about 1e-14 per 1000 steps
+TOLERANCE = 1e-12
+
+
+@dataclass
+class WorstPoint:
+    """A point of the largest error of a compared schedule."""
+
+    config: Dict[str, Any]
+    key: str
+    group: int
+    step: int
+    progress: float
+    progressive: float
+    pytorch: float
+    error: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.error:.2e} at step {self.step} (progress {self.progress:.6f}) "
+            f"of {self.key} of group {self.group}: progressive {self.progressive!r}"
+            f", PyTorch {self.pytorch!r}, config {self.config}"
+        )
+
+
+def reference_progress(
+    pytorch_scheduler: pytorch_schedulers.LRScheduler, num_steps: int
+) -> np.ndarray:
+    """
+    Returns the progress that matches each step of a torch scheduler.
+
+    OneCycleLR ends its phases on step pct_start * total_steps - 1, and so on,
+    up to total_steps - 1. Each phase is mapped linearly onto its share of the
+    progress. CosineAnnealingLR reaches eta_min at step T_max.
+
+    Raises:
+        ValueError: If the scheduler is not supported.
+    """
+    steps = np.arange(num_steps, dtype=np.float64)
+    if isinstance(pytorch_scheduler, pytorch_schedulers.CosineAnnealingLR):
+        return np.clip(steps / pytorch_scheduler.T_max, 0.0, 1.0)
+    if not isinstance(pytorch_scheduler, pytorch_schedulers.OneCycleLR):
+        raise ValueError(f"Unsupported scheduler {type(pytorch_scheduler).__name__}")
+
+    total_steps = pytorch_scheduler.total_steps
+    ends = np.array([phase["end_step"] for phase in pytorch_scheduler._schedule_phases])
+    # the k-th inner phase ends on step bound_k * total_steps - k, the last phase
+    # on step total_steps - 1
+    offsets = np.arange(1, len(ends) + 1)
+    offsets[-1] = 1
+    bounds = (ends + offsets) / total_steps
+    # like torch, a step on the end of a phase belongs to that phase
+    phase = np.minimum(np.searchsorted(ends, steps, side="left"), len(ends) - 1)
+    start_steps = np.concatenate([[0.0], ends[:-1]])[phase]
+    start_bounds = np.concatenate([[0.0], bounds[:-1]])[phase]
+    pct = (steps - start_steps) / (ends[phase] - start_steps)
+    return np.clip(start_bounds + pct * (bounds[phase] - start_bounds), 0.0, 1.0)
+
+
+def _momentum(param_group: Dict[str, Any]) -> float:
+    return (
+        param_group["betas"][0] if "betas" in param_group else param_group["momentum"]
+    )
+
+
+def simulate_pytorch_schedule(
+    pytorch_scheduler: pytorch_schedulers.LRScheduler, num_steps: int, momentum: bool
+) -> Dict[str, np.ndarray]:
+    """Returns the values of each group at steps 0 to num_steps - 1."""
+    param_groups = pytorch_scheduler.optimizer.param_groups
+    lrs = np.empty((len(param_groups), num_steps))
+    momentums = np.empty_like(lrs)
+    with warnings.catch_warnings():
+        # the optimizer is not stepped
+        warnings.simplefilter("ignore")
+        for step in range(num_steps):
+            for group, param_group in enumerate(param_groups):
+                lrs[group, step] = param_group["lr"]
+                if momentum:
+                    momentums[group, step] = _momentum(param_group)
+            if step + 1 < num_steps:
+                pytorch_scheduler.step()
+    return {"lr": lrs, "momentum": momentums} if momentum else {"lr": lrs}
+
+
+def progressive_schedule(
+    progressive_scheduler: progressive_schedulers.ProgressiveScheduler,
+    progress: np.ndarray,
+    momentum: bool,
+) -> Dict[str, np.ndarray]:
+    """Returns the values of each group at the given progress values."""
+    values = {"lr": progressive_scheduler.get_lr_batch(progress)}
+    if momentum:
+        values["momentum"] = progressive_scheduler._momentum_schedule.evaluate_batch(
+            progress
+        )
+    return values
+
+
+def compare_schedulers(
+    progressive_scheduler: progressive_schedulers.ProgressiveScheduler,
+    pytorch_scheduler: pytorch_schedulers.LRScheduler,
+    num_steps: int,
+    config: Optional[Dict[str, Any]] = None,
+) -> WorstPoint:
+    """Returns the point of the largest relative error of num_steps steps."""
+    momentum = getattr(progressive_scheduler, "cycle_momentum", False)
+    progress = reference_progress(pytorch_scheduler, num_steps)
+    expected = simulate_pytorch_schedule(pytorch_scheduler, num_steps, momentum)
+    actual = progressive_schedule(progressive_scheduler, progress, momentum)
+
+    worst = None
+    for key, reference in expected.items():
+        scale = np.abs(reference).max(axis=1, keepdims=True)
+        errors = np.abs(actual[key] - reference) / np.where(scale > 0, scale, 1.0)
+        group, step = np.unravel_index(errors.argmax(), errors.shape)
+        if worst is None or errors[group, step] > worst.error:
+            worst = WorstPoint(
+                config=config or {},
+                key=key,
+                group=int(group),
+                step=int(step),
+                progress=float(progress[step]),
+                progressive=float(actual[key][group, step]),
+                pytorch=float(reference[group, step]),
+                error=float(errors[group, step]),
+            )
+    return worst
+
+
+def random_configs(num_configs: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Returns random OneCycleLR and CosineAnnealingLR configs."""
+    generator = np.random.default_rng(seed)
+
+    def log_uniform(low: float, high: float, size: Optional[int] = None) -> Any:
+        values = np.exp(generator.uniform(np.log(low), np.log(high), size))
+        return values.tolist()
+
+    configs = []
+    for index in range(num_configs):
+        num_param_groups = int(generator.integers(1, 4))
+        lrs = log_uniform(1e-5, 10.0, num_param_groups)
+        if index % 2 == 0:
+            three_phase = bool(generator.integers(2))
+            total_steps = int(generator.integers(50, 3000))
+            pct_start = generator.uniform(0.05, 0.45 if three_phase else 0.95)
+            base_momentum = generator.uniform(0.5, 0.9)
+            configs.append(
+                {
+                    "scheduler": "OneCycleLR",
+                    "optimizer": str(generator.choice(["SGD", "Adam"])),
+                    "lrs": lrs,
+                    "total_steps": total_steps,
+                    "pct_start": float(pct_start),
+                    "anneal_strategy": str(generator.choice(["cos", "linear"])),
+                    "cycle_momentum": bool(generator.integers(2)),
+                    "base_momentum": float(base_momentum),
+                    "max_momentum": float(base_momentum + generator.uniform(0, 0.09)),
+                    "div_factor": log_uniform(1.0, 1e3),
+                    "final_div_factor": log_uniform(1.0, 1e5),
+                    "three_phase": three_phase,
+                }
+            )
+        else:
+            configs.append(
+                {
+                    "scheduler": "CosineAnnealingLR",
+                    "optimizer": "SGD",
+                    "lrs": lrs,
+                    "T_max": int(generator.integers(10, 3000)),
+                    "eta_min": float(generator.uniform(0.0, min(lrs))),
+                }
+            )
+    return configs
+
+
+def create_schedulers(
+    config: Dict[str, Any],
+) -> Tuple[
+    progressive_schedulers.ProgressiveScheduler, pytorch_schedulers.LRScheduler, int
+]:
+    """Returns both schedulers of a config and the number of steps to compare."""
+
+    def create_optimizer() -> torch.optim.Optimizer:
+        param_groups = [
+            {"params": [torch.nn.Parameter(torch.zeros(1))], "lr": lr}
+            for lr in config["lrs"]
+        ]
+        if config["optimizer"] == "Adam":
+            return Adam(param_groups)
+        return SGD(param_groups, momentum=0.9)
+
+    if config["scheduler"] == "CosineAnnealingLR":
+        return (
+            progressive_schedulers.CosineAnnealingLR(
+                create_optimizer(), eta_min=config["eta_min"]
+            ),
+            pytorch_schedulers.CosineAnnealingLR(
+                create_optimizer(), T_max=config["T_max"], eta_min=config["eta_min"]
+            ),
+            config["T_max"] + 1,
+        )
+
+    kwargs = {
+        key: config[key]
+        for key in (
+            "pct_start",
+            "anneal_strategy",
+            "cycle_momentum",
+            "base_momentum",
+            "max_momentum",
+            "div_factor",
+            "final_div_factor",
+            "three_phase",
+        )
+    }
+    # one max_lr per group, ten times the initial learning rate of the group
+    max_lrs = [10.0 * lr for lr in config["lrs"]]
+    return (
+        progressive_schedulers.OneCycleLR(create_optimizer(), max_lr=max_lrs, **kwargs),
+        pytorch_schedulers.OneCycleLR(
+            create_optimizer(),
+            max_lr=max_lrs,
+            total_steps=config["total_steps"],
+            **kwargs,
+        ),
+        config["total_steps"],
+    )
+
+
+def _compare_configs(configs: Sequence[Dict[str, Any]]) -> List[WorstPoint]:
+    worst_points = []
+    for config in configs:
+        progressive_scheduler, pytorch_scheduler, num_steps = create_schedulers(config)
+        worst_points.append(
+            compare_schedulers(
+                progressive_scheduler, pytorch_scheduler, num_steps, config
+            )
+        )
+    return worst_points
+
+
+def run_conformance(
+    configs: Sequence[Dict[str, Any]],
+    max_workers: Optional[int] = None,
+    chunk_size: int = 8,
+) -> List[WorstPoint]:
+    """
+    Compares the schedulers of all configs, in chunks across a process pool.
+
+    With a single worker, the configs are compared in this process.
+
+    Returns:
+        List[WorstPoint]: The worst point of each config, in the order of configs.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    bounds = list(range(0, len(configs), chunk_size)) + [len(configs)]
+    chunks = [configs[start:end] for start, end in zip(bounds, bounds[1:])]
+    if max_workers == 1:
+        results = map(_compare_configs, chunks)
+    else:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(_compare_configs, chunks))
+    return [worst_point for result in results for worst_point in result]
+
+
+def format_worst_points(worst_points: Sequence[WorstPoint], count: int = 5) -> str:
+    """Returns a report of the count largest errors."""
+    worst_points = sorted(worst_points, key=lambda point: point.error, reverse=True)
+    return "\n".join(str(point) for point in worst_points[:count])
@@ -0,0 +1,158 @@
+import threading
+
+import pytest
+import torch
+
+import progressive_scheduling.schedulers as progressive_schedulers
+from progressive_scheduling import BudgetedLoop, Curriculum, Knob, ScheduleBuilder
+from progressive_scheduling.curriculum import batch_size_lr_scale
+from progressive_scheduling.progress import (
+    CalibratedProgressEstimator,
+    ThroughputProgressEstimator,
+    TokenSource,
+)
+
+from .util import FakeClock, create_optimizer
+
+
+def create_loop(dataloader, training_duration=10.0, **kwargs):
+    optimizer = create_optimizer()
+    scheduler = progressive_schedulers.CosineAnnealingLR(optimizer)
+    loop = BudgetedLoop(dataloader, scheduler, training_duration, **kwargs)
+    clock = FakeClock()
+    for source in getattr(loop.progress_source, "sources", [loop.progress_source]):
+        source.clock = source.wall_clock = clock
+    return loop, clock, optimizer
+
+
+def run_loop(loop, clock, optimizer, step_time=1.0):
+    progress, learning_rates = [], []
+    for _, batch_progress in loop:
+        clock.now += step_time
+        optimizer.step()
+        progress.append(batch_progress)
+        learning_rates.append(optimizer.param_groups[0]["lr"])
+    return progress, learning_rates
+
+
+def test_loop_stops_at_time_budget():
+    loop, clock, optimizer = create_loop(range(3))
+    progress, learning_rates = run_loop(loop, clock, optimizer)
+
+    assert len(progress) == loop.step == 10
+    assert progress[:3] == pytest.approx([0.0, 0.1, 0.2])
+    assert loop.epoch == 3
+    assert optimizer.param_groups[0]["lr"] == pytest.approx(0.0)
+    # the learning rate of a step is set after the previous step
+    assert learning_rates[0] == 0.1
+
+
+def test_loop_with_calibrated_estimator_reads_the_clock_rarely():
+    estimator = CalibratedProgressEstimator(
+        warmup_steps=2, calibration_steps=8, check_every=50
+    )
+    loop, clock, optimizer = create_loop(
+        range(100), training_duration=500.0, progress_estimator=estimator
+    )
+    clock.num_calls = 0
+    progress, _ = run_loop(loop, clock, optimizer)
+
+    assert loop.step == estimator.predicted_total_steps == 500
+    assert progress[11:14] == pytest.approx([1 / 490, 2 / 490, 3 / 490])
+    # the start, 10 calibration steps and 9 checks read the clock
+    assert clock.num_calls == 1 + 10 + 9
+
+
+def test_loop_with_throughput_estimator():
+    loop, clock, optimizer = create_loop(
+        range(100), progress_estimator=ThroughputProgressEstimator()
+    )
+    run_loop(loop, clock, optimizer, step_time=0.75)
+
+    assert loop.step == 13
+    assert loop.progress == 1.0
+
+
+def test_loop_stops_at_token_budget():
+    batch = {"input_ids": torch.zeros(2, 5)}
+    loop, clock, optimizer = create_loop(
+        [batch] * 4, training_duration=None, progress_source=TokenSource(100)
+    )
+    run_loop(loop, clock, optimizer)
+
+    assert loop.step == 10
+    assert loop.epoch == 2
+
+
+def test_loop_prefetches_in_background():
+    threads = []
+
+    def dataloader():
+        for batch in range(100):
+            threads.append(threading.current_thread())
+            yield batch
+
+    class Batches:
+        def __iter__(self):
+            return dataloader()
+
+    loop, clock, optimizer = create_loop(Batches(), prefetch=True)
+    progress, _ = run_loop(loop, clock, optimizer)
+
+    assert len(progress) == 10
+    assert threading.main_thread() not in threads
+
+
+def test_loop_resumes_budget():
+    loop, clock, optimizer = create_loop(range(100))
+    for _ in loop:
+        clock.now += 1.0
+        optimizer.step()
+        if loop.step == 3:
+            # preempted during the fourth step
+            state_dict = loop.state_dict()
+            break
+
+    loop, clock, optimizer = create_loop(range(100))
+    loop.load_state_dict(state_dict)
+    progress, _ = run_loop(loop, clock, optimizer)
+
+    assert progress[0] == pytest.approx(0.3)
+    assert loop.step == 9
+
+
+def test_loop_stops_on_empty_dataloader():
+    loop, clock, optimizer = create_loop([])
+    assert list(loop) == []
+
+
+def test_loop_needs_a_budget():
+    with pytest.raises(ValueError):
+        BudgetedLoop(range(3))
+
+
+def test_loop_steps_the_curriculum_before_the_schedulers():
+    curriculum = Curriculum(
+        {
+            "batch_size": Knob(
+                ScheduleBuilder(start=4).linear(0.5, to=16).constant(0.5),
+                multiple_of=4,
+            )
+        }
+    )
+    loop, clock, optimizer = create_loop(range(100), curriculum=curriculum)
+    scheduler = loop.schedulers[0]
+    curriculum.knobs["batch_size"].apply = lambda batch_size: setattr(
+        scheduler, "lr_scale", batch_size_lr_scale(batch_size, 4)
+    )
+
+    batch_sizes = []
+    for _ in loop:
+        batch_sizes.append(curriculum["batch_size"])
+        clock.now += 1.0
+        optimizer.step()
+
+    assert batch_sizes == [4, 8, 8, 12, 12, 16, 16, 16, 16, 16]
+    assert scheduler.lr_scale == 4.0
+    # the scale is written together with the learning rate of the same progress
+    assert optimizer.param_groups[0]["lr"] == pytest.approx(0.0)
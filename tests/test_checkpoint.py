@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+import pytest
+import torch
+
+from progressive_scheduling.checkpoint import (
+    AsyncCheckpointWriter,
+    atomic_save,
+    snapshot_to_cpu,
+)
+
+
+def test_snapshot_copies_tensors():
+    Pair = namedtuple("Pair", ["first", "second"])
+    weights = torch.ones(3)
+    state = {
+        "model": OrderedDict(weights=weights),
+        "optimizer": [Pair(weights, 0.1)],
+        "step": 7,
+    }
+
+    snapshot = snapshot_to_cpu(state)
+    weights.add_(1.0)
+
+    assert type(snapshot["model"]) is OrderedDict
+    assert type(snapshot["optimizer"][0]) is Pair
+    assert torch.equal(snapshot["model"]["weights"], torch.ones(3))
+    assert torch.equal(snapshot["optimizer"][0].first, torch.ones(3))
+    assert snapshot["step"] == 7
+
+
+def test_writer_saves_the_state_of_the_call(tmp_path):
+    writer = AsyncCheckpointWriter()
+    weights = torch.zeros(2)
+
+    for step in range(3):
+        weights.fill_(step)
+        writer.save({"weights": weights}, str(tmp_path / f"{step}.ckpt"))
+    writer.close()
+
+    for step in range(3):
+        state = torch.load(tmp_path / f"{step}.ckpt", weights_only=True)
+        assert torch.equal(state["weights"], torch.full((2,), float(step)))
+    assert writer.saved_paths == [str(tmp_path / f"{step}.ckpt") for step in range(3)]
+    assert writer.max_write_seconds > 0.0
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_writer_writes_one_checkpoint_at_a_time():
+    started, release = threading.Event(), threading.Event()
+    paths = []
+
+    def save(state, path):
+        started.set()
+        release.wait(5.0)
+        paths.append(path)
+
+    writer = AsyncCheckpointWriter(save)
+    writer.save({}, "first")
+    assert started.wait(5.0)
+    assert writer.is_writing
+
+    # the second save only starts after the first one is written
+    threading.Timer(0.05, release.set).start()
+    writer.save({}, "second")
+    assert paths[0] == "first"
+
+    writer.close()
+    assert paths == ["first", "second"]
+
+
+def test_writer_raises_errors_of_the_background_write():
+    def save(state, path):
+        raise OSError("disk full")
+
+    writer = AsyncCheckpointWriter(save)
+    writer.save({}, "checkpoint")
+    with pytest.raises(OSError, match="disk full"):
+        writer.wait()
+    writer.close()
+
+
+def test_atomic_save_creates_the_directory(tmp_path):
+    path = str(tmp_path / "checkpoints" / "last.ckpt")
+    atomic_save({"step": 1}, path)
+
+    assert torch.load(path, weights_only=True) == {"step": 1}
@@ -0,0 +1,70 @@
+import pytest
+import torch.optim.lr_scheduler as pytorch_schedulers
+
+import progressive_scheduling.schedulers as progressive_schedulers
+
+from .conformance import (
+    TOLERANCE,
+    compare_schedulers,
+    format_worst_points,
+    random_configs,
+    reference_progress,
+    run_conformance,
+)
+from .util import create_optimizer
+
+
+def test_random_configs_match_pytorch():
+    worst_points = run_conformance(random_configs(96))
+
+    assert (
+        max(point.error for point in worst_points) <= TOLERANCE
+    ), "Schedulers differ:\n" + format_worst_points(worst_points)
+
+
+def test_process_pool_returns_the_configs_in_order():
+    configs = random_configs(6, seed=1)
+
+    worst_points = run_conformance(configs, max_workers=2, chunk_size=2)
+
+    assert [point.config for point in worst_points] == configs
+    assert worst_points == run_conformance(configs, max_workers=1)
+
+
+@pytest.mark.parametrize(
+    "three_phase, steps, expected",
+    [
+        (False, [0, 29, 99], [0.0, 0.3, 1.0]),
+        (True, [0, 29, 58, 99], [0.0, 0.3, 0.6, 1.0]),
+    ],
+)
+def test_reference_progress_ends_the_phases_of_one_cycle(three_phase, steps, expected):
+    scheduler = pytorch_schedulers.OneCycleLR(
+        create_optimizer(),
+        max_lr=0.1,
+        total_steps=100,
+        cycle_momentum=False,
+        three_phase=three_phase,
+    )
+
+    progress = reference_progress(scheduler, 100)
+
+    assert progress[steps].tolist() == pytest.approx(expected, abs=1e-15)
+
+
+def test_detects_different_schedules():
+    progressive_scheduler = progressive_schedulers.OneCycleLR(
+        create_optimizer(), max_lr=0.1, pct_start=0.3, cycle_momentum=False
+    )
+    pytorch_scheduler = pytorch_schedulers.OneCycleLR(
+        create_optimizer(),
+        max_lr=0.1,
+        total_steps=1000,
+        pct_start=0.301,
+        cycle_momentum=False,
+    )
+
+    worst_point = compare_schedulers(progressive_scheduler, pytorch_scheduler, 1000)
+
+    assert worst_point.error > 1e-5
+    assert worst_point.key == "lr"
@@ -0,0 +1,159 @@
+import pytest
+import torch
+from torch.utils.data import DataLoader, SequentialSampler
+
+import progressive_scheduling.schedulers as progressive_schedulers
+from progressive_scheduling import Curriculum, Knob, ScheduleBuilder
+from progressive_scheduling.curriculum import (
+    batch_size_lr_scale,
+    gradient_accumulation_steps,
+)
+from progressive_scheduling.data import (
+    CurriculumBatchSampler,
+    CurriculumDataset,
+    set_dropout,
+    truncate_sequences,
+)
+
+from .util import create_optimizer
+
+
+def batch_size_knob(**kwargs):
+    return Knob(
+        ScheduleBuilder(start=4).linear(0.5, to=16).constant(0.5),
+        multiple_of=4,
+        **kwargs,
+    )
+
+
+def test_knob_rounds_to_multiples():
+    knob = batch_size_knob()
+
+    progress = [0.0, 0.05, 0.1, 0.25, 0.5, 1.0]
+    assert [knob(value) for value in progress] == [4, 4, 8, 12, 16, 16]
+    assert Knob(ScheduleBuilder(start=0.0).linear(1.0, to=10), multiple_of=4)(0.0) == 4
+
+
+def test_knob_needs_a_single_entry():
+    with pytest.raises(ValueError):
+        Knob(ScheduleBuilder(start=[1.0, 2.0]).constant(1.0))
+    with pytest.raises(ValueError):
+        Knob(ScheduleBuilder(start=4).constant(1.0), multiple_of=0)
+
+
+def test_curriculum_applies_changed_values():
+    applied = []
+    curriculum = Curriculum(
+        {
+            "batch_size": batch_size_knob(apply=applied.append),
+            "dropout": ScheduleBuilder(start=0.1).linear(1.0, to=0.0),
+        }
+    )
+    assert curriculum.values == {"batch_size": 4, "dropout": 0.1}
+
+    assert curriculum.step(0.0) == {"batch_size": 4, "dropout": 0.1}
+    assert curriculum.step(0.05) == {"dropout": pytest.approx(0.095)}
+    assert curriculum.step(0.3) == {"batch_size": 12, "dropout": pytest.approx(0.07)}
+    assert curriculum["batch_size"] == 12
+    assert applied == [4, 12]
+
+    curriculum.reset()
+    curriculum.step(0.3)
+    assert applied == [4, 12, 12]
+
+
+def test_batch_size_helpers():
+    assert gradient_accumulation_steps(256, 64) == 4
+    assert gradient_accumulation_steps(32, 64) == 1
+    assert batch_size_lr_scale(512, 256) == 2.0
+    assert batch_size_lr_scale(1024, 256, "sqrt") == 2.0
+    with pytest.raises(ValueError):
+        batch_size_lr_scale(1024, 256, "log")
+
+
+def test_lr_scale_scales_the_written_learning_rates():
+    optimizer = create_optimizer(num_param_groups=2)
+    scheduler = progressive_schedulers.CosineAnnealingLR(optimizer)
+    group = progressive_schedulers.SchedulerGroup([scheduler])
+    optimizer.step()
+
+    scheduler.lr_scale = 2.0
+    scheduler.step(0.5)
+    assert scheduler.get_last_lr() == pytest.approx([0.1, 0.1])
+
+    scheduler.lr_scale = 0.5
+    group.step(0.5)
+    assert scheduler.get_last_lr() == pytest.approx([0.025, 0.025])
+
+
+def test_batch_sampler_follows_the_curriculum():
+    curriculum = Curriculum({"batch_size": batch_size_knob()})
+    dataloader = DataLoader(
+        torch.arange(40),
+        batch_sampler=CurriculumBatchSampler(SequentialSampler(range(40)), curriculum),
+    )
+
+    batch_sizes = []
+    for batch in dataloader:
+        batch_sizes.append(len(batch))
+        curriculum.step(min(len(batch_sizes) / 4, 1.0))
+
+    assert batch_sizes == [4, 12, 16, 8]
+
+
+def test_batch_sampler_len_uses_the_current_batch_size():
+    curriculum = Curriculum({"batch_size": batch_size_knob()})
+    sampler = CurriculumBatchSampler(SequentialSampler(range(42)), curriculum)
+
+    assert len(sampler) == 11
+    curriculum.step(1.0)
+    assert len(sampler) == 3
+    assert len(DataLoader(range(42), batch_sampler=sampler)) == 3
+
+    sampler.drop_last = True
+    assert len(sampler) == 2
+
+
+def test_batch_sampler_truncates_sequences():
+    curriculum = Curriculum(
+        {
+            "batch_size": batch_size_knob(),
+            "sequence_length": Knob(
+                ScheduleBuilder(start=2).linear(1.0, to=8), multiple_of=2
+            ),
+        }
+    )
+    dataset = CurriculumDataset(
+        [{"input_ids": torch.arange(8), "label": index} for index in range(20)]
+    )
+    sampler = CurriculumBatchSampler(
+        range(20), curriculum, sequence_length="sequence_length", drop_last=True
+    )
+    dataloader = DataLoader(dataset, batch_sampler=sampler)
+
+    shapes = []
+    for batch in dataloader:
+        shapes.append(tuple(batch["input_ids"].shape))
+        curriculum.step(0.5)
+
+    assert shapes == [(4, 2), (16, 6)]
+    assert dataset[3]["input_ids"].shape == (8,)
+
+
+def test_truncate_sequences():
+    sample = ({"tokens": torch.arange(6)}, [torch.zeros(2, 6)], torch.tensor(3), "x")
+
+    truncated = truncate_sequences(sample, 4)
+
+    assert truncated[0]["tokens"].tolist() == [0, 1, 2, 3]
+    assert truncated[1][0].shape == (2, 4)
+    assert truncated[2:] == (sample[2], "x")
+
+
+def test_set_dropout():
+    model = torch.nn.Sequential(
+        torch.nn.Dropout(0.1), torch.nn.Linear(1, 1), torch.nn.Dropout2d(0.2)
+    )
+
+    assert set_dropout(model, 0.05) == 2
+    assert model[0].p == model[2].p == 0.05
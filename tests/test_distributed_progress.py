@@ -0,0 +1,88 @@
+import json
+import os
+import random
+import socket
+
+import pytest
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+from progressive_scheduling.progress import (
+    DistributedProgressEstimator,
+    ThroughputProgressEstimator,
+)
+
+WORLD_SIZE = 3
+
+
+def run_rank(rank, tmp_path, port, sync_every):
+    dist.init_process_group(
+        "gloo",
+        init_method=f"tcp://127.0.0.1:{port}",
+        rank=rank,
+        world_size=WORLD_SIZE,
+    )
+    try:
+        run_estimator(rank, tmp_path, sync_every)
+    finally:
+        # all ranks leave together, so no rank tears down a peer's connection.
+        # The group is not destroyed, that can hang on the rank hosting the store
+        # once the other ranks are gone, process exit cleans it up instead.
+        dist.barrier()
+
+
+def run_estimator(rank, tmp_path, sync_every):
+    estimator = DistributedProgressEstimator(
+        ThroughputProgressEstimator(), sync_every=sync_every
+    )
+
+    # every rank sees different step times
+    rng = random.Random(rank)
+    consumed = 0.0
+    progress = []
+    while not estimator.is_final_step:
+        consumed += rng.uniform(0.5, 1.5) * (1 + rank)
+        progress.append(estimator.update(consumed, budget=500.0))
+
+    with open(os.path.join(tmp_path, f"rank{rank}.json"), "w") as f:
+        json.dump({"progress": progress, "num_syncs": estimator.num_syncs}, f)
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.parametrize("sync_every", [1, 10])
+def test_ranks_agree_on_progress_and_stop(tmp_path, sync_every):
+    mp.spawn(
+        run_rank,
+        args=(str(tmp_path), get_free_port(), sync_every),
+        nprocs=WORLD_SIZE,
+    )
+
+    results = []
+    for rank in range(WORLD_SIZE):
+        with open(tmp_path / f"rank{rank}.json") as f:
+            results.append(json.load(f))
+
+    progress = results[0]["progress"]
+    assert all(result["progress"] == progress for result in results)
+    assert progress[-1] == 1.0
+    assert all(p < 1.0 for p in progress[:-1])
+    assert all(b >= a for a, b in zip(progress, progress[1:]))
+    # rank 0 consumes about one unit of the budget per step
+    assert 450 <= len(progress) <= 510
+    assert results[0]["num_syncs"] == len(progress) // sync_every + (sync_every > 1)
+
+
+def test_without_process_group():
+    estimator = DistributedProgressEstimator(
+        ThroughputProgressEstimator(), sync_every=4
+    )
+    progress = [estimator.update(step, budget=10.5) for step in range(1, 11)]
+
+    assert progress[-1] == 1.0
+    assert estimator.is_final_step
+    assert estimator.predicted_total_steps == 10
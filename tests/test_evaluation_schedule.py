@@ -0,0 +1,159 @@
+import pytest
+from torch.utils.data import DataLoader
+
+from progressive_scheduling import EvaluationSchedule
+from progressive_scheduling.data import EvaluationSubsetSampler
+
+
+def test_points_get_denser_toward_the_end():
+    schedule = EvaluationSchedule(points=4, density=2.0)
+    assert schedule.points == pytest.approx([0.4375, 0.75, 0.9375, 1.0])
+
+    schedule = EvaluationSchedule(points=4, density=1.0)
+    assert schedule.points == pytest.approx([0.25, 0.5, 0.75, 1.0])
+
+    schedule = EvaluationSchedule(points=[1.0, 0.5])
+    assert schedule.points == [0.5, 1.0]
+
+
+def test_evaluations_are_due_at_the_points():
+    schedule = EvaluationSchedule(
+        points=[0.5, 0.6, 1.0], max_fraction=1.0, full_cost=1.0
+    )
+    due = []
+    for step in range(1, 11):
+        if schedule.is_due(step / 10, budget=100.0):
+            due.append(step / 10)
+            schedule.record(1.0)
+
+    assert due == [0.5, 0.6, 1.0]
+    assert schedule.num_evaluations == 3
+
+
+def test_passed_points_count_as_one_evaluation():
+    schedule = EvaluationSchedule(
+        points=[0.2, 0.4, 0.6], max_fraction=1.0, full_cost=1.0
+    )
+    assert schedule.is_due(0.5, budget=100.0)
+    schedule.record(1.0)
+    assert not schedule.is_due(0.5, budget=100.0)
+    assert schedule.is_due(0.6, budget=100.0)
+
+
+def test_subset_fits_into_the_remaining_budget():
+    schedule = EvaluationSchedule(
+        points=[0.25, 0.5, 0.75, 1.0], max_fraction=0.1, full_cost=10.0
+    )
+
+    # 10 seconds for 4 evaluations of 10 seconds each
+    assert schedule.is_due(0.25, budget=100.0)
+    assert schedule.subset == pytest.approx(0.25)
+
+    # the measured cost of 16 seconds replaces the estimate, (10 - 4) seconds
+    # are left for 3 evaluations
+    schedule.record(4.0)
+    assert schedule.is_due(0.5, budget=100.0)
+    assert schedule.subset == pytest.approx(0.125)
+
+    # the cheaper allowance with a larger budget is capped at the full set
+    schedule.record(2.0)
+    assert schedule.is_due(0.75, budget=1000.0)
+    assert schedule.subset == 1.0
+
+
+def test_evaluations_are_skipped_without_budget():
+    schedule = EvaluationSchedule(
+        points=[0.25, 0.5, 1.0], min_subset=0.5, full_cost=3.0
+    )
+    assert schedule.is_due(0.25, budget=100.0)
+    # the first evaluation takes all of the 5 seconds
+    schedule.record(5.0)
+
+    assert not schedule.is_due(0.5, budget=100.0)
+    assert schedule.num_skipped == 1
+    assert not schedule.is_due(1.0, budget=100.0)
+    assert schedule.num_skipped == 2
+
+
+def test_evaluations_are_skipped_without_a_cost_estimate():
+    schedule = EvaluationSchedule(points=[0.5, 1.0])
+    assert not schedule.is_due(0.5, budget=100.0)
+    assert schedule.num_skipped == 1
+
+    schedule.estimate(10.0)
+    assert schedule.is_due(1.0, budget=100.0)
+    assert schedule.subset == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("full_cost", [None, 60.0])
+def test_first_evaluation_stays_within_the_budget(full_cost):
+    schedule = EvaluationSchedule(points=10, max_fraction=0.05, full_cost=full_cost)
+    for step in range(1, 101):
+        if schedule.is_due(step / 100, budget=100.0):
+            schedule.record(60.0 * schedule.subset)
+
+    # not even min_subset of the 60 seconds fits into 5 seconds
+    assert schedule.spent <= 5.0
+    assert schedule.num_skipped == 10
+
+
+@pytest.mark.parametrize("cost", [0.5, 2.0, 20.0])
+def test_evaluations_never_exceed_the_budget(cost):
+    schedule = EvaluationSchedule(points=20, max_fraction=0.05, full_cost=cost)
+    for step in range(1, 101):
+        if schedule.is_due(step / 100, budget=1000.0):
+            schedule.record(cost * schedule.subset)
+
+    assert schedule.spent <= 50.0
+    assert schedule.num_evaluations + schedule.num_skipped <= 20
+
+
+def test_state_dict_restores_the_schedule():
+    schedule = EvaluationSchedule(points=4)
+    schedule.is_due(0.5, budget=100.0)
+    schedule.record(1.0)
+
+    restored = EvaluationSchedule(points=4)
+    restored.load_state_dict(schedule.state_dict())
+    assert restored.state_dict() == schedule.state_dict()
+
+    restored.reset()
+    assert restored.num_evaluations == 0
+    assert restored.spent == 0.0
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"points": 0},
+        {"points": [0.0, 1.0]},
+        {"points": [1.5]},
+        {"density": 0.5},
+        {"max_fraction": 0.0},
+        {"min_subset": 1.5},
+        {"full_cost": 0.0},
+    ],
+)
+def test_schedule_rejects_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        EvaluationSchedule(**kwargs)
+
+
+def test_subset_sampler_follows_the_schedule():
+    schedule = EvaluationSchedule()
+    sampler = EvaluationSubsetSampler(range(100), schedule)
+    dataloader = DataLoader(range(100), batch_size=8, sampler=sampler)
+    assert len(dataloader) == 13
+
+    schedule.subset = 0.1
+    small = [index for batch in dataloader for index in batch.tolist()]
+    schedule.subset = 0.25
+    large = [index for batch in dataloader for index in batch.tolist()]
+
+    assert len(small) == 10
+    assert len(large) == 25
+    assert large[:10] == small
+    assert len(set(large)) == 25
+
+    schedule.subset = 0.0001
+    assert sampler.num_samples == 1
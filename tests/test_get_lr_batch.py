@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import torch
+
+import progressive_scheduling.schedulers as progressive_schedulers
+
+from .util import SCHEDULER_FACTORIES, create_optimizer
+
+
+def create_schedulers():
+    return [
+        create_scheduler(create_optimizer()) for create_scheduler in SCHEDULER_FACTORIES
+    ]
+
+
+@pytest.mark.parametrize("scheduler", create_schedulers())
+def test_get_lr_batch_matches_get_lr(scheduler):
+    progress = np.linspace(0.0, 1.0, 101)
+    lrs = scheduler.get_lr_batch(progress)
+
+    assert isinstance(lrs, np.ndarray)
+    assert lrs.shape == (1, 101)
+    expected = [scheduler.get_lr(float(p))[0] for p in progress]
+    np.testing.assert_allclose(lrs[0], expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("scheduler", create_schedulers())
+def test_get_lr_batch_with_tensor(scheduler):
+    progress = torch.linspace(0.0, 1.0, 101, dtype=torch.float64)
+    lrs = scheduler.get_lr_batch(progress)
+
+    assert isinstance(lrs, torch.Tensor)
+    assert lrs.shape == (1, 101)
+    expected = scheduler.get_lr_batch(progress.numpy())
+    np.testing.assert_allclose(lrs.numpy(), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("scheduler", create_schedulers())
+def test_get_lr_batch_has_no_side_effects(scheduler):
+    lr_before = scheduler.optimizer.param_groups[0]["lr"]
+    step_count_before = scheduler._step_count
+
+    scheduler.get_lr_batch(np.linspace(0.0, 1.0, 11))
+
+    assert scheduler.optimizer.param_groups[0]["lr"] == lr_before
+    assert scheduler._step_count == step_count_before
+
+
+def test_get_lr_batch_invalid_progress_values():
+    scheduler = progressive_schedulers.CosineAnnealingLR(create_optimizer())
+    with pytest.raises(ValueError):
+        scheduler.get_lr_batch([0.0, 0.5, 1.1])
+    with pytest.raises(ValueError):
+        scheduler.get_lr_batch(torch.tensor([-0.1, 0.5]))
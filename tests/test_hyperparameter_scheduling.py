@@ -0,0 +1,113 @@
+import pytest
+import torch
+import torch.optim.lr_scheduler as pytorch_schedulers
+from torch.optim import SGD, Adagrad, Adam
+
+import progressive_scheduling.schedulers as progressive_schedulers
+
+from .util import SCHEDULER_FACTORIES
+
+
+def create_model_optimizer(optimizer_class, **kwargs):
+    model = torch.nn.Linear(1, 1)
+    return optimizer_class(model.parameters(), lr=0.1, **kwargs)
+
+
+def get_momentum(optimizer):
+    param_group = optimizer.param_groups[0]
+    return (
+        param_group["betas"][0] if "betas" in param_group else param_group["momentum"]
+    )
+
+
+@pytest.mark.parametrize("optimizer_class", [SGD, Adam])
+def test_one_cycle_momentum_matches_pytorch(optimizer_class):
+    total_steps = 1000
+    progressive_optimizer = create_model_optimizer(optimizer_class)
+    progressive_scheduler = progressive_schedulers.OneCycleLR(
+        progressive_optimizer, max_lr=0.1
+    )
+    pytorch_optimizer = create_model_optimizer(optimizer_class)
+    pytorch_scheduler = pytorch_schedulers.OneCycleLR(
+        pytorch_optimizer, max_lr=0.1, total_steps=total_steps
+    )
+    assert get_momentum(progressive_optimizer) == get_momentum(pytorch_optimizer)
+
+    for step in range(1, total_steps):
+        progressive_optimizer.step()
+        pytorch_optimizer.step()
+        progressive_scheduler.step(step / (total_steps - 1))
+        pytorch_scheduler.step()
+
+        assert get_momentum(progressive_optimizer) == pytest.approx(
+            get_momentum(pytorch_optimizer), abs=1e-3
+        )
+    assert get_momentum(progressive_optimizer) == pytest.approx(0.95)
+
+
+def test_adam_keeps_beta2():
+    optimizer = create_model_optimizer(Adam, betas=(0.9, 0.98))
+    scheduler = progressive_schedulers.OneCycleLR(optimizer, max_lr=0.1)
+    optimizer.step()
+    scheduler.step(0.3)
+
+    assert optimizer.param_groups[0]["betas"] == pytest.approx((0.85, 0.98))
+
+
+def test_per_group_momentum():
+    param_groups = [{"params": [torch.nn.Parameter(torch.zeros(1))]} for _ in range(2)]
+    optimizer = SGD(param_groups, lr=0.1, momentum=0.9)
+    scheduler = progressive_schedulers.OneCycleLR(
+        optimizer, max_lr=0.1, base_momentum=[0.8, 0.85], max_momentum=[0.9, 0.99]
+    )
+    optimizer.step()
+    scheduler.step(0.3)
+
+    assert [group["momentum"] for group in optimizer.param_groups] == pytest.approx(
+        [0.8, 0.85]
+    )
+
+
+def test_without_cycle_momentum():
+    optimizer = create_model_optimizer(SGD, momentum=0.5)
+    scheduler = progressive_schedulers.OneCycleLR(
+        optimizer, max_lr=0.1, cycle_momentum=False
+    )
+    optimizer.step()
+    scheduler.step(0.3)
+
+    assert optimizer.param_groups[0]["momentum"] == 0.5
+
+
+def test_cycle_momentum_needs_momentum():
+    with pytest.raises(ValueError):
+        progressive_schedulers.OneCycleLR(create_model_optimizer(Adagrad), max_lr=0.1)
+
+
+@pytest.mark.parametrize("create_scheduler", SCHEDULER_FACTORIES)
+def test_weight_decay_is_annealed(create_scheduler):
+    optimizer = create_model_optimizer(SGD, weight_decay=0.1)
+    scheduler = create_scheduler(optimizer, final_weight_decay=0.5)
+    optimizer.step()
+
+    weight_decays = []
+    for step in range(1, 11):
+        scheduler.step(step / 10)
+        weight_decays.append(optimizer.param_groups[0]["weight_decay"])
+
+    assert weight_decays[4] == pytest.approx(0.3)
+    assert weight_decays[-1] == pytest.approx(0.5)
+    assert all(b >= a for a, b in zip(weight_decays, weight_decays[1:]))
+
+
+def test_tensor_progress_writes_tensor_momentum():
+    model = torch.nn.Linear(1, 1)
+    optimizer = SGD(model.parameters(), lr=torch.tensor(0.1))
+    optimizer.param_groups[0]["momentum"] = torch.tensor(0.0)
+    momentum = optimizer.param_groups[0]["momentum"]
+    scheduler = progressive_schedulers.OneCycleLR(optimizer, max_lr=0.1)
+
+    scheduler.set_progress(torch.tensor(0.3))
+
+    assert optimizer.param_groups[0]["momentum"] is momentum
+    assert momentum.item() == pytest.approx(0.85)
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "progressive_scheduling",
+        "progressive_scheduling.curriculum",
+        "progressive_scheduling.evaluation",
+        "progressive_scheduling.history",
+        "progressive_scheduling.piecewise",
+        "progressive_scheduling.progress",
+        "progressive_scheduling.sweep",
+        "progressive_scheduling.visualize",
+        "progressive_scheduling.callbacks",
+    ],
+)
+def test_core_does_not_import_heavy_dependencies(module):
+    code = (
+        f"import sys, {module}\n"
+        "print([name for name in ('torch', 'matplotlib', 'lightning') "
+        "if name in sys.modules])"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+
+    assert output.strip() == "[]"
+
+
+def test_lazy_attributes():
+    import progressive_scheduling
+    from progressive_scheduling.schedulers import ProgressiveScheduler
+
+    assert progressive_scheduling.ProgressiveScheduler is ProgressiveScheduler
+    assert "CosineAnnealingLR" in dir(progressive_scheduling)
+    with pytest.raises(AttributeError):
+        progressive_scheduling.UnknownScheduler
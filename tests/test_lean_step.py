@@ -0,0 +1,107 @@
+import pytest
+import torch
+from torch.optim import SGD
+
+import progressive_scheduling.schedulers as progressive_schedulers
+
+from .util import create_optimizer
+
+
+def test_lr_rtol_skips_small_changes():
+    optimizer = create_optimizer()
+    scheduler = progressive_schedulers.CosineAnnealingLR(optimizer, lr_rtol=1e-3)
+    optimizer.step()
+
+    # the cosine is flat at the start, so the first steps are skipped
+    scheduler.step(0.001)
+    assert optimizer.param_groups[0]["lr"] == 0.1
+
+    scheduler.step(0.5)
+    assert optimizer.param_groups[0]["lr"] == pytest.approx(0.05)
+
+
+def test_lr_rtol_bounds_the_error():
+    optimizer = create_optimizer()
+    scheduler = progressive_schedulers.OneCycleLR(optimizer, max_lr=0.1, lr_rtol=1e-2)
+    reference = progressive_schedulers.OneCycleLR(create_optimizer(), max_lr=0.1)
+    optimizer.step()
+    reference.optimizer.step()
+
+    for step in range(1, 1001):
+        scheduler.step(step / 1000)
+        reference.step(step / 1000)
+        actual = scheduler.get_last_lr()[0]
+        assert abs(actual - reference.get_last_lr()[0]) <= 1e-2 * actual
+
+
+def test_lr_rtol_reduces_tensor_writes():
+    param = torch.nn.Parameter(torch.zeros(1))
+    optimizer = SGD([param], lr=torch.tensor(0.1))
+    scheduler = progressive_schedulers.CosineAnnealingLR(optimizer, lr_rtol=1e-2)
+    optimizer.step()
+    lr = optimizer.param_groups[0]["lr"]
+    version = lr._version
+
+    for step in range(1, 1001):
+        scheduler.step(step / 1000)
+
+    # near eta_min = 0 every step changes the learning rate by more than 1%
+    assert lr._version - version < 400
+
+
+def test_lr_levels_limit_the_number_of_changes():
+    optimizer = create_optimizer()
+    scheduler = progressive_schedulers.CosineAnnealingLR(optimizer, lr_levels=4)
+    optimizer.step()
+
+    learning_rates = set()
+    for step in range(1, 101):
+        scheduler.step(step / 100)
+        learning_rates.add(optimizer.param_groups[0]["lr"])
+
+    # one learning rate for each of the levels 0, 1/4, 2/4, 3/4 and 1
+    assert len(learning_rates) == 5
+    assert optimizer.param_groups[0]["lr"] == pytest.approx(0.0)
+    assert scheduler.last_epoch == 100
+
+
+def test_lr_levels_write_a_new_lr_scale():
+    optimizer = create_optimizer()
+    scheduler = progressive_schedulers.CosineAnnealingLR(optimizer, lr_levels=4)
+    optimizer.step()
+    scheduler.step(0.1)
+
+    # the level stays at 0.0, the new scale is still written
+    scheduler.lr_scale = 2.0
+    scheduler.step(0.2)
+    assert optimizer.param_groups[0]["lr"] == pytest.approx(0.2)
+
+
+def test_lr_levels_still_check_progress():
+    scheduler = progressive_schedulers.CosineAnnealingLR(
+        create_optimizer(), lr_levels=10
+    )
+    scheduler.optimizer.step()
+
+    with pytest.raises(ValueError):
+        scheduler.step(-0.01)
+
+
+def test_last_lr_can_be_collected():
+    optimizer = create_optimizer(num_param_groups=3)
+    scheduler = progressive_schedulers.CosineAnnealingLR(optimizer)
+    optimizer.step()
+
+    collected = []
+    for progress in (0.0, 0.5, 1.0):
+        scheduler.step(progress)
+        collected.append(scheduler.get_last_lr())
+
+    assert [lrs[0] for lrs in collected] == pytest.approx([0.1, 0.05, 0.0])
+    assert collected[-1] == [group["lr"] for group in optimizer.param_groups]
+
+
+@pytest.mark.parametrize("kwargs", [{"lr_rtol": -1.0}, {"lr_levels": 0}])
+def test_invalid_lean_step_options(kwargs):
+    with pytest.raises(ValueError):
+        progressive_schedulers.CosineAnnealingLR(create_optimizer(), **kwargs)
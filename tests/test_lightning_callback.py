@@ -0,0 +1,700 @@
+from types import SimpleNamespace
+
+import pytest
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+import progressive_scheduling.schedulers as progressive_schedulers
+from progressive_scheduling import (
+    Curriculum,
+    EvaluationSchedule,
+    Knob,
+    ScheduleBuilder,
+)
+from progressive_scheduling.curriculum import gradient_accumulation_steps
+from progressive_scheduling.progress import (
+    CalibratedProgressEstimator,
+    DistributedProgressEstimator,
+    ElapsedProgressEstimator,
+    ThroughputProgressEstimator,
+    TimeSource,
+    TokenSource,
+)
+
+from .util import FakeClock, create_optimizer
+
+lightning_callbacks = pytest.importorskip("progressive_scheduling.callbacks.lightning")
+pl = pytest.importorskip("lightning.pytorch")
+TorchCheckpointIO = pl.plugins.TorchCheckpointIO
+
+
+def create_callback(
+    training_duration={"seconds": 10},
+    clock=None,
+    resume_from=None,
+    history_size=None,
+    **kwargs,
+):
+    clock = clock or FakeClock()
+
+    optimizer = create_optimizer()
+    scheduler = progressive_schedulers.CosineAnnealingLR(optimizer)
+    trainer = SimpleNamespace(
+        should_stop=False,
+        global_step=0,
+        check_val_every_n_epoch=1,
+        fit_loop=SimpleNamespace(epoch_loop=SimpleNamespace(total_batch_idx=-1)),
+    )
+    pl_module = SimpleNamespace(lr_schedulers=lambda: scheduler)
+
+    callback = lightning_callbacks.AutoSchedulingCallback(training_duration, **kwargs)
+    for source in getattr(
+        callback.progress_source, "sources", [callback.progress_source]
+    ):
+        if isinstance(source, TimeSource):
+            source.clock = source.wall_clock = clock
+    callback.clock = clock
+    if resume_from is not None:
+        callback.load_state_dict(resume_from)
+    if history_size is not None:
+        callback.enable_instrumentation(history_size)
+    callback.on_train_start(trainer, pl_module)
+    return callback, clock, trainer, pl_module, optimizer
+
+
+def step_optimizer(trainer, optimizer):
+    optimizer.step()
+    trainer.global_step += 1
+
+
+def run_batches(callback, clock, trainer, pl_module, optimizer, step_time, batch=None):
+    learning_rates = []
+    batch_idx = 0
+    while not trainer.should_stop:
+        callback.on_train_batch_start(trainer, pl_module, batch, batch_idx)
+        clock.now += step_time
+        step_optimizer(trainer, optimizer)
+        callback.on_train_batch_end(trainer, pl_module, None, batch, batch_idx)
+        learning_rates.append(optimizer.param_groups[0]["lr"])
+        batch_idx += 1
+    return learning_rates
+
+
+def test_callback_stops_after_time_budget():
+    callback, clock, trainer, pl_module, optimizer = create_callback()
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=1.0
+    )
+
+    assert len(learning_rates) == 10
+    assert learning_rates[-1] == pytest.approx(0.0)
+    assert callback.remaining_time == 0.0
+
+
+def test_callback_with_throughput_progress_estimator():
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        progress_estimator=ThroughputProgressEstimator()
+    )
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=0.75
+    )
+
+    assert len(learning_rates) == callback.predicted_total_steps == 13
+    assert learning_rates[-1] == 0.0
+    assert callback.remaining_time == pytest.approx(0.25)
+
+
+def test_callback_with_calibrated_progress_estimator():
+    estimator = CalibratedProgressEstimator(warmup_steps=0, calibration_steps=4)
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        progress_estimator=estimator
+    )
+    run_batches(callback, clock, trainer, pl_module, optimizer, step_time=1.0)
+
+    assert trainer.global_step == callback.predicted_total_steps == 10
+    assert estimator.step_cost == 1.0
+
+
+def test_callback_with_distributed_progress_estimator():
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        progress_estimator=DistributedProgressEstimator(
+            ElapsedProgressEstimator(), sync_every=7
+        ),
+    )
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=1.0
+    )
+
+    # the end of the budget at step 10 is only seen at the sync at step 14
+    assert len(learning_rates) == 14
+    assert learning_rates[-1] == 0.0
+
+
+def test_callback_stops_after_token_budget():
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        training_duration=None, progress_source=TokenSource(1000)
+    )
+    batch = {"input_ids": torch.zeros(4, 25, dtype=torch.long)}
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=1.0, batch=batch
+    )
+
+    assert len(learning_rates) == 10
+    assert learning_rates[-1] == pytest.approx(0.0)
+
+
+def test_callback_stops_at_first_exhausted_budget():
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        progress_source=TokenSource(1000)
+    )
+    batch = {"input_ids": torch.zeros(4, 25, dtype=torch.long)}
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=2.0, batch=batch
+    )
+
+    # the time budget of 10 seconds runs out before the token budget
+    assert len(learning_rates) == 5
+    assert learning_rates[-1] == pytest.approx(0.0)
+
+
+def test_callback_needs_a_budget():
+    with pytest.raises(ValueError):
+        lightning_callbacks.AutoSchedulingCallback()
+
+
+def run_until_preemption(num_batches, batch=None, **kwargs):
+    callback, clock, trainer, pl_module, optimizer = create_callback(**kwargs)
+    for batch_idx in range(num_batches):
+        callback.on_train_batch_start(trainer, pl_module, batch, batch_idx)
+        clock.now += 1.0
+        step_optimizer(trainer, optimizer)
+        callback.on_train_batch_end(trainer, pl_module, None, batch, batch_idx)
+    return callback, clock
+
+
+@pytest.mark.parametrize(
+    "exclude_downtime, expected_steps", [(False, 1), (True, 5)], ids=str
+)
+def test_callback_resumes_time_budget(exclude_downtime, expected_steps):
+    callback, clock = run_until_preemption(
+        4,
+        progress_estimator=ThroughputProgressEstimator(),
+        exclude_downtime=exclude_downtime,
+    )
+    state_dict = callback.state_dict()
+    progress = callback.progress_estimator.progress
+    # the job is down for 5 seconds before it resumes
+    clock.now += 5.0
+
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        clock=clock,
+        resume_from=state_dict,
+        progress_estimator=ThroughputProgressEstimator(),
+        exclude_downtime=exclude_downtime,
+    )
+    assert callback.progress_estimator.step == 4
+    assert callback.progress_estimator.progress == progress
+
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=1.0
+    )
+    assert len(learning_rates) == expected_steps
+    assert learning_rates[-1] == 0.0
+
+
+def test_callback_resumes_token_budget():
+    batch = {"input_ids": torch.zeros(2, 5)}
+    callback, _ = run_until_preemption(
+        3, batch=batch, training_duration=None, progress_source=TokenSource(100)
+    )
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        training_duration=None,
+        progress_source=TokenSource(100),
+        resume_from=callback.state_dict(),
+    )
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=1.0, batch=batch
+    )
+    assert len(learning_rates) == 7
+    assert callback.schedulers[0].last_progress == 1.0
+
+
+class NeverEndingProgressEstimator(ElapsedProgressEstimator):
+    def update(self, consumed, budget):
+        super().update(consumed, budget)
+        self.is_final_step = False
+        return 0.5
+
+
+def test_callback_stops_when_budget_is_exceeded():
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        progress_estimator=NeverEndingProgressEstimator()
+    )
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=3.0
+    )
+
+    assert len(learning_rates) == 4
+    assert callback.exceeded_training_duration
+
+
+@pytest.mark.parametrize(
+    "excluded_phases, expected_steps",
+    [((), 3), (("validation", "checkpoint"), 5), (("overhead",), 3)],
+    ids=str,
+)
+def test_callback_excludes_phases_from_budget(excluded_phases, expected_steps):
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        training_duration={"seconds": 5}, excluded_phases=excluded_phases
+    )
+
+    for batch_idx in range(2):
+        callback.on_train_batch_start(trainer, pl_module, None, batch_idx)
+        clock.now += 1.0
+        step_optimizer(trainer, optimizer)
+        callback.on_train_batch_end(trainer, pl_module, None, None, batch_idx)
+
+    callback.on_validation_start(trainer, pl_module)
+    clock.now += 1.0
+    callback.on_validation_end(trainer, pl_module)
+    callback.on_save_checkpoint(trainer, pl_module, {})
+    clock.now += 1.0
+
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=1.0
+    )
+    callback.on_train_end(trainer, pl_module)
+
+    assert 2 + len(learning_rates) == expected_steps
+    assert callback.time_by_phase == {
+        "train": expected_steps,
+        "validation": 1.0,
+        "checkpoint": 1.0,
+        "overhead": 0.0,
+    }
+
+
+def test_callback_reports_time_by_phase():
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        excluded_phases=["overhead"]
+    )
+    # e.g. the dataloader workers start, which doesn't count against the budget
+    clock.now += 2.0
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=2.0
+    )
+    callback.on_train_end(trainer, pl_module)
+
+    assert len(learning_rates) == 5
+    assert callback.time_by_phase["overhead"] == 2.0
+    report = callback.format_time_by_phase()
+    assert "train" in report and "(excluded)" in report
+
+
+def test_callback_rejects_unknown_phases():
+    with pytest.raises(ValueError):
+        lightning_callbacks.AutoSchedulingCallback(
+            {"seconds": 10}, excluded_phases=["train"]
+        )
+
+
+def test_callback_steps_only_with_the_optimizer():
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        training_duration=None, progress_source=TokenSource(100)
+    )
+    scheduler = callback.schedulers[0]
+    batch = {"input_ids": torch.zeros(1, 5)}
+    accumulate_grad_batches = 4
+
+    batch_idx = 0
+    while not trainer.should_stop:
+        callback.on_train_batch_start(trainer, pl_module, batch, batch_idx)
+        if (batch_idx + 1) % accumulate_grad_batches == 0:
+            step_optimizer(trainer, optimizer)
+        callback.on_train_batch_end(trainer, pl_module, None, batch, batch_idx)
+        batch_idx += 1
+
+    assert batch_idx == 20
+    assert callback.progress_estimator.step == trainer.global_step == 5
+    # including the initial step of the scheduler
+    assert scheduler._step_count == 6
+
+
+def test_callback_steps_every_step_interval():
+    callback, clock, trainer, pl_module, optimizer = create_callback(step_interval=3)
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=1.0
+    )
+
+    assert len(learning_rates) == 12
+    assert callback.progress_estimator.step == 4
+    assert learning_rates[:2] == [0.1, 0.1]
+    assert learning_rates[-1] == pytest.approx(0.0)
+
+
+def test_callback_steps_every_step_interval_with_several_optimizers():
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        {"seconds": 1000}, step_interval=3, history_size=8
+    )
+    for batch_idx in range(6):
+        callback.on_train_batch_start(trainer, pl_module, None, batch_idx)
+        clock.now += 1.0
+        # two optimizers step on every batch
+        step_optimizer(trainer, optimizer)
+        trainer.global_step += 1
+        callback.on_train_batch_end(trainer, pl_module, None, None, batch_idx)
+
+    # updates after at least 3 optimizer steps, i.e. every second batch
+    assert callback.progress_estimator.step == 3
+    records = callback.history.to_numpy()
+    assert records["step"].tolist() == [4, 8, 12]
+    assert records["progress"].tolist() == pytest.approx([0.002, 0.004, 0.006])
+
+
+def test_callback_steps_all_progressive_schedulers():
+    clock = FakeClock()
+    optimizers = [create_optimizer() for _ in range(3)]
+    cosine = progressive_schedulers.CosineAnnealingLR(optimizers[0])
+    one_cycle = progressive_schedulers.OneCycleLR(optimizers[1], max_lr=0.1)
+    step_lr = torch.optim.lr_scheduler.StepLR(optimizers[2], step_size=1)
+    trainer = SimpleNamespace(should_stop=False, global_step=0)
+    pl_module = SimpleNamespace(lr_schedulers=lambda: [cosine, one_cycle, step_lr])
+
+    callback = lightning_callbacks.AutoSchedulingCallback({"seconds": 10})
+    callback.progress_source.clock = callback.clock = clock
+    callback.on_train_start(trainer, pl_module)
+    assert callback.schedulers == [cosine, one_cycle]
+
+    clock.now += 5.0
+    for optimizer in optimizers:
+        optimizer.step()
+    trainer.global_step += 1
+    callback.on_train_batch_end(trainer, pl_module, None, None, 0)
+
+    assert cosine.last_progress == one_cycle.last_progress == 0.5
+    assert optimizers[2].param_groups[0]["lr"] == 0.1
+
+
+def test_step_interval_must_be_positive():
+    with pytest.raises(ValueError):
+        lightning_callbacks.AutoSchedulingCallback({"seconds": 10}, step_interval=0)
+
+
+def test_callback_steps_the_curriculum():
+    trainer_settings = {}
+    curriculum = Curriculum(
+        {
+            "batch_size": Knob(
+                ScheduleBuilder(start=4).linear(0.5, to=16).constant(0.5),
+                multiple_of=4,
+                apply=lambda batch_size: trainer_settings.update(
+                    accumulate_grad_batches=gradient_accumulation_steps(batch_size, 4)
+                ),
+            )
+        }
+    )
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        curriculum=curriculum
+    )
+    assert trainer_settings == {"accumulate_grad_batches": 1}
+
+    run_batches(callback, clock, trainer, pl_module, optimizer, step_time=1.0)
+
+    assert curriculum.last_progress == 1.0
+    assert trainer_settings == {"accumulate_grad_batches": 4}
+
+
+def create_progress_checkpoint(tmp_path, callback, trainer, pl_module, **kwargs):
+    trainer.callbacks = [callback]
+    trainer.world_size = 1
+    trainer.is_global_zero = True
+    trainer.strategy = SimpleNamespace(checkpoint_io=TorchCheckpointIO())
+
+    def save_checkpoint(filepath):
+        checkpoint = {
+            "global_step": trainer.global_step,
+            "callbacks": {"AutoSchedulingCallback": callback.state_dict()},
+        }
+        trainer.strategy.checkpoint_io.save_checkpoint(checkpoint, filepath)
+
+    trainer.save_checkpoint = save_checkpoint
+    checkpoint = lightning_callbacks.ProgressCheckpoint(str(tmp_path), **kwargs)
+    checkpoint.on_train_start(trainer, pl_module)
+    return checkpoint
+
+
+def run_with_checkpoints(checkpoint, callback, clock, trainer, pl_module, optimizer):
+    batch_idx = 0
+    while not trainer.should_stop:
+        callback.on_train_batch_start(trainer, pl_module, None, batch_idx)
+        clock.now += 1.0
+        step_optimizer(trainer, optimizer)
+        callback.on_train_batch_end(trainer, pl_module, None, None, batch_idx)
+        checkpoint.on_train_batch_end(trainer, pl_module, None, None, batch_idx)
+        batch_idx += 1
+    callback.on_train_end(trainer, pl_module)
+    checkpoint.on_train_end(trainer, pl_module)
+    checkpoint.teardown(trainer, pl_module, "fit")
+
+
+def saved_steps(tmp_path):
+    return {
+        path.name: torch.load(path, weights_only=True)["global_step"]
+        for path in tmp_path.glob("*.ckpt")
+    }
+
+
+def test_progress_checkpoint_saves_milestones_and_final(tmp_path):
+    callback, clock, trainer, pl_module, optimizer = create_callback()
+    checkpoint = create_progress_checkpoint(
+        tmp_path, callback, trainer, pl_module, every=0.25, final_save_seconds=1.0
+    )
+    run_with_checkpoints(checkpoint, callback, clock, trainer, pl_module, optimizer)
+
+    # after the first save, the lead time of the final save is about one step
+    assert saved_steps(tmp_path) == {
+        "progress-0.25.ckpt": 3,
+        "progress-0.50.ckpt": 5,
+        "progress-0.75.ckpt": 8,
+        "final.ckpt": 9,
+    }
+    assert checkpoint.final_saved
+    # the training stops with the final save
+    assert trainer.global_step == 9
+    assert isinstance(trainer.strategy.checkpoint_io, TorchCheckpointIO)
+
+
+def test_progress_checkpoint_saves_final_before_the_deadline(tmp_path):
+    callback, clock, trainer, pl_module, optimizer = create_callback()
+    checkpoint = create_progress_checkpoint(
+        tmp_path, callback, trainer, pl_module, every=None, final_save_seconds=2.0
+    )
+    run_with_checkpoints(checkpoint, callback, clock, trainer, pl_module, optimizer)
+
+    # 2.0 * 2.0 seconds for the save and 1 second for the step
+    assert saved_steps(tmp_path) == {"final.ckpt": 5}
+    assert trainer.global_step == 5
+
+
+def test_progress_checkpoint_without_time_budget(tmp_path):
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        training_duration=None, progress_source=TokenSource(total_tokens=40)
+    )
+    checkpoint = create_progress_checkpoint(
+        tmp_path, callback, trainer, pl_module, every=0.5
+    )
+    batch = torch.zeros(1, 4)
+    batch_idx = 0
+    while not trainer.should_stop:
+        step_optimizer(trainer, optimizer)
+        callback.on_train_batch_end(trainer, pl_module, None, batch, batch_idx)
+        checkpoint.on_train_batch_end(trainer, pl_module, None, batch, batch_idx)
+        batch_idx += 1
+    checkpoint.on_train_end(trainer, pl_module)
+
+    assert saved_steps(tmp_path) == {"progress-0.50.ckpt": 5, "final.ckpt": 10}
+
+
+def test_progress_checkpoint_skips_milestones_before_resuming(tmp_path):
+    callback, clock, trainer, pl_module, optimizer = create_callback()
+    clock.now += 6.0
+    step_optimizer(trainer, optimizer)
+    callback._update_progress(trainer)
+    checkpoint = create_progress_checkpoint(
+        tmp_path, callback, trainer, pl_module, every=0.25, final_save_seconds=0.0
+    )
+    run_with_checkpoints(checkpoint, callback, clock, trainer, pl_module, optimizer)
+
+    assert set(saved_steps(tmp_path)) == {"progress-0.75.ckpt", "final.ckpt"}
+
+
+class LinearModule(pl.LightningModule):
+    def __init__(self):
+        super().__init__()
+        self.layer = torch.nn.Linear(1, 1)
+
+    def training_step(self, batch, batch_idx):
+        return self.layer(batch[0]).sum()
+
+    def configure_optimizers(self):
+        optimizer = torch.optim.SGD(self.parameters(), lr=0.1)
+        return [optimizer], [progressive_schedulers.CosineAnnealingLR(optimizer)]
+
+
+def test_progress_checkpoint_saves_through_the_trainer(tmp_path):
+    callback = lightning_callbacks.AutoSchedulingCallback(
+        progress_source=TokenSource(total_tokens=20)
+    )
+    checkpoint = lightning_callbacks.ProgressCheckpoint(str(tmp_path), every=0.5)
+    trainer = pl.Trainer(
+        max_epochs=-1,
+        callbacks=[callback, checkpoint],
+        logger=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+    )
+    checkpoint_io = trainer.strategy.checkpoint_io
+    dataset = TensorDataset(torch.ones(4, 1))
+    trainer.fit(LinearModule(), DataLoader(dataset, batch_size=2))
+
+    assert saved_steps(tmp_path) == {"progress-0.50.ckpt": 5, "final.ckpt": 10}
+    assert trainer.strategy.checkpoint_io is checkpoint_io
+    assert (
+        "AutoSchedulingCallback"
+        in torch.load(tmp_path / "final.ckpt", weights_only=False)["callbacks"]
+    )
+
+
+def test_progress_checkpoint_needs_auto_scheduling_callback(tmp_path):
+    trainer = SimpleNamespace(callbacks=[])
+    checkpoint = lightning_callbacks.ProgressCheckpoint(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        checkpoint.on_train_start(trainer, None)
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"every": 0.0}, {"every": 1.0}, {"safety_factor": 0.5}]
+)
+def test_progress_checkpoint_rejects_invalid_arguments(tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        lightning_callbacks.ProgressCheckpoint(str(tmp_path), **kwargs)
+
+
+def test_callback_records_optimizer_steps():
+    callback, clock, trainer, pl_module, optimizer = create_callback(history_size=4)
+    learning_rates = run_batches(
+        callback, clock, trainer, pl_module, optimizer, step_time=1.0
+    )
+
+    records = callback.history.to_numpy()
+    assert records["step"].tolist() == [7, 8, 9, 10]
+    assert records["progress"].tolist() == pytest.approx([0.7, 0.8, 0.9, 1.0])
+    assert records["lr"][:, 0].tolist() == pytest.approx(learning_rates[-4:])
+
+    callback.disable_instrumentation()
+    assert "on_train_batch_end" not in vars(callback)
+
+
+def run_with_validation(
+    callback, clock, trainer, pl_module, optimizer, validation_time, max_steps=None
+):
+    """Runs batches and validates when Lightning would, returns the progress."""
+    epoch_loop = trainer.fit_loop.epoch_loop
+    validated_at = []
+    while not trainer.should_stop and trainer.global_step != max_steps:
+        epoch_loop.total_batch_idx += 1
+        callback.on_train_batch_start(trainer, pl_module, None, 0)
+        clock.now += 1.0
+        step_optimizer(trainer, optimizer)
+        callback.on_train_batch_end(trainer, pl_module, None, None, 0)
+        if (epoch_loop.total_batch_idx + 1) % trainer.val_check_batch == 0:
+            callback.on_validation_start(trainer, pl_module)
+            clock.now += validation_time * callback.evaluation_schedule.subset
+            callback.on_validation_end(trainer, pl_module)
+            validated_at.append(callback.progress_estimator.progress)
+    return validated_at
+
+
+def test_callback_validates_at_the_scheduled_progress():
+    schedule = EvaluationSchedule(
+        points=[0.3, 0.6, 1.0], max_fraction=1.0, full_cost=1.0
+    )
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        {"seconds": 100}, evaluation_schedule=schedule
+    )
+    assert trainer.check_val_every_n_epoch is None
+
+    validated_at = run_with_validation(
+        callback, clock, trainer, pl_module, optimizer, validation_time=1.0
+    )
+
+    assert validated_at == pytest.approx([0.3, 0.6, 1.0])
+    assert schedule.num_evaluations == 3
+    assert callback.time_by_phase["validation"] == pytest.approx(schedule.spent)
+
+
+def test_callback_keeps_validation_within_its_budget():
+    schedule = EvaluationSchedule(points=10, max_fraction=0.05, full_cost=2.0)
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        {"seconds": 200}, evaluation_schedule=schedule
+    )
+
+    run_with_validation(
+        callback, clock, trainer, pl_module, optimizer, validation_time=4.0
+    )
+
+    assert schedule.spent <= 10.0
+    assert 0.1 <= schedule.subset < 1.0
+    assert schedule.num_evaluations + schedule.num_skipped == 10
+
+
+def test_callback_resumes_the_evaluation_schedule():
+    schedule = EvaluationSchedule(
+        points=[0.3, 0.6, 1.0], max_fraction=1.0, full_cost=1.0
+    )
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        {"seconds": 100}, evaluation_schedule=schedule
+    )
+    run_with_validation(
+        callback, clock, trainer, pl_module, optimizer, 1.0, max_steps=50
+    )
+    state = callback.state_dict()
+
+    resumed_schedule = EvaluationSchedule(points=[0.3, 0.6, 1.0], max_fraction=1.0)
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        {"seconds": 100}, resume_from=state, evaluation_schedule=resumed_schedule
+    )
+    validated_at = run_with_validation(
+        callback, clock, trainer, pl_module, optimizer, 1.0
+    )
+
+    assert len(validated_at) == 2
+    assert resumed_schedule.num_evaluations == 3
+
+
+def test_callback_estimates_the_validation_cost_in_the_sanity_check():
+    schedule = EvaluationSchedule(points=[0.3, 0.6, 1.0], max_fraction=0.06)
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        {"seconds": 100}, evaluation_schedule=schedule
+    )
+    trainer.sanity_checking = True
+    trainer.num_val_batches = [10]
+    callback.on_sanity_check_start(trainer, pl_module)
+    for batch_idx in range(2):
+        callback.on_validation_batch_start(trainer, pl_module, None, batch_idx)
+        clock.now += 0.5
+        callback.on_validation_batch_end(trainer, pl_module, None, None, batch_idx)
+    callback.on_sanity_check_end(trainer, pl_module)
+    trainer.sanity_checking = False
+    callback.on_train_start(trainer, pl_module)
+
+    validated_at = run_with_validation(
+        callback, clock, trainer, pl_module, optimizer, validation_time=5.0
+    )
+
+    # 2 of the 6 seconds for each validation of 5 seconds
+    assert validated_at == pytest.approx([0.3, 0.6, 1.0])
+    assert schedule.spent == pytest.approx(6.0)
+
+
+def test_callback_skips_validation_without_a_cost_estimate():
+    schedule = EvaluationSchedule(points=10, max_fraction=0.05)
+    callback, clock, trainer, pl_module, optimizer = create_callback(
+        {"seconds": 100}, evaluation_schedule=schedule
+    )
+
+    validated_at = run_with_validation(
+        callback, clock, trainer, pl_module, optimizer, validation_time=60.0
+    )
+
+    assert validated_at == []
+    assert schedule.spent <= 5.0
+    assert schedule.num_skipped == 10
+
+
+def test_evaluation_schedule_needs_a_time_budget():
+    with pytest.raises(ValueError):
+        lightning_callbacks.AutoSchedulingCallback(
+            progress_source=TokenSource(100), evaluation_schedule=EvaluationSchedule()
+        )
@@ -0,0 +1,117 @@
+import math
+
+import numpy as np
+import pytest
+import torch
+from torch.optim import SGD
+
+import progressive_scheduling.schedulers as progressive_schedulers
+from progressive_scheduling.lookup_table import LookupTable
+
+from .util import create_optimizer
+
+
+def max_lookup_error(scheduler):
+    progress = np.random.default_rng(0).uniform(0.0, 1.0, 2000)
+    expected = scheduler.get_lr_batch(progress)[0]
+    actual = [scheduler._lookup_table.lookup(float(p))[0] for p in progress]
+    return np.abs(np.asarray(actual) - expected).max()
+
+
+@pytest.mark.parametrize("size", [101, 1001, 10_001])
+def test_cosine_annealing_lookup_table_error_bound(size):
+    scheduler = progressive_schedulers.CosineAnnealingLR(
+        create_optimizer(), eta_min=0.001, lookup_table_size=size
+    )
+    # max|f''| / (8 * h^-2) with f'' <= (base_lr - eta_min) * pi^2 / 2
+    bound = (0.1 - 0.001) * math.pi**2 / 2 / (8 * (size - 1) ** 2)
+    assert max_lookup_error(scheduler) <= bound
+
+
+@pytest.mark.parametrize("pct_start", [0.1, 0.3, 0.5])
+def test_one_cycle_lookup_table_error_bound(pct_start):
+    scheduler = progressive_schedulers.OneCycleLR(
+        create_optimizer(), max_lr=0.1, pct_start=pct_start, lookup_table_size=10_001
+    )
+    # the warmup phase is the steepest part of the schedule
+    bound = 0.1 * math.pi**2 / 2 / pct_start**2 / (8 * 10_000**2)
+    assert max_lookup_error(scheduler) <= bound
+
+
+def test_lookup_table_matches_analytic_step():
+    analytic = progressive_schedulers.OneCycleLR(create_optimizer(), max_lr=0.1)
+    tabulated = progressive_schedulers.OneCycleLR(
+        create_optimizer(), max_lr=0.1, lookup_table_size=10_001
+    )
+    for step in range(100):
+        for scheduler in (analytic, tabulated):
+            scheduler.optimizer.step()
+            scheduler.step(step / 100)
+        assert tabulated.get_last_lr()[0] == pytest.approx(
+            analytic.get_last_lr()[0], rel=1e-6
+        )
+
+
+def test_lookup_table_is_shared_between_equal_configurations():
+    first = progressive_schedulers.CosineAnnealingLR(
+        create_optimizer(), eta_min=0.01, lookup_table_size=1000
+    )
+    second = progressive_schedulers.CosineAnnealingLR(
+        create_optimizer(), eta_min=0.01, lookup_table_size=1000
+    )
+    other = progressive_schedulers.CosineAnnealingLR(
+        create_optimizer(), eta_min=0.02, lookup_table_size=1000
+    )
+    assert first._lookup_table is second._lookup_table
+    assert first._lookup_table is not other._lookup_table
+    assert first._lookup_table.nbytes == 2 * 1000 * 8
+    assert "_lookup_table" not in first.state_dict()
+
+
+def test_lookup_table_invalid_values():
+    with pytest.raises(ValueError):
+        progressive_schedulers.CosineAnnealingLR(
+            create_optimizer(), lookup_table_size=1
+        )
+
+    table = LookupTable([[0.0, 1.0]])
+    assert table.lookup(0.25) == [0.25]
+    with pytest.raises(ValueError):
+        table.lookup(1.1)
+
+
+def test_lookup_table_covers_the_other_hyperparameters():
+    def create_scheduler(**kwargs):
+        model = torch.nn.Linear(1, 1)
+        optimizer = SGD(model.parameters(), lr=0.1, momentum=0.9, weight_decay=0.1)
+        return progressive_schedulers.OneCycleLR(
+            optimizer, max_lr=0.1, final_weight_decay=0.01, **kwargs
+        )
+
+    analytic = create_scheduler()
+    tabulated = create_scheduler(lookup_table_size=10_001)
+    assert set(tabulated._hyperparameter_tables) == {"momentum", "weight_decay"}
+
+    for step in range(100):
+        for scheduler in (analytic, tabulated):
+            scheduler.optimizer.step()
+            scheduler.step(step / 100)
+        expected = analytic.optimizer.param_groups[0]
+        actual = tabulated.optimizer.param_groups[0]
+        for name in ("momentum", "weight_decay"):
+            assert actual[name] == pytest.approx(expected[name], rel=1e-6)
+
+
+def test_lookup_table_is_rebuilt_when_loading_a_state():
+    saved = progressive_schedulers.OneCycleLR(create_optimizer(), max_lr=0.5)
+    scheduler = progressive_schedulers.OneCycleLR(
+        create_optimizer(), max_lr=0.1, lookup_table_size=1001
+    )
+    scheduler.load_state_dict(saved.state_dict())
+    scheduler.optimizer.step()
+
+    scheduler.step(0.3)
+
+    assert scheduler.get_last_lr()[0] == pytest.approx(0.5)
+    assert scheduler.get_lr(0.3)[0] == pytest.approx(0.5)
+    assert scheduler._lookup_table is not None
@@ -1,6 +1,7 @@
 from typing import Literal
 
 import pytest
+import torch
 import torch.optim.lr_scheduler as pytorch_schedulers
 
 import progressive_scheduling.schedulers as progressive_schedulers
@@ -107,3 +108,61 @@ def test_invalid_progress_values():
     with pytest.raises(ValueError):
         optimizer.step()
         scheduler.step(1.1)
+
+
+def test_per_group_values():
+    max_lrs = [0.1, 0.05, 0.01]
+    div_factors = [25.0, 10.0, 5.0]
+    final_div_factors = [1e4, 1e3, 1e2]
+    scheduler = progressive_schedulers.OneCycleLR(
+        create_optimizer(num_param_groups=3),
+        max_lr=max_lrs,
+        div_factor=div_factors,
+        final_div_factor=final_div_factors,
+    )
+    single_group_schedulers = [
+        progressive_schedulers.OneCycleLR(
+            create_optimizer(),
+            max_lr=max_lr,
+            div_factor=div_factor,
+            final_div_factor=final_div_factor,
+        )
+        for max_lr, div_factor, final_div_factor in zip(
+            max_lrs, div_factors, final_div_factors
+        )
+    ]
+
+    for progress in [0.0, 0.1, 0.3, 0.5, 1.0]:
+        expected = [s.get_lr(progress)[0] for s in single_group_schedulers]
+        assert scheduler.get_lr(progress) == pytest.approx(expected, rel=1e-12)
+
+        scheduler.optimizer.step()
+        scheduler.step(progress)
+        lrs = [group["lr"] for group in scheduler.optimizer.param_groups]
+        assert lrs == pytest.approx(expected, rel=1e-12)
+
+    assert scheduler.get_lr_batch([0.0, 0.5, 1.0]).shape == (3, 3)
+
+
+def test_per_group_values_invalid_length():
+    with pytest.raises(ValueError):
+        progressive_schedulers.OneCycleLR(
+            create_optimizer(num_param_groups=3), max_lr=[0.1, 0.05]
+        )
+
+
+def test_state_dict_loads_with_weights_only(tmp_path):
+    scheduler = progressive_schedulers.OneCycleLR(
+        create_optimizer(num_param_groups=2), max_lr=[0.1, 0.01]
+    )
+    scheduler.optimizer.step()
+    scheduler.step(0.4)
+    torch.save(scheduler.state_dict(), tmp_path / "scheduler.pt")
+    state_dict = torch.load(tmp_path / "scheduler.pt", weights_only=True)
+
+    restored = progressive_schedulers.OneCycleLR(
+        create_optimizer(num_param_groups=2), max_lr=0.1
+    )
+    restored.load_state_dict(state_dict)
+    assert restored.get_lr(0.5) == pytest.approx(scheduler.get_lr(0.5))
+    assert restored.last_progress == 0.4
@@ -0,0 +1,230 @@
+import math
+
+import numpy as np
+import pytest
+import torch
+import torch.optim.lr_scheduler as pytorch_schedulers
+
+import progressive_scheduling.schedulers as progressive_schedulers
+from progressive_scheduling.piecewise import (
+    PiecewiseSchedule,
+    ScheduleBuilder,
+    Segment,
+    wsd_schedule,
+)
+
+from .util import (
+    compare_progressive_scheduler_with_reference_implementation,
+    create_optimizer,
+)
+
+
+def create_schedule():
+    return (
+        ScheduleBuilder(start=0.0)
+        .warmup(0.1)
+        .constant(0.5)
+        .cosine(0.2, to=0.1)
+        .linear(0.2, to=0.0)
+        .build()
+    )
+
+
+def test_segments():
+    schedule = create_schedule()
+
+    assert schedule.breakpoints == pytest.approx([0.1, 0.6, 0.8])
+    assert schedule(0.05) == pytest.approx([0.5])
+    assert schedule(0.1) == pytest.approx([1.0])
+    assert schedule(0.5) == pytest.approx([1.0])
+    assert schedule(0.7) == pytest.approx([0.55])
+    assert schedule(0.8) == pytest.approx([0.1])
+    assert schedule(0.9) == pytest.approx([0.05])
+    assert schedule(1.0) == pytest.approx([0.0])
+
+
+@pytest.mark.parametrize(
+    "progress", [-0.1, 1.1, np.float32(1.5), np.float64(-0.5), np.int64(2)]
+)
+def test_invalid_progress(progress):
+    with pytest.raises(ValueError):
+        create_schedule()(progress)
+
+
+def test_numpy_scalar_progress():
+    values = create_schedule()(np.float32(0.7))
+    assert type(values[0]) is float
+    assert values == pytest.approx([0.55])
+
+    scheduler = progressive_schedulers.CosineAnnealingLR(create_optimizer())
+    scheduler.optimizer.step()
+    scheduler.step(np.float32(0.5))
+    assert type(scheduler.optimizer.param_groups[0]["lr"]) is float
+    assert type(scheduler.last_progress) is float
+
+
+def test_evaluate_batch_matches_single_values():
+    schedule = create_schedule()
+    progress = np.linspace(0.0, 1.0, 1001)
+
+    values = schedule.evaluate_batch(progress)
+
+    assert values.shape == (1, 1001)
+    expected = [schedule(float(p))[0] for p in progress]
+    np.testing.assert_allclose(values[0], expected, rtol=1e-12, atol=1e-15)
+
+    tensor_values = schedule.evaluate_batch(torch.from_numpy(progress))
+    np.testing.assert_allclose(tensor_values.numpy(), values, rtol=1e-12)
+
+
+def test_tensor_progress():
+    schedule = create_schedule()
+    values = schedule(torch.tensor(0.7, dtype=torch.float64))
+
+    assert isinstance(values[0], torch.Tensor)
+    assert values[0].item() == pytest.approx(0.55)
+
+
+def test_per_entry_values():
+    schedule = ScheduleBuilder(start=[0.0, 1.0]).linear(1.0, to=[1.0, 0.0]).build()
+
+    assert schedule.num_entries == 2
+    assert schedule(0.25) == pytest.approx([0.25, 0.75])
+    assert schedule.scaled([2.0, 4.0])(0.25) == pytest.approx([0.5, 3.0])
+
+
+def test_jump_between_segments():
+    schedule = (
+        ScheduleBuilder(start=1.0)
+        .constant(0.5)
+        .segment(0.5, "linear", start=0.5, to=0.0)
+        .build()
+    )
+
+    assert schedule(0.49) == [1.0]
+    assert schedule(0.5) == pytest.approx([0.5])
+
+
+def test_wsd_schedule():
+    schedule = wsd_schedule(warmup=0.1, decay=0.2, final=0.1)
+
+    assert schedule(0.05) == pytest.approx([0.5])
+    assert schedule(0.5) == pytest.approx([1.0])
+    assert schedule(0.9) == pytest.approx([0.55])
+    assert schedule(1.0) == pytest.approx([0.1])
+
+
+@pytest.mark.parametrize(
+    "build",
+    [
+        lambda: ScheduleBuilder().linear(0.5).build(),
+        lambda: ScheduleBuilder().linear(-0.5).linear(1.5).build(),
+        lambda: ScheduleBuilder().segment(1.0, "exp").build(),
+        lambda: ScheduleBuilder(start=[0.0, 1.0])
+        .linear(1.0, to=[0.0, 1.0, 2.0])
+        .build(),
+        lambda: PiecewiseSchedule(
+            [
+                Segment(0.0, 0.4, [1.0], [1.0], "linear"),
+                Segment(0.5, 1.0, [1.0], [0.0], "cos"),
+            ]
+        ),
+        lambda: wsd_schedule(warmup=0.6, decay=0.6),
+    ],
+)
+def test_invalid_schedules(build):
+    with pytest.raises(ValueError):
+        build()
+
+
+def test_piecewise_lr():
+    optimizer = create_optimizer(num_param_groups=2)
+    optimizer.param_groups[1]["lr"] = 0.01
+    scheduler = progressive_schedulers.PiecewiseLR(
+        optimizer, ScheduleBuilder(start=0.0).warmup(0.1).cosine(0.9)
+    )
+    optimizer.step()
+    scheduler.step(0.05)
+
+    assert scheduler.get_last_lr() == pytest.approx([0.05, 0.005])
+
+    scheduler.step(0.55)
+    assert scheduler.get_last_lr() == pytest.approx([0.05, 0.005])
+    assert scheduler.get_lr_batch([0.1, 1.0]) == pytest.approx(
+        np.array([[0.1, 0.0], [0.01, 0.0]])
+    )
+
+
+def test_piecewise_lr_state_dict(tmp_path):
+    scheduler = progressive_schedulers.PiecewiseLR(
+        create_optimizer(), wsd_schedule(warmup=0.1, decay=0.2)
+    )
+    torch.save(scheduler.state_dict(), tmp_path / "scheduler.pt")
+
+    state_dict = torch.load(tmp_path / "scheduler.pt", weights_only=True)
+    scheduler.load_state_dict(state_dict)
+    assert scheduler.get_lr(0.5) == pytest.approx([0.1])
+
+
+@pytest.mark.parametrize(
+    "pct_start, anneal_strategy", [(0.3, "cos"), (0.25, "linear"), (0.1, "cos")]
+)
+def test_three_phase_one_cycle(pct_start, anneal_strategy):
+    total_steps = 1000
+    kwargs = dict(
+        max_lr=0.1,
+        pct_start=pct_start,
+        anneal_strategy=anneal_strategy,
+        three_phase=True,
+    )
+    progressive_scheduler = progressive_schedulers.OneCycleLR(
+        create_optimizer(), **kwargs
+    )
+    pytorch_scheduler = pytorch_schedulers.OneCycleLR(
+        create_optimizer(), total_steps=total_steps, **kwargs
+    )
+    compare_progressive_scheduler_with_reference_implementation(
+        total_steps, progressive_scheduler, pytorch_scheduler
+    )
+
+    # the learning rate is back at the initial learning rate after two phases
+    assert progressive_scheduler.get_lr(2 * pct_start) == pytest.approx([0.1 / 25])
+
+
+def test_three_phase_momentum():
+    optimizer = create_optimizer()
+    scheduler = progressive_schedulers.OneCycleLR(
+        optimizer, max_lr=0.1, pct_start=0.25, three_phase=True
+    )
+    optimizer.step()
+
+    momentums = []
+    for progress in [0.25, 0.5, 0.75, 1.0]:
+        scheduler.step(progress)
+        momentums.append(optimizer.param_groups[0]["momentum"])
+
+    assert momentums == pytest.approx([0.85, 0.95, 0.95, 0.95])
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"pct_start": 0.6, "three_phase": True},
+        {"pct_start": 1.5},
+        {"anneal_strategy": "exp"},
+    ],
+)
+def test_invalid_one_cycle_configuration(kwargs):
+    with pytest.raises(ValueError):
+        progressive_schedulers.OneCycleLR(create_optimizer(), max_lr=0.1, **kwargs)
+
+
+def test_cosine_annealing_is_a_single_segment():
+    scheduler = progressive_schedulers.CosineAnnealingLR(
+        create_optimizer(), eta_min=0.001
+    )
+    progress = 0.3
+    expected = 0.001 + (0.1 - 0.001) * (1 + math.cos(math.pi * progress)) / 2
+
+    assert len(scheduler._lr_schedule.segments) == 1
+    assert scheduler.get_lr(progress) == [expected]
@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+import torch
+from torch.optim import lr_scheduler
+
+from progressive_scheduling import CosineAnnealingLR, OneCycleLR
+
+from .util import create_optimizer
+
+plot_schedulers = pytest.importorskip(
+    "progressive_scheduling.visualize.plot_schedulers"
+)
+
+
+def create_momentum_optimizer():
+    return torch.optim.SGD([torch.nn.Parameter(torch.zeros(1))], lr=0.1, momentum=0.9)
+
+
+def get_state(scheduler):
+    return (
+        scheduler.last_epoch,
+        [dict(group, params=None) for group in scheduler.optimizer.param_groups],
+    )
+
+
+def plotted_lines(figure):
+    return {
+        line.get_label(): (line.get_xdata(), line.get_ydata())
+        for line in figure.axes[0].lines
+    }
+
+
+@pytest.mark.parametrize("suffix", ["png", "svg"])
+def test_writes_file(tmp_path, suffix):
+    output = tmp_path / f"schedule.{suffix}"
+    plot_schedulers.plot_lr_scheduler(
+        progressive_scheduler=OneCycleLR(create_optimizer(), max_lr=0.1),
+        output=output,
+    )
+
+    content = output.read_bytes()
+    assert content.startswith(b"\x89PNG") if suffix == "png" else b"<svg" in content
+
+
+def test_schedulers_keep_their_state(tmp_path):
+    progressive = OneCycleLR(create_momentum_optimizer(), max_lr=0.1)
+    one_cycle = lr_scheduler.OneCycleLR(
+        create_momentum_optimizer(), max_lr=0.1, total_steps=1000
+    )
+    optimizer = create_optimizer()
+    sequential = lr_scheduler.SequentialLR(
+        optimizer,
+        [
+            lr_scheduler.LinearLR(optimizer, 0.1, total_iters=100),
+            lr_scheduler.ExponentialLR(optimizer, 0.99),
+        ],
+        milestones=[100],
+    )
+    schedulers = [progressive, one_cycle, sequential]
+    states = [get_state(scheduler) for scheduler in schedulers]
+
+    plot_schedulers.plot_lr_scheduler(
+        schedulers=schedulers, output=tmp_path / "schedule.png"
+    )
+
+    assert [get_state(scheduler) for scheduler in schedulers] == states
+
+
+def test_overlays_schedulers_and_param_groups(tmp_path):
+    optimizer = torch.optim.SGD(
+        [
+            {"params": [torch.nn.Parameter(torch.zeros(1))]},
+            {"params": [torch.nn.Parameter(torch.zeros(1))], "lr": 0.01},
+        ],
+        lr=0.1,
+    )
+    figure = plot_schedulers.plot_lr_scheduler(
+        pytorch_scheduler=lr_scheduler.CosineAnnealingLR(create_optimizer(), 999),
+        progressive_scheduler=CosineAnnealingLR(create_optimizer()),
+        schedulers=[CosineAnnealingLR(optimizer)],
+        labels=["two groups"],
+        output=tmp_path / "schedule.png",
+    )
+
+    lines = plotted_lines(figure)
+    assert list(lines) == [
+        "Progressive Scheduler",
+        "PyTorch Scheduler",
+        "two groups, group 0",
+        "two groups, group 1",
+    ]
+    # progress step / (num_steps - 1) matches the torch schedule over num_steps
+    np.testing.assert_allclose(
+        lines["Progressive Scheduler"][1], lines["PyTorch Scheduler"][1], atol=1e-15
+    )
+
+
+def test_long_schedules_keep_their_peak(tmp_path):
+    num_steps = 1_000_003
+    figure = plot_schedulers.plot_lr_scheduler(
+        pytorch_scheduler=lr_scheduler.OneCycleLR(
+            create_momentum_optimizer(), max_lr=0.1, total_steps=num_steps
+        ),
+        progressive_scheduler=OneCycleLR(
+            create_momentum_optimizer(), max_lr=0.1, pct_start=0.123456789
+        ),
+        num_steps=num_steps,
+        output=tmp_path / "schedule.png",
+        max_points=500,
+    )
+
+    for steps, lrs in plotted_lines(figure).values():
+        assert len(lrs) <= 1000
+        assert steps[0] == 0 and steps[-1] == num_steps - 1
+        assert lrs.max() == pytest.approx(0.1, rel=1e-9)
+
+
+def test_downsample_min_max_keeps_spikes():
+    y = np.zeros(100_000)
+    y[12_345] = 1.0
+    y[54_321] = -1.0
+    x, downsampled = plot_schedulers._downsample_min_max(np.arange(len(y)), y, 100)
+
+    assert len(downsampled) <= 200
+    assert x[downsampled.argmax()] == 12_345
+    assert x[downsampled.argmin()] == 54_321
+    assert np.all(np.diff(x) > 0)
+
+
+def test_downsample_min_max_keeps_short_curves():
+    x, y = np.arange(10), np.arange(10.0)
+    assert plot_schedulers._downsample_min_max(x, y, 5) == (x, y)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        plot_schedulers.plot_lr_scheduler()
+    with pytest.raises(ValueError):
+        plot_schedulers.plot_lr_scheduler(
+            schedulers=[CosineAnnealingLR(create_optimizer())], labels=["a", "b"]
+        )
@@ -0,0 +1,187 @@
+import numpy as np
+import pytest
+
+from progressive_scheduling.progress import (
+    CalibratedProgressEstimator,
+    ElapsedProgressEstimator,
+    ThroughputProgressEstimator,
+)
+
+
+def run_estimator(estimator, step_costs, budget):
+    consumed = 0.0
+    progress = []
+    for step_cost in step_costs:
+        consumed += step_cost
+        progress.append(estimator.update(consumed, budget))
+        if estimator.is_final_step:
+            break
+    return progress
+
+
+def test_elapsed_progress_estimator():
+    estimator = ElapsedProgressEstimator()
+    progress = run_estimator(estimator, [1.0] * 20, budget=10.0)
+
+    assert progress == pytest.approx([step / 10 for step in range(1, 11)])
+    assert estimator.remaining_budget == 0.0
+    assert estimator.predicted_total_steps is None
+
+
+def test_throughput_progress_estimator_constant_step_cost():
+    estimator = ThroughputProgressEstimator()
+    progress = run_estimator(estimator, [1.0] * 20, budget=10.5)
+
+    assert progress == pytest.approx([step / 10 for step in range(1, 11)])
+    assert estimator.predicted_total_steps == 10
+    assert estimator.remaining_budget == pytest.approx(0.5)
+
+
+def test_throughput_progress_estimator_is_smooth_and_monotone():
+    step_costs = [1.0] * 1000
+    # slow batches and GC pauses
+    for step in range(50, 1000, 97):
+        step_costs[step] = 20.0
+
+    estimator = ThroughputProgressEstimator(smoothing=0.95)
+    progress = run_estimator(estimator, step_costs, budget=900.0)
+
+    assert progress[-1] == 1.0
+    assert all(p < 1.0 for p in progress[:-1])
+    assert all(b >= a for a, b in zip(progress, progress[1:]))
+    increments = [b - a for a, b in zip(progress, progress[1:])]
+    assert max(increments) < 0.01
+    assert estimator.predicted_total_steps == len(progress)
+
+
+def test_throughput_progress_estimator_reset():
+    estimator = ThroughputProgressEstimator()
+    run_estimator(estimator, [1.0] * 5, budget=3.0)
+    assert estimator.is_final_step
+
+    estimator.reset()
+    assert estimator.step == 0
+    assert estimator.progress == 0.0
+    assert not estimator.is_final_step
+    assert estimator.step_cost is None
+
+
+def test_throughput_progress_estimator_invalid_values():
+    with pytest.raises(ValueError):
+        ThroughputProgressEstimator(smoothing=1.0)
+    with pytest.raises(ValueError):
+        ThroughputProgressEstimator(outlier_factor=0.5)
+
+
+def test_throughput_progress_estimator_zero_first_step_cost():
+    estimator = ThroughputProgressEstimator()
+    progress = run_estimator(estimator, [0.0] + [1.0] * 30, budget=20.0)
+
+    assert progress[-1] == 1.0
+    assert progress[1] > 0.0
+    assert progress[10] == pytest.approx(0.5, abs=0.05)
+    assert estimator.step_cost == pytest.approx(1.0)
+
+
+def run_calibrated_estimator(estimator, step_costs, budget):
+    """Like run_estimator, but only passes the consumed budget when needed."""
+    consumed = 0.0
+    progress, reads = [], 0
+    for step_cost in step_costs:
+        consumed += step_cost
+        if estimator.needs_consumed:
+            reads += 1
+            progress.append(estimator.update(consumed, budget))
+        else:
+            progress.append(estimator.update(None, budget))
+        if estimator.is_final_step:
+            break
+    return progress, consumed, reads
+
+
+def test_calibrated_estimator_plans_steps():
+    estimator = CalibratedProgressEstimator(
+        warmup_steps=5, calibration_steps=10, check_every=20
+    )
+    progress, consumed, reads = run_calibrated_estimator(
+        estimator, [1.0] * 200, budget=100.5
+    )
+
+    assert estimator.predicted_total_steps == len(progress) == 100
+    assert estimator.step_cost == 1.0
+    assert estimator.step_cost_bounds == (1.0, 1.0)
+    assert progress[:15] == [0.0] * 15
+    assert progress[15:] == pytest.approx([step / 85 for step in range(1, 86)])
+    # 15 calibration steps and one check every 20 steps
+    assert reads == 15 + 4
+    assert estimator.num_plans == 1
+
+
+def test_calibrated_estimator_is_independent_of_step_noise():
+    generator = np.random.default_rng(0)
+    step_costs = generator.normal(1.0, 0.05, 2000).clip(0.5).tolist()
+    estimator = CalibratedProgressEstimator(calibration_steps=100)
+    progress, consumed, _ = run_calibrated_estimator(
+        estimator, step_costs, budget=1000.0
+    )
+
+    assert estimator.num_plans == 1
+    lower, upper = estimator.step_cost_bounds
+    assert lower < 1.0 < upper
+    # planned at the upper bound, so the plan ends just within the budget
+    assert 980.0 < consumed <= 1000.0
+    increments = np.diff(progress[105:])
+    np.testing.assert_allclose(increments, increments[0])
+
+
+def test_calibrated_estimator_plans_again_after_drift():
+    # the step cost doubles right after the check at step 310
+    step_costs = [1.0] * 310 + [2.0] * 1000
+    estimator = CalibratedProgressEstimator(
+        warmup_steps=0, calibration_steps=10, check_every=50
+    )
+    progress, consumed, _ = run_calibrated_estimator(
+        estimator, step_costs, budget=1000.0
+    )
+
+    assert estimator.num_plans == 2
+    assert estimator.step_cost == 2.0
+    assert progress[-1] == 1.0
+    assert all(b >= a for a, b in zip(progress, progress[1:]))
+    # the slower steps since the last check before the drift was detected
+    assert consumed <= 1000.0 + 50 * 1.0
+
+
+def test_calibrated_estimator_ends_when_budget_runs_out_in_calibration():
+    estimator = CalibratedProgressEstimator(calibration_steps=50)
+    progress, consumed, _ = run_calibrated_estimator(
+        estimator, [1.0] * 100, budget=20.0
+    )
+
+    assert len(progress) == 20
+    assert progress[-1] == 1.0
+
+
+def test_calibrated_estimator_calibration_budget():
+    estimator = CalibratedProgressEstimator(
+        warmup_steps=0, calibration_steps=1000, calibration_budget=5.0
+    )
+    run_calibrated_estimator(estimator, [1.0] * 10, budget=100.0)
+
+    assert estimator.num_plans == 1
+    assert estimator.predicted_total_steps == 100
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"warmup_steps": -1},
+        {"calibration_steps": 1},
+        {"confidence": 1.0},
+        {"check_every": 0},
+        {"tolerance": -0.1},
+    ],
+)
+def test_calibrated_estimator_invalid_values(kwargs):
+    with pytest.raises(ValueError):
+        CalibratedProgressEstimator(**kwargs)
@@ -0,0 +1,142 @@
+import pytest
+import torch
+
+from progressive_scheduling.progress import (
+    CompositeSource,
+    FlopSource,
+    SampleSource,
+    TimeSource,
+    TokenSource,
+)
+
+
+def test_time_source():
+    now = [5.0]
+    source = TimeSource(10.0, clock=lambda: now[0])
+    now[0] = 9.0
+
+    assert source.consumed == 4.0
+    assert source.fraction == 0.4
+    assert not source.is_exhausted
+
+    now[0] = 15.0
+    assert source.is_exhausted
+
+    source.start()
+    assert source.consumed == 0.0
+
+
+@pytest.mark.parametrize(
+    "exclude_downtime, expected", [(False, 7.0), (True, 5.0)], ids=str
+)
+def test_time_source_resumes(exclude_downtime, expected):
+    now = [0.0]
+    clock = lambda: now[0]  # noqa: E731
+    source = TimeSource(10.0, clock=clock, wall_clock=clock)
+    now[0] = 4.0
+    state_dict = source.state_dict()
+
+    now[0] = 6.0
+    resumed = TimeSource(
+        10.0, clock=clock, exclude_downtime=exclude_downtime, wall_clock=clock
+    )
+    resumed.load_state_dict(state_dict)
+    now[0] = 7.0
+
+    assert resumed.consumed == expected
+
+
+def test_sample_source_counts_batch_size():
+    source = SampleSource(100)
+    for _ in range(3):
+        source.update((torch.zeros(8, 3), torch.zeros(8)))
+
+    assert source.consumed == 24
+    assert source.fraction == 0.24
+
+
+def test_token_source_ignores_padding():
+    source = TokenSource(100)
+    attention_mask = torch.tensor([[1, 1, 1, 0], [1, 1, 0, 0]])
+    source.update({"input_ids": torch.zeros(2, 4), "attention_mask": attention_mask})
+
+    assert source.consumed == 5
+
+
+def test_token_source_without_attention_mask():
+    source = TokenSource(100)
+    source.update({"input_ids": torch.zeros(2, 4)})
+    source.update(torch.zeros(3, 4))
+
+    assert source.consumed == 20
+
+
+def test_flop_source_scales_tokens():
+    source = FlopSource(1e6, flops_per_token=600.0)
+    source.update({"input_ids": torch.zeros(2, 4)})
+
+    assert source.consumed == 4800.0
+
+
+@pytest.mark.parametrize("sync_every", [1, 4])
+def test_tensor_counts_are_read_every_sync_every_steps(sync_every):
+    source = TokenSource(100, count=lambda batch: batch.sum(), sync_every=sync_every)
+    counts = [torch.tensor(3), torch.tensor(5), torch.tensor(4), torch.tensor(4)]
+
+    source.update(counts[0])
+    # before the first read, nothing is known about the counts
+    assert source.consumed == (3 if sync_every == 1 else 0)
+
+    for count in counts[1:]:
+        source.update(count)
+    assert source.consumed == 16
+
+
+def test_tensor_counts_are_extrapolated_between_reads():
+    source = TokenSource(100, count=lambda batch: batch.sum(), sync_every=2)
+    for _ in range(2):
+        source.update(torch.tensor(4))
+    source.update(torch.tensor(10))
+
+    assert source.consumed == 12.0
+
+    source.sync()
+    assert source.consumed == 18.0
+
+
+def test_count_source_resumes_with_pending_counts():
+    source = TokenSource(100, count=lambda batch: batch.sum(), sync_every=4)
+    for _ in range(3):
+        source.update(torch.tensor(5))
+    state_dict = source.state_dict()
+
+    assert state_dict == {"step": 3, "count": 15}
+
+    resumed = TokenSource(100, count=lambda batch: batch.sum(), sync_every=4)
+    resumed.load_state_dict(state_dict)
+    resumed.update(torch.tensor(5))
+    assert resumed.consumed == 20.0
+
+
+def test_sync_every_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenSource(100, sync_every=0)
+
+
+def test_composite_source_uses_the_largest_share():
+    now = [0.0]
+    source = CompositeSource(TimeSource(10.0, clock=lambda: now[0]), SampleSource(100))
+    source.start()
+    now[0] = 2.0
+    source.update(torch.zeros(50))
+
+    assert source.budget == 1.0
+    assert source.consumed == 0.5
+
+    now[0] = 8.0
+    assert source.consumed == 0.8
+
+
+def test_composite_source_needs_sources():
+    with pytest.raises(ValueError):
+        CompositeSource()
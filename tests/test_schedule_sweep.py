@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+import torch.optim.lr_scheduler as pytorch_schedulers
+
+import progressive_scheduling.schedulers as progressive_schedulers
+from progressive_scheduling.sweep import sweep_schedules
+from progressive_scheduling.utils import get_pytorch_schedule
+
+from .util import create_optimizer
+
+
+def test_one_cycle_sweep_matches_schedulers():
+    grid = {
+        "max_lr": [0.1, 1.0],
+        "pct_start": [0.0, 0.25, 0.5],
+        "div_factor": [10.0, 25.0],
+        "anneal_strategy": ["cos", "linear"],
+        "three_phase": [False, True],
+    }
+    sweep = sweep_schedules("OneCycleLR", grid, num_points=101)
+
+    assert sweep.lrs.shape == (48, 101)
+    for config, lrs in zip(sweep.configs, sweep.lrs):
+        scheduler = progressive_schedulers.OneCycleLR(create_optimizer(), **config)
+        expected = scheduler.get_lr_batch(sweep.progress)[0]
+        np.testing.assert_allclose(lrs, expected, rtol=1e-12, atol=1e-15)
+
+
+@pytest.mark.parametrize(
+    "three_phase, pct_start", [(False, 0.0), (False, 1.0), (True, 0.0), (True, 0.5)]
+)
+def test_one_cycle_sweep_matches_schedulers_at_edge_pct_start(three_phase, pct_start):
+    grid = {
+        "max_lr": [0.1],
+        "pct_start": [pct_start],
+        "anneal_strategy": ["cos", "linear"],
+        "three_phase": [three_phase],
+    }
+    sweep = sweep_schedules("OneCycleLR", grid, progress=[0.0, pct_start, 0.5, 1.0])
+
+    for config, lrs in zip(sweep.configs, sweep.lrs):
+        scheduler = progressive_schedulers.OneCycleLR(create_optimizer(), **config)
+        expected = [scheduler.get_lr(float(p))[0] for p in sweep.progress]
+        np.testing.assert_allclose(lrs, expected, rtol=1e-12, atol=1e-15)
+
+
+def test_cosine_annealing_sweep_matches_schedulers():
+    sweep = sweep_schedules(
+        progressive_schedulers.CosineAnnealingLR,
+        {"lr": [0.1, 0.5], "eta_min": [0.0, 0.01]},
+        progress=[0.0, 0.3, 1.0],
+    )
+
+    for config, lrs in zip(sweep.configs, sweep.lrs):
+        optimizer = create_optimizer()
+        optimizer.param_groups[0]["lr"] = config["lr"]
+        scheduler = progressive_schedulers.CosineAnnealingLR(
+            optimizer, eta_min=config["eta_min"]
+        )
+        np.testing.assert_allclose(lrs, scheduler.get_lr_batch(sweep.progress)[0])
+
+
+def test_summary_metrics():
+    sweep = sweep_schedules(
+        "OneCycleLR",
+        {"max_lr": [1.0], "pct_start": [0.2, 0.4], "anneal_strategy": ["linear"]},
+        num_points=11,
+    )
+    summary = sweep.summary()
+
+    np.testing.assert_allclose(summary["peak_lr"], [1.0, 1.0])
+    np.testing.assert_allclose(summary["peak_progress"], [0.2, 0.4])
+    np.testing.assert_allclose(summary["final_lr"], [4e-6, 4e-6])
+    # the area of the two triangles of a linear one cycle schedule
+    expected_area = [0.5 + 0.04 * 0.2 - 0.5 * 0.04 * (0.2 + 0.8), 0.5 + 0.0]
+    np.testing.assert_allclose(
+        summary["area_under_curve"], expected_area, rtol=0, atol=0.05
+    )
+
+
+def test_distance_to_torch_schedule():
+    total_steps = 1000
+    scheduler = pytorch_schedulers.OneCycleLR(
+        create_optimizer(), max_lr=0.1, total_steps=total_steps, three_phase=True
+    )
+    # the learning rates of all steps, starting with the one before the first step
+    reference = scheduler.get_last_lr() + get_pytorch_schedule(
+        scheduler, total_steps - 1
+    )
+    sweep = sweep_schedules(
+        "OneCycleLR",
+        {"max_lr": [0.1], "pct_start": [0.2, 0.3, 0.4], "three_phase": [True]},
+    )
+
+    distances = sweep.distance(reference)
+    assert distances.argmin() == 1
+    assert distances[1] < 1e-3
+    assert sweep.distance(reference, norm="rms")[1] < distances[1]
+
+
+@pytest.mark.parametrize(
+    "scheduler, grid",
+    [
+        ("StepLR", {"step_size": [1]}),
+        ("OneCycleLR", {"pct_start": [0.3]}),
+        ("OneCycleLR", {"max_lr": [0.1], "gamma": [0.5]}),
+        ("OneCycleLR", {"max_lr": [0.1], "pct_start": [0.6], "three_phase": [True]}),
+        ("OneCycleLR", {"max_lr": [0.1], "anneal_strategy": ["exp"]}),
+    ],
+)
+def test_invalid_sweeps(scheduler, grid):
+    with pytest.raises(ValueError):
+        sweep_schedules(scheduler, grid)
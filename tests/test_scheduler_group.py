@@ -0,0 +1,152 @@
+import pytest
+import torch
+from torch.optim import SGD, Adam
+from torch.utils.data import DataLoader, TensorDataset
+
+import progressive_scheduling.schedulers as progressive_schedulers
+from progressive_scheduling.progress import TokenSource
+from progressive_scheduling.schedulers import SchedulerGroup
+
+from .util import create_optimizer
+
+lightning_callbacks = pytest.importorskip("progressive_scheduling.callbacks.lightning")
+pl = pytest.importorskip("lightning.pytorch")
+
+
+def create_schedulers():
+    generator = SGD([torch.nn.Parameter(torch.zeros(1))], lr=0.1, momentum=0.9)
+    discriminator = Adam(
+        [
+            {"params": [torch.nn.Parameter(torch.zeros(1))]},
+            {"params": [torch.nn.Parameter(torch.zeros(1))], "lr": 0.01},
+        ],
+        lr=0.1,
+    )
+    schedulers = [
+        progressive_schedulers.OneCycleLR(generator, max_lr=0.1),
+        progressive_schedulers.CosineAnnealingLR(discriminator, eta_min=0.001),
+    ]
+    for scheduler in schedulers:
+        scheduler.optimizer.step()
+    return schedulers
+
+
+def get_hyperparameters(schedulers):
+    return [
+        {
+            key: value
+            for key, value in param_group.items()
+            if key in ("lr", "momentum", "betas")
+        }
+        for scheduler in schedulers
+        for param_group in scheduler.optimizer.param_groups
+    ]
+
+
+@pytest.mark.parametrize("lookup_table_size", [None, 10_001])
+def test_group_matches_separate_steps(lookup_table_size):
+    separate = create_schedulers()
+    grouped = create_schedulers()
+    group = SchedulerGroup(grouped, lookup_table_size=lookup_table_size)
+
+    for progress in [0.0, 0.1, 0.3, 0.75, 1.0]:
+        for scheduler in separate:
+            scheduler.step(progress)
+        group.step(progress)
+
+        for expected, actual in zip(
+            get_hyperparameters(separate), get_hyperparameters(grouped)
+        ):
+            assert actual["lr"] == pytest.approx(expected["lr"], abs=1e-9)
+            # the lookup table interpolates the momentum as well
+            assert actual.get("momentum") == pytest.approx(
+                expected.get("momentum"), abs=1e-9
+            )
+            assert actual.get("betas") == pytest.approx(expected.get("betas"), abs=1e-9)
+
+    for expected, actual in zip(separate, grouped):
+        assert actual.last_epoch == expected.last_epoch
+        assert actual.last_progress == expected.last_progress == 1.0
+    assert group.get_last_lr() == [s.get_last_lr() for s in grouped]
+
+
+def test_group_with_tensor_progress_and_lr_levels():
+    optimizer = create_optimizer()
+    leveled = progressive_schedulers.CosineAnnealingLR(optimizer, lr_levels=4)
+    group = SchedulerGroup([leveled, *create_schedulers()])
+    optimizer.step()
+
+    group.step(0.3)
+    assert leveled.get_last_lr() == pytest.approx(leveled.get_lr(0.25))
+
+    group.step(torch.tensor(0.5, dtype=torch.float64))
+    assert group.get_last_lr()[2] == pytest.approx([0.0505, 0.0055])
+
+
+def test_group_state_dict():
+    group = SchedulerGroup(create_schedulers())
+    group.step(0.4)
+    state_dict = group.state_dict()
+
+    restored = SchedulerGroup(create_schedulers())
+    restored.load_state_dict(state_dict)
+    assert [s.last_progress for s in restored.schedulers] == [0.4, 0.4]
+
+    with pytest.raises(ValueError):
+        SchedulerGroup(create_schedulers()[:1]).load_state_dict(state_dict)
+
+
+@pytest.mark.parametrize("progress", [-0.1, 1.1])
+def test_group_checks_progress(progress):
+    with pytest.raises(ValueError):
+        SchedulerGroup(create_schedulers()).step(progress)
+
+
+class TwoOptimizerModule(pl.LightningModule):
+    def __init__(self):
+        super().__init__()
+        self.automatic_optimization = False
+        self.generator = torch.nn.Linear(1, 1)
+        self.discriminator = torch.nn.Linear(1, 1)
+
+    def training_step(self, batch, batch_idx):
+        for optimizer, model in zip(
+            self.optimizers(), (self.generator, self.discriminator)
+        ):
+            optimizer.zero_grad()
+            self.manual_backward(model(batch[0]).sum())
+            optimizer.step()
+
+    def configure_optimizers(self):
+        optimizers = [
+            SGD(self.generator.parameters(), lr=0.1, momentum=0.9),
+            Adam(self.discriminator.parameters(), lr=0.1),
+        ]
+        schedulers = [
+            progressive_schedulers.OneCycleLR(optimizers[0], max_lr=0.1),
+            progressive_schedulers.CosineAnnealingLR(optimizers[1]),
+        ]
+        return optimizers, schedulers
+
+
+def test_callback_steps_the_schedulers_of_all_optimizers():
+    callback = lightning_callbacks.AutoSchedulingCallback(
+        progress_source=TokenSource(20)
+    )
+    trainer = pl.Trainer(
+        max_epochs=-1,
+        callbacks=[callback],
+        logger=False,
+        enable_checkpointing=False,
+        enable_progress_bar=False,
+        enable_model_summary=False,
+    )
+    dataset = TensorDataset(torch.ones(4, 1))
+    trainer.fit(TwoOptimizerModule(), DataLoader(dataset, batch_size=2))
+
+    assert isinstance(callback.scheduler_group, SchedulerGroup)
+    assert len(callback.schedulers) == 2
+    # each batch steps both optimizers and counts 2 tokens
+    assert trainer.global_step == 20
+    assert [scheduler.last_progress for scheduler in callback.schedulers] == [1.0, 1.0]
+    assert [scheduler.last_epoch for scheduler in callback.schedulers] == [10, 10]
@@ -0,0 +1,127 @@
+import csv
+
+import numpy as np
+import pytest
+import torch
+
+import progressive_scheduling.schedulers as progressive_schedulers
+from progressive_scheduling.history import StepHistory
+from progressive_scheduling.schedulers import SchedulerGroup
+
+from .util import create_optimizer
+
+
+def fill(history, num_steps):
+    for step in range(num_steps):
+        if history.is_due():
+            history.record(step, step / 100, [0.1 * step, 0.2 * step], 1e-6)
+
+
+def test_history_overwrites_the_oldest_records():
+    history = StepHistory(capacity=4, num_groups=2)
+    fill(history, 10)
+
+    records = history.to_numpy()
+    assert len(history) == 4
+    assert records["step"].tolist() == [6, 7, 8, 9]
+    np.testing.assert_allclose(records["progress"], [0.06, 0.07, 0.08, 0.09])
+    np.testing.assert_allclose(records["lr"][:, 1], [1.2, 1.4, 1.6, 1.8])
+    assert np.all(np.diff(records["wall_time"]) >= 0.0)
+
+
+def test_history_records_every_nth_step():
+    history = StepHistory(capacity=100, num_groups=2, every=3)
+    fill(history, 10)
+
+    assert history.num_steps == 10
+    assert history.to_numpy()["step"].tolist() == [0, 3, 6, 9]
+
+    history.clear()
+    assert len(history) == 0
+    assert history.to_numpy()["lr"].shape == (0, 2)
+
+
+def test_history_to_csv(tmp_path):
+    history = StepHistory(capacity=3, num_groups=2)
+    fill(history, 5)
+    path = tmp_path / "history.csv"
+    history.to_csv(str(path))
+
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ["step", "progress", "wall_time", "duration"] + [
+        "lr_0",
+        "lr_1",
+    ]
+    assert [int(row["step"]) for row in rows] == [2, 3, 4]
+    assert float(rows[-1]["lr_1"]) == pytest.approx(0.8)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"capacity": 0}, {"every": 0}, {"num_groups": -1}],
+)
+def test_history_rejects_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        StepHistory(**{"capacity": 4, "num_groups": 1, **kwargs})
+
+
+def test_scheduler_records_steps():
+    optimizer = create_optimizer(num_param_groups=2)
+    scheduler = progressive_schedulers.CosineAnnealingLR(optimizer)
+    history = scheduler.enable_instrumentation(capacity=8, every=2)
+
+    for step in range(10):
+        optimizer.step()
+        scheduler.step(step / 10)
+
+    records = history.to_numpy()
+    assert records["step"].tolist() == [1, 3, 5, 7, 9]
+    np.testing.assert_allclose(records["progress"], [0.0, 0.2, 0.4, 0.6, 0.8])
+    np.testing.assert_allclose(
+        records["lr"], scheduler.get_lr_batch(records["progress"]).T
+    )
+    assert np.all(records["duration"] > 0.0)
+
+
+def test_instrumentation_is_not_saved():
+    scheduler = progressive_schedulers.OneCycleLR(create_optimizer(), max_lr=1.0)
+    state = scheduler.state_dict()
+    scheduler.enable_instrumentation()
+
+    assert scheduler.state_dict().keys() == state.keys()
+
+    scheduler.disable_instrumentation()
+    assert scheduler.history is None
+    assert "step" not in vars(scheduler)
+
+
+def test_group_records_instrumented_schedulers():
+    optimizers = [create_optimizer(), create_optimizer()]
+    schedulers = [progressive_schedulers.CosineAnnealingLR(o) for o in optimizers]
+    history = schedulers[1].enable_instrumentation()
+    group = SchedulerGroup(schedulers)
+
+    for step in range(5):
+        for optimizer in optimizers:
+            optimizer.step()
+        group.step(step / 4)
+
+    assert schedulers[0].history is None
+    assert history.to_numpy()["progress"].tolist() == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert optimizers[0].param_groups[0]["lr"] == optimizers[1].param_groups[0]["lr"]
+
+
+def test_scheduler_emits_profiler_ranges():
+    optimizer = create_optimizer()
+    scheduler = progressive_schedulers.CosineAnnealingLR(optimizer)
+    scheduler.enable_instrumentation()
+    optimizer.step()
+
+    with torch.profiler.profile(
+        activities=[torch.profiler.ProfilerActivity.CPU]
+    ) as prof:
+        scheduler.step(0.5)
+
+    names = [event.name for event in prof.events()]
+    assert "CosineAnnealingLR.step" in names
@@ -0,0 +1,70 @@
+import pytest
+import torch
+import torch._dynamo.testing
+from torch.optim import SGD
+
+from .util import SCHEDULER_FACTORIES
+
+
+def create_tensor_lr_optimizer():
+    model = torch.nn.Linear(1, 1)
+    optimizer = SGD(model.parameters(), lr=torch.tensor(0.1))
+    return optimizer
+
+
+@pytest.mark.parametrize("create_scheduler", SCHEDULER_FACTORIES)
+def test_tensor_progress_matches_float_progress(create_scheduler):
+    optimizer = create_tensor_lr_optimizer()
+    scheduler = create_scheduler(optimizer)
+    lr = optimizer.param_groups[0]["lr"]
+
+    for step in range(20):
+        progress = step / 20
+        optimizer.step()
+        scheduler.step(torch.tensor(progress))
+
+        assert optimizer.param_groups[0]["lr"] is lr
+        assert lr.item() == pytest.approx(scheduler.get_lr(progress)[0], rel=1e-5)
+
+
+@pytest.mark.parametrize("create_scheduler", SCHEDULER_FACTORIES)
+def test_tensor_progress_with_float_learning_rates(create_scheduler):
+    model = torch.nn.Linear(1, 1)
+    optimizer = SGD(model.parameters(), lr=0.1)
+    scheduler = create_scheduler(optimizer)
+
+    optimizer.step()
+    scheduler.step(torch.tensor(0.5, dtype=torch.float64))
+
+    assert isinstance(optimizer.param_groups[0]["lr"], float)
+    assert optimizer.param_groups[0]["lr"] == pytest.approx(scheduler.get_lr(0.5)[0])
+
+
+@pytest.mark.parametrize("create_scheduler", SCHEDULER_FACTORIES)
+def test_step_has_no_graph_breaks(create_scheduler):
+    optimizer = create_tensor_lr_optimizer()
+    scheduler = create_scheduler(optimizer)
+    optimizer.step()
+
+    explanation = torch._dynamo.explain(scheduler.step)(torch.tensor(0.5))
+
+    assert explanation.graph_break_count == 0
+
+
+@pytest.mark.parametrize("create_scheduler", SCHEDULER_FACTORIES)
+def test_set_progress_compiles_once(create_scheduler):
+    torch._dynamo.reset()
+    optimizer = create_tensor_lr_optimizer()
+    scheduler = create_scheduler(optimizer)
+    counter = torch._dynamo.testing.CompileCounter()
+
+    @torch.compile(backend=counter, fullgraph=True)
+    def training_step(progress):
+        scheduler.set_progress(progress)
+
+    for step in range(10):
+        training_step(torch.tensor(step / 10))
+        expected = scheduler.get_lr(step / 10)[0]
+        assert optimizer.param_groups[0]["lr"].item() == pytest.approx(expected)
+
+    assert counter.frame_count == 1
@@ -1,13 +1,46 @@
 import torch
 from torch.optim import SGD
 
-from progressive_scheduling.utils import get_progressive_schedule, get_pytorch_schedule
+import progressive_scheduling.schedulers as progressive_schedulers
 
+from .conformance import TOLERANCE, compare_schedulers
 
-def create_optimizer():
-    model = torch.nn.Linear(1, 1)
-    optimizer = SGD(model.parameters(), lr=0.1)
-    return optimizer
+# create a scheduler for an optimizer, for tests that cover every scheduler
+SCHEDULER_FACTORIES = [
+    lambda optimizer, **kwargs: progressive_schedulers.CosineAnnealingLR(
+        optimizer, eta_min=0.001, **kwargs
+    ),
+    lambda optimizer, **kwargs: progressive_schedulers.OneCycleLR(
+        optimizer, max_lr=0.1, **kwargs
+    ),
+    lambda optimizer, **kwargs: progressive_schedulers.OneCycleLR(
+        optimizer, max_lr=0.1, pct_start=0.2, anneal_strategy="linear", **kwargs
+    ),
+]
+
+
+class FakeClock:
+    """A clock that only moves when now is set, counting how often it is read."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.num_calls = 0
+
+    def __call__(self):
+        self.num_calls += 1
+        return self.now
+
+
+def create_optimizer(num_param_groups: int = 1):
+    if num_param_groups == 1:
+        model = torch.nn.Linear(1, 1)
+        return SGD(model.parameters(), lr=0.1)
+
+    param_groups = [
+        {"params": [torch.nn.Parameter(torch.zeros(1))]}
+        for _ in range(num_param_groups)
+    ]
+    return SGD(param_groups, lr=0.1)
 
 
 def compare_progressive_scheduler_with_reference_implementation(
@@ -15,38 +48,7 @@ def compare_progressive_scheduler_with_reference_implementation(
     progressive_scheduler,
     pytorch_scheduler,
 ):
-    # Get learning rate schedules
-    progressive_lrs = get_progressive_schedule(progressive_scheduler, num_steps)
-    pytorch_lrs = get_pytorch_schedule(pytorch_scheduler, num_steps)
-
-    # Print the results header
-    print(
-        f"{'Step':<10} {'Progress':<10} {'Progressive LR':<15} "
-        f"{'PyTorch LR':<15} {'Diff':<15}"
-    )
-    print("-" * 80)
-
-    diffs = []
-    for step, (progressive_lr, pytorch_lr) in enumerate(
-        zip(progressive_lrs, pytorch_lrs), 1
-    ):
-        progress = step / num_steps
-        diff = abs(progressive_lr - pytorch_lr)
-        diffs.append(diff)
-
-        # Log the current step, progress, and learning rates
-        print(
-            f"{step:<10} {progress:<10.4f} {progressive_lr:<15.6f} "
-            f"{pytorch_lr:<15.6f} {diff:<15.6f}"
-        )
-
-    # Check if the learning rates are close enough
-    max_diff = max(diffs)
-    print(f"Maximum difference in learning rates: {max_diff:.2e}")
-    # assert max_diff < 1e-6, "Schedulers behave differently!"
-    assert max_diff < 0.03, "Schedulers behave differently!"
-
-    print(
-        "Verification successful: Progressive scheduler behaves identically to "
-        "PyTorch scheduler."
+    worst_point = compare_schedulers(
+        progressive_scheduler, pytorch_scheduler, num_steps
     )
+    assert worst_point.error <= TOLERANCE, f"Schedulers differ by {worst_point}"